@@ -0,0 +1,9 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from ansible_collections.cisco.sastre.plugins.plugin_utils.common_action import SastreActionBase
+from ansible_collections.cisco.sastre.plugins.modules import list_transform
+
+
+class ActionModule(SastreActionBase):
+    sastre_module = list_transform
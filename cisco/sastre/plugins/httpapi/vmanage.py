@@ -0,0 +1,170 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+DOCUMENTATION = """
+name: vmanage
+version_added: "1.0.20"
+short_description: HttpApi plugin for Cisco SD-WAN vManage
+description:
+    - Allows Sastre-Ansible modules to run under the ansible.netcommon.httpapi connection.
+    - The vManage session is established by Ansible's persistent connection daemon and is reused by all tasks
+      targeting the same host, instead of each task performing its own login and logout.
+    - Requires the ansible.netcommon collection. Set ansible_connection to ansible.netcommon.httpapi and
+      ansible_network_os to cisco.sastre.vmanage.
+    - vManage address, credentials and port are taken from ansible_host, ansible_user, ansible_httpapi_password
+      (or ansible_password) and ansible_httpapi_port. Set ansible_httpapi_use_ssl to true.
+options:
+    tenant:
+        description:
+            - vManage tenant name, only applicable to provider accounts in multi-tenant deployments.
+        type: str
+        vars:
+            - name: tenant
+"""
+
+import json
+from time import time
+from urllib.parse import urlencode
+from ansible.errors import AnsibleAuthenticationFailure, AnsibleConnectionFailure
+from ansible.module_utils.common.text.converters import to_text
+from ansible.plugins.httpapi import HttpApiBase
+
+JSON_HEADERS = {
+    'Content-Type': 'application/json',
+    'Accept': 'application/json',
+}
+
+
+def is_login_page(response_text):
+    # vManage redirects requests with an invalid or expired session to the login page
+    return '<html>' in response_text
+
+
+class HttpApi(HttpApiBase):
+    def __init__(self, connection):
+        super().__init__(connection)
+        self.cookies = {}
+        self.token = None
+        self.session_id = None
+        self.server_facts = None
+        self.is_tenant_scope = False
+
+    def login(self, username, password):
+        self.cookies, self.token, self.session_id = {}, None, None
+        self.connection._auth = None
+
+        response, response_data = self.connection.send(
+            '/j_security_check', urlencode({'j_username': username, 'j_password': password}), method='POST',
+            headers={'Content-Type': 'application/x-www-form-urlencoded'}
+        )
+        if response.getcode() != 200 or is_login_page(to_text(response_data.getvalue())):
+            raise AnsibleAuthenticationFailure(f'Login to {self.connection._url} failed, check credentials')
+
+        self.server_facts = self.dataservice_get('client/server').get('data')
+        if self.server_facts is None:
+            raise AnsibleConnectionFailure('Could not retrieve vManage server information')
+
+        # Token mechanism introduced in 19.2
+        self.token = self.server_facts.get('CSRFToken')
+        self.connection._auth = self.auth_headers()
+
+        tenant_name = self.get_option('tenant')
+        if tenant_name is not None:
+            self.select_tenant(tenant_name)
+
+    def select_tenant(self, tenant_name):
+        if self.server_facts.get('tenancyMode', '') != 'MultiTenant' or \
+                self.server_facts.get('userMode', '') != 'provider':
+            raise AnsibleConnectionFailure('Tenant is only applicable to provider accounts in multi-tenant deployments')
+
+        for tenant in self.dataservice_get('tenant').get('data') or []:
+            if tenant_name == tenant['name']:
+                response = self.dataservice_request('POST', f"tenant/{tenant['tenantId']}/vsessionid", '{}')
+                self.session_id = json.loads(response['text']).get('VSessionId')
+                self.is_tenant_scope = True
+                self.connection._auth = self.auth_headers()
+                break
+        else:
+            raise AnsibleConnectionFailure(f'Invalid tenant: {tenant_name}')
+
+    def logout(self):
+        if not self.cookies:
+            return
+        try:
+            self.connection.send(f"/logout?{urlencode({'nocache': str(int(time()))})}", None, method='GET')
+        except AnsibleConnectionFailure:
+            pass
+        self.cookies, self.token, self.session_id = {}, None, None
+
+    def auth_headers(self):
+        headers = {
+            'Cookie': '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        }
+        if self.token is not None:
+            headers['X-XSRF-TOKEN'] = self.token
+        if self.session_id is not None:
+            headers['VSessionId'] = self.session_id
+
+        return headers
+
+    def update_auth(self, response, response_text):
+        set_cookies = response.info().get_all('Set-Cookie') or []
+        if not set_cookies:
+            return None
+
+        for set_cookie in set_cookies:
+            name, _, value = set_cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value.strip()
+
+        return self.auth_headers()
+
+    def handle_httperror(self, exc):
+        # Let the caller handle HTTP errors from the response status code
+        return exc
+
+    def dataservice_request(self, method, path, data=None):
+        response, response_data = self.connection.send(f'/dataservice/{path}', data, method=method,
+                                                        headers=JSON_HEADERS)
+        return {
+            'status': response.getcode(),
+            'reason': to_text(response.reason),
+            'text': to_text(response_data.getvalue()),
+        }
+
+    def dataservice_get(self, path):
+        response = self.dataservice_request('GET', path)
+        if response['status'] != 200 or is_login_page(response['text']):
+            raise AnsibleConnectionFailure(f"vManage request failed ({response['status']}): GET {path}")
+
+        return json.loads(response['text'])
+
+    def send_request(self, data, path, method='GET'):
+        """
+        Send a request to vManage dataservice API. If the session has expired, login is performed again and the
+        request is resent.
+        @param data: JSON encoded request payload or None
+        @param path: Path under /dataservice, including the query string if any
+        @param method: HTTP method
+        @return: Dict with status, reason and text of the response
+        """
+        response = self.dataservice_request(method, path, data)
+        if is_login_page(response['text']):
+            self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+            response = self.dataservice_request(method, path, data)
+
+        return response
+
+    def get_session_facts(self):
+        """
+        Information about the vManage session held by this connection, performing login if not done yet
+        @return: Dict with base_url, server_facts and is_tenant_scope
+        """
+        if self.server_facts is None:
+            # First request on the connection triggers the login
+            self.send_request(None, 'client/server')
+
+        return {
+            'base_url': self.connection._url,
+            'server_facts': self.server_facts,
+            'is_tenant_scope': self.is_tenant_scope,
+        }
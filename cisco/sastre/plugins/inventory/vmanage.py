@@ -0,0 +1,198 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+DOCUMENTATION = """
+name: vmanage
+version_added: "1.0.20"
+short_description: SD-WAN devices from vManage as Ansible inventory
+description:
+    - Builds an inventory of SD-WAN devices known to vManage, one host per device named after the device hostname.
+      Devices without hostname (e.g. WAN edges not yet provisioned) are named after their system ip, or their uuid if
+      they have no system ip either.
+    - Hosts are grouped by site id, device type, model and software version. Group names are prefixed with site_,
+      type_, model_ and version_ respectively.
+    - Each host gets the uuid, system_ip, site_id, state, model, version and device_type variables.
+    - Results can be cached with Ansible inventory cache plugins (e.g. jsonfile, redis, memory), so that vManage is
+      only queried once per cache_timeout.
+    - The inventory source file name must end with vmanage.yml or vmanage.yaml.
+extends_documentation_fragment:
+    - constructed
+    - inventory_cache
+options:
+    plugin:
+        description: Token that ensures this is a source file for the cisco.sastre.vmanage plugin.
+        required: true
+        choices: ['cisco.sastre.vmanage']
+    address:
+        description: vManage IP address or, if DNS is available, FQDN.
+        type: str
+        env:
+            - name: VMANAGE_IP
+    user:
+        description: Username used for vManage authentication.
+        type: str
+        env:
+            - name: VMANAGE_USER
+    password:
+        description: Password used for vManage authentication.
+        type: str
+        env:
+            - name: VMANAGE_PASSWORD
+    tenant:
+        description: vManage tenant name, only applicable to provider accounts in multi-tenant deployments.
+        type: str
+    port:
+        description: vManage port number.
+        type: int
+        default: 443
+        env:
+            - name: VMANAGE_PORT
+    timeout:
+        description: vManage REST API timeout in seconds.
+        type: int
+        default: 300
+    session_broker:
+        description: Unix socket path of a running session broker, from which an authenticated session is borrowed.
+        type: str
+        env:
+            - name: SASTRE_SESSION_BROKER
+    session_cache:
+        description: Reuse an authenticated vManage session from the on-disk session cache.
+        type: bool
+        default: false
+        env:
+            - name: SASTRE_SESSION_CACHE
+    group_by:
+        description: Device attributes used to create groups.
+        type: list
+        elements: str
+        choices: ['site_id', 'device_type', 'model', 'version']
+        default: ['site_id', 'device_type', 'model', 'version']
+    regex:
+        description: Regular expression matching on the device name to include.
+        type: str
+    not_regex:
+        description: Regular expression matching on the device name to not include.
+        type: str
+    reachable:
+        description: When set to true, only include devices in reachable state.
+        type: bool
+        default: false
+    site:
+        description: Include devices matching this site id.
+        type: str
+    device_type:
+        description: >
+            Match on device type to include. Supported values are 'vmanage', 'vsmart', 'vbond', 'vedge', 'cedge'
+        type: str
+"""
+
+EXAMPLES = """
+# vmanage.yml
+plugin: cisco.sastre.vmanage
+address: 198.18.1.10
+user: admin
+password: admin
+device_type: cedge
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: ~/.ansible/inventory_cache
+cache_timeout: 3600
+keyed_groups:
+  - key: state
+    prefix: state
+"""
+
+from ansible.errors import AnsibleParserError
+from ansible.plugins.inventory import BaseInventoryPlugin, Constructable, Cacheable
+from ansible.utils.display import Display
+from pydantic import ValidationError
+from cisco_sdwan.base.rest_api import RestAPIException
+from cisco_sdwan.tasks.common import TaskException
+from ansible_collections.cisco.sastre.plugins.module_utils.common import module_params
+from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import get_matched_devices, InventoryArgs
+
+display = Display()
+
+GROUP_PREFIXES = {
+    'site_id': 'site',
+    'device_type': 'type',
+    'model': 'model',
+    'version': 'version',
+}
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
+    NAME = 'cisco.sastre.vmanage'
+
+    def verify_file(self, path):
+        return super().verify_file(path) and path.endswith(('vmanage.yml', 'vmanage.yaml'))
+
+    def parse(self, inventory, loader, path, cache=True):
+        super().parse(inventory, loader, path, cache)
+        self._read_config_data(path)
+
+        cache_key = self.get_cache_key(path)
+        use_cache = self.get_option('cache') and cache
+        update_cache = self.get_option('cache') and not cache
+
+        device_list = None
+        if use_cache:
+            try:
+                device_list = self._cache[cache_key]
+            except KeyError:
+                update_cache = True
+
+        if device_list is None:
+            device_list = self.fetch_devices()
+
+        if update_cache:
+            self._cache[cache_key] = device_list
+
+        self.populate(device_list)
+
+    def fetch_devices(self):
+        module_param_dict = {
+            option: self.get_option(option)
+            for option in ('address', 'user', 'password', 'tenant', 'port', 'timeout', 'session_broker',
+                           'session_cache')
+        }
+        filter_param_dict = {
+            option: self.get_option(option) for option in ('regex', 'not_regex', 'reachable', 'site', 'device_type')
+        }
+        try:
+            task_args = InventoryArgs(**module_params('regex', 'not_regex', 'reachable', 'site', 'device_type',
+                                                      module_param_dict=filter_param_dict))
+            return get_matched_devices(module_param_dict, task_args)
+        except ValidationError as ex:
+            raise AnsibleParserError(f"Invalid vmanage inventory parameter: {ex}")
+        except (RestAPIException, ConnectionError, TaskException) as ex:
+            raise AnsibleParserError(f"vManage inventory error: {ex}") from None
+
+    def populate(self, device_list):
+        group_by = self.get_option('group_by')
+        strict = self.get_option('strict')
+        for device in device_list:
+            name = device.get('name') or device.get('system_ip') or device.get('uuid')
+            if not name:
+                display.warning(f"Skipping vManage device without hostname, system ip or uuid: {device}")
+                continue
+            if name != device.get('name'):
+                display.vvv(f"vManage device {name} has no hostname, named after its system ip or uuid")
+
+            host_name = self.inventory.add_host(name)
+            host_vars = {key: value for key, value in device.items() if key != 'name'}
+            for key, value in host_vars.items():
+                self.inventory.set_variable(host_name, key, value)
+
+            for attribute in group_by:
+                if device.get(attribute) is None:
+                    continue
+                group_name = self.inventory.add_group(
+                    self._sanitize_group_name(f"{GROUP_PREFIXES[attribute]}_{device[attribute]}")
+                )
+                self.inventory.add_child(group_name, host_name)
+
+            self._set_composite_vars(self.get_option('compose'), host_vars, host_name, strict=strict)
+            self._add_host_to_composed_groups(self.get_option('groups'), host_vars, host_name, strict=strict)
+            self._add_host_to_keyed_groups(self.get_option('keyed_groups'), host_vars, host_name, strict=strict)
@@ -7,8 +7,12 @@ from ansible.utils.display import Display
 from ansible.plugins.lookup import LookupBase
 from pydantic import ValidationError
 from ansible_collections.cisco.sastre.plugins.module_utils.common import module_params
-from ansible_collections.cisco.sastre.plugins.module_utils.common_lookup import is_mutually_exclusive, get_lookup_args
-from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import get_matched_devices, InventoryArgs
+from ansible_collections.cisco.sastre.plugins.module_utils.common_lookup import (
+    is_mutually_exclusive, get_lookup_args, lookup_session
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import (
+    DeviceFilter, matched_devices, device_cache, InventoryArgs
+)
 
 DOCUMENTATION = """
 lookup: devices
@@ -25,6 +29,8 @@ description:
       - vmanage_port
       - tenant
       - timeout
+      - sastre_session_broker (optional, Unix socket path of a running session broker)
+      - sastre_session_cache (optional, reuse authenticated session from the session cache, default true)
 options:
     device_type:
         description: >
@@ -57,6 +63,20 @@ options:
             Include devices matching this system ip.
         required: False
         type: str
+    max_age:
+        description: >
+            Maximum age in seconds of cached device data. When greater than 0, the vManage device list and device
+            models are cached in-process and on disk, and lookups within this period are answered from the cache,
+            regardless of filters. Default 0 disables caching.
+        required: False
+        type: int
+        default: 0
+    refresh:
+        description: >
+            When set to true, cached device data is not used and the cache is updated from vManage.
+        required: False
+        type: bool
+        default: False
 """
 EXAMPLES = """
     - name: Fetch devices for vedge device type
@@ -86,7 +106,15 @@ class LookupModule(LookupBase):
         try:
             task_args = InventoryArgs(**module_params('regex_list', 'regex', 'not_regex', 'reachable', 'site',
                                                       'system_ip', 'device_type', module_param_dict=kwargs))
-            device_list = get_matched_devices(get_lookup_args(variables), task_args)
+            device_filter = DeviceFilter(task_args)
+            lookup_args = get_lookup_args(variables)
+            cache = device_cache(dict(lookup_args, max_age=self.get_option('max_age'),
+                                      refresh=self.get_option('refresh')))
+            device_data = cache.get()
+            if device_data is None:
+                with lookup_session(lookup_args) as api:
+                    device_data = cache.fetch(api, device_filter.query_params)
+            device_list = matched_devices(device_data, device_filter)
             display.display(f"Matched devices: {len(device_list)}")
         except ValidationError as ex:
             raise AnsibleLookupError(ex)
@@ -8,11 +8,11 @@ from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowRealtimeArgs
 from ansible_collections.cisco.sastre.plugins.module_utils.common_lookup import (
     run_task, get_lookup_args, validate_show_type_args, validate_show_mandatory_args, set_show_default_args,
     is_mutually_exclusive
 )
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow, ShowRealtimeArgs
 
 DOCUMENTATION = """
 lookup: realtime
@@ -28,6 +28,8 @@ description:
       - vmanage_port
       - tenant
       - timeout
+      - sastre_session_broker (optional, Unix socket path of a running session broker)
+      - sastre_session_cache (optional, reuse authenticated session from the session cache, default true)
 options:
     regex:
         description: Regular expression matching device name, type or model to display
@@ -57,13 +59,51 @@ options:
                 Command options are app-route sla-class, app-route stats, bfd sessions, control connections, 
                 control local-properties, dpi summary, interface info, omp adv-routes, 
                 omp peers, omp summary, software info, system status, tunnel stats.
-        required: True
+                Either cmd or commands is required.
+        required: false
+        type: list
+    commands:
+        description: >
+                List of groups or specific commands to execute, e.g. ['bfd', 'control connections']. Devices are
+                selected once and shared by all commands. Mutually exclusive with cmd.
+        required: false
         type: list
+        elements: str
     detail:
         description: Detailed output.
         required: false
         type: bool
         default: False
+    workers:
+        description: Maximum number of realtime requests sent to vManage concurrently, across all devices and commands.
+        required: false
+        type: int
+        default: 10
+    device_timeout:
+        description: >
+                Timeout in seconds for each device, covering all realtime commands sent to it. Commands not
+                completed within this time are skipped. Default is the vManage REST API timeout, applied to each
+                request.
+        required: false
+        type: int
+    max_age:
+        description: >
+                Maximum age in seconds of memoized results. When greater than 0, results are saved on disk and
+                lookups with identical arguments against the same vManage within this period reuse them. Concurrent
+                identical lookups, e.g. from multiple hosts in a play, wait for the first one instead of querying
+                vManage again. Default 0 disables memoization.
+        required: false
+        type: int
+        default: 0
+    table_format:
+        description: >
+                Layout of returned tables. rows returns table data as a list of row dicts, keyed by column id.
+                columnar returns column ids once in columns and table data as a list of row value lists in rows,
+                which is much smaller for large results.
+        required: false
+        type: str
+        choices: ['rows', 'columnar']
+        default: rows
 """
 
 EXAMPLES = """
@@ -97,7 +137,8 @@ class LookupModule(LookupBase):
 
         try:
             task_args = ShowRealtimeArgs(**set_show_default_args(**kwargs))
-            task_output = run_task(TaskShow, task_args, get_lookup_args(variables))
+            task_output = run_task(TaskShow, task_args, get_lookup_args(variables), self.get_option('max_age'),
+                                   self.get_option('table_format'))
 
         except ValidationError as ex:
             raise AnsibleLookupError(f"Invalid show realtime parameter: {ex}") from None
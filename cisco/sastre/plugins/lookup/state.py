@@ -8,11 +8,11 @@ from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowStateArgs
 from ansible_collections.cisco.sastre.plugins.module_utils.common_lookup import (
     run_task, get_lookup_args, validate_show_type_args, validate_show_mandatory_args, set_show_default_args,
     is_mutually_exclusive
 )
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow, ShowStateArgs
 
 DOCUMENTATION = """
 lookup: state
@@ -28,6 +28,8 @@ description:
       - vmanage_port
       - tenant
       - timeout
+      - sastre_session_broker (optional, Unix socket path of a running session broker)
+      - sastre_session_cache (optional, reuse authenticated session from the session cache, default true)
 options:
     regex:
         description: Regular expression matching device name, type or model to display
@@ -56,13 +58,39 @@ options:
                 Group options are all, bfd, control, interface, omp, system. 
                 Command options are bfd sessions, control connections, control local-properties, interface cedge,
                 interface vedge, omp peers, system info.
-        required: True
+                Either cmd or commands is required.
+        required: false
         type: list
+    commands:
+        description: >
+                List of groups or specific commands to execute, e.g. ['bfd', 'control connections']. Devices are
+                selected once and shared by all commands. Mutually exclusive with cmd.
+        required: false
+        type: list
+        elements: str
     detail:
         description: Detailed output.
         required: false
         type: bool
         default: False
+    max_age:
+        description: >
+                Maximum age in seconds of memoized results. When greater than 0, results are saved on disk and
+                lookups with identical arguments against the same vManage within this period reuse them. Concurrent
+                identical lookups, e.g. from multiple hosts in a play, wait for the first one instead of querying
+                vManage again. Default 0 disables memoization.
+        required: false
+        type: int
+        default: 0
+    table_format:
+        description: >
+                Layout of returned tables. rows returns table data as a list of row dicts, keyed by column id.
+                columnar returns column ids once in columns and table data as a list of row value lists in rows,
+                which is much smaller for large results.
+        required: false
+        type: str
+        choices: ['rows', 'columnar']
+        default: rows
 """
 
 EXAMPLES = """
@@ -96,7 +124,8 @@ class LookupModule(LookupBase):
 
         try:
             task_args = ShowStateArgs(**set_show_default_args(**kwargs))
-            task_output = run_task(TaskShow, task_args, get_lookup_args(variables))
+            task_output = run_task(TaskShow, task_args, get_lookup_args(variables), self.get_option('max_age'),
+                                   self.get_option('table_format'))
 
         except ValidationError as ex:
             raise AnsibleLookupError(f"Invalid show state parameter: {ex}") from None
@@ -8,11 +8,11 @@ from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowStatisticsArgs
 from ansible_collections.cisco.sastre.plugins.module_utils.common_lookup import (
     run_task, get_lookup_args, validate_show_type_args, validate_show_mandatory_args, set_show_default_args,
     is_mutually_exclusive
 )
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow, ShowStatisticsArgs
 
 DOCUMENTATION = """
 lookup: statistics
@@ -28,6 +28,8 @@ description:
       - vmanage_port
       - tenant
       - timeout
+      - sastre_session_broker (optional, Unix socket path of a running session broker)
+      - sastre_session_cache (optional, reuse authenticated session from the session cache, default true)
 options:
     regex:
         description: Regular expression matching device name, type or model to display
@@ -55,8 +57,16 @@ options:
                 Group of, or specific command to execute. 
                 Group options are all, app-route, interface, system. 
                 Command options are app-route stats, interface info, system status.
-        required: True
+                Either cmd or commands is required.
+        required: false
         type: list
+    commands:
+        description: >
+                List of groups or specific commands to execute, e.g. ['bfd', 'control connections']. Devices are
+                selected once and shared by all commands. Mutually exclusive with cmd.
+        required: false
+        type: list
+        elements: str
     detail:
         description: Detailed output.
         required: false
@@ -72,6 +82,44 @@ options:
         required: false
         type: int
         default: 0
+    shard:
+        description: >
+                Split the statistics query time range into sub-ranges of this interval, retrieved concurrently and
+                merged in time order. Interval is a number followed by m (minutes), h (hours) or d (days), e.g. 30m.
+                The query time range is fixed at 2 hours, ending days/hours ago. Shard must be less than 2 hours.
+        required: false
+        type: str
+    aggregate:
+        description: >
+                Return min, avg, max and/or p95 of the numeric fields of each command per device and time series (e.g.
+                per interface for interface info), over the query time range or per bucket interval, instead of
+                averages of the newest samples.
+        required: false
+        type: list
+        elements: str
+    bucket:
+        description: >
+                Time interval to group samples by when aggregate is set, e.g. 15m. Requires aggregate.
+        required: false
+        type: str
+    max_age:
+        description: >
+                Maximum age in seconds of memoized results. When greater than 0, results are saved on disk and
+                lookups with identical arguments against the same vManage within this period reuse them. Concurrent
+                identical lookups, e.g. from multiple hosts in a play, wait for the first one instead of querying
+                vManage again. Default 0 disables memoization.
+        required: false
+        type: int
+        default: 0
+    table_format:
+        description: >
+                Layout of returned tables. rows returns table data as a list of row dicts, keyed by column id.
+                columnar returns column ids once in columns and table data as a list of row value lists in rows,
+                which is much smaller for large results.
+        required: false
+        type: str
+        choices: ['rows', 'columnar']
+        default: rows
 """
 
 EXAMPLES = """
@@ -116,7 +164,8 @@ class LookupModule(LookupBase):
 
         try:
             task_args = ShowStatisticsArgs(**set_show_default_args(**kwargs))
-            task_output = run_task(TaskShow, task_args, get_lookup_args(variables))
+            task_output = run_task(TaskShow, task_args, get_lookup_args(variables), self.get_option('max_age'),
+                                   self.get_option('table_format'))
 
         except ValidationError as ex:
             raise AnsibleLookupError(f"Invalid show statistics parameter: {ex}") from None
@@ -1,10 +1,22 @@
 import logging
+from contextlib import contextmanager
 from logging.handlers import QueueHandler
+from pathlib import Path
 from queue import SimpleQueue, Empty
-from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.basic import env_fallback, missing_required_lib
 from cisco_sdwan.tasks.common import TaskException, Table
 from cisco_sdwan.base.rest_api import Rest
 from cisco_sdwan.__main__ import VMANAGE_PORT, REST_TIMEOUT
+from .common_cache import checkpoint_lock, save_checkpoint
+from .common_session import SessionRest, cached_session
+from .common_httpapi import ConnectionRest
+from .common_output import (
+    COMPRESS_FORMATS, HAS_PARQUET, HAS_PYARROW, HAS_ZSTD, OUTPUT_FORMATS, OUTPUT_MODES, TABLE_FORMATS, export_arrow,
+    export_compressed, export_tables, table_dict
+)
+from .session_broker import (
+    broker_session_state, broker_release, broker_invalidate, BrokerException, BrokerUnavailableException
+)
 
 
 class MemoryLogHandler(QueueHandler):
@@ -32,9 +44,27 @@ def common_arg_spec():
         tenant=dict(type="str"),
         port=dict(type="int", default=VMANAGE_PORT, fallback=(env_fallback, ['VMANAGE_PORT'])),
         timeout=dict(type="int", default=REST_TIMEOUT),
+        session_broker=dict(type="str", fallback=(env_fallback, ['SASTRE_SESSION_BROKER'])),
+        session_cache=dict(type="bool", default=False, fallback=(env_fallback, ['SASTRE_SESSION_CACHE'])),
     )
 
 
+def output_arg_spec():
+    return dict(
+        output_file=dict(type="str"),
+        output_format=dict(type="str", default="jsonl", choices=list(OUTPUT_FORMATS)),
+        output=dict(type="str", default="both", choices=list(OUTPUT_MODES)),
+        table_format=dict(type="str", default="rows", choices=list(TABLE_FORMATS)),
+        compress=dict(type="str", choices=list(COMPRESS_FORMATS)),
+    )
+
+
+# Modules with output_arg_spec: compress applies to files exported with save_csv or save_json, requires either one
+OUTPUT_REQUIRED_IF = [
+    ('compress', compress_format, ('save_csv', 'save_json'), True) for compress_format in COMPRESS_FORMATS
+]
+
+
 def module_params(*param_names, module_param_dict):
     return {
         name: module_param_dict.get(name) for name in param_names if module_param_dict.get(name) is not None
@@ -62,24 +92,140 @@ def sdwan_api_args(module_param_dict):
     return api_args
 
 
-def run_task(task_cls, task_args, module_param_dict):
+@contextmanager
+def api_session(module_param_dict, socket_path=None):
+    """
+    Context manager providing a Rest API object to vManage. When running under an httpapi persistent connection
+    (socket_path provided), requests are sent over that connection. When a session broker is configured, an
+    authenticated session is borrowed from it, and returned on exit. Sessions rejected by vManage during the task are
+    invalidated in the broker, which performs a new login on the next request. Otherwise, when session cache is
+    enabled, a cached session is reused. Failing those, a new login is performed.
+    """
+    if socket_path is not None:
+        with ConnectionRest(socket_path, timeout=module_param_dict['timeout']) as api:
+            yield api
+        return
+
+    api_args = sdwan_api_args(module_param_dict=module_param_dict)
+
+    broker_socket = module_param_dict.get('session_broker')
+    if broker_socket:
+        try:
+            state, lease = broker_session_state(broker_socket, api_args)
+        except BrokerUnavailableException as ex:
+            logging.getLogger(__name__).warning(f"{ex}, performing direct login")
+        else:
+            api = SessionRest(api_args['base_url'], state, timeout=api_args['timeout'])
+            try:
+                with api:
+                    yield api
+            finally:
+                try:
+                    if api.auth_failed:
+                        broker_invalidate(broker_socket, api_args)
+                    broker_release(broker_socket, lease)
+                except BrokerException as ex:
+                    logging.getLogger(__name__).warning(f"Failed returning session to broker: {ex}")
+            return
+
+    if module_param_dict.get('session_cache'):
+        with cached_session(api_args) as api:
+            yield api
+        return
+
+    with Rest(**api_args) as api:
+        yield api
+
+
+def exit_module(module, result):
+    """
+    Exit an Ansible module with the result returned by its run_module function
+    """
+    if result.get('failed'):
+        module.fail_json(**result)
+
+    module.exit_json(**result)
+
+
+def run_task(task_cls, task_args, module_param_dict, socket_path=None, check_mode=False):
+    """
+    Run a Sastre task, returning the module result. With checkpoint_file, the checkpoint is locked from before the task
+    loads it until the new checkpoint is saved, so that concurrent runs with the same checkpoint_file do not retrieve
+    the same records. The checkpoint is only saved once task results have been returned or saved to files, and not in
+    check mode.
+    """
+    checkpoint_file = module_param_dict.get('checkpoint_file')
+    if checkpoint_file is None:
+        return execute_task(task_cls, task_args, module_param_dict, socket_path)
+
+    with checkpoint_lock(Path(checkpoint_file).expanduser().resolve()):
+        result = execute_task(task_cls, task_args, module_param_dict, socket_path)
+        if result.get('checkpoint') is not None and not check_mode:
+            save_checkpoint(checkpoint_file, result['checkpoint'])
+
+    return result
+
+
+def execute_task(task_cls, task_args, module_param_dict, socket_path=None):
+    if module_param_dict.get('save_parquet') is not None and not HAS_PYARROW:
+        raise TaskException(missing_required_lib('pyarrow'))
+
+    compress = module_param_dict.get('compress')
+    if compress == 'zstd' and not HAS_ZSTD:
+        raise TaskException(missing_required_lib('zstandard'))
+
+    save_task_args = None
+    if compress is not None and (getattr(task_args, 'save_csv', None) is not None or
+                                 getattr(task_args, 'save_json', None) is not None):
+        # Task returns its tables, which are then saved here through the compressor
+        save_task_args = task_args
+        task_args = task_args.model_copy(update={'save_csv': None, 'save_json': None})
+
     task = task_cls()
     if task.is_api_required(task_args):
-        with Rest(**sdwan_api_args(module_param_dict=module_param_dict)) as api:
+        with api_session(module_param_dict, socket_path) as api:
             task_output = task.runner(task_args, api)
     else:
         task_output = task.runner(task_args)
 
     result = {}
+    tables = [entry for entry in task_output or [] if isinstance(entry, Table)]
+    if module_param_dict.get('save_parquet') is not None:
+        export_arrow(tables, module_param_dict['save_parquet'], getattr(task_args, 'subtask_info', None))
+        task.log_info(f"Tables exported as {'Parquet' if HAS_PARQUET else 'Arrow IPC'} files under directory "
+                      f"'{module_param_dict['save_parquet']}'")
+
+    if save_task_args is not None:
+        result["saved_files"] = export_compressed(tables, task_cls, save_task_args, compress)
+        task.log_info(f"Tables exported as {compress} compressed files: {', '.join(result['saved_files'])}")
+
+    if module_param_dict.get('output_file') is not None:
+        result["output_file"] = module_param_dict['output_file']
+        result["output_summary"] = export_tables(tables, module_param_dict['output_file'],
+                                                 module_param_dict.get('output_format') or 'jsonl')
+
+    if (module_param_dict.get('save_parquet') is not None or module_param_dict.get('output_file') is not None or
+            save_task_args is not None):
+        # Tables saved to files are not returned
+        task_output = [entry for entry in task_output or [] if not isinstance(entry, Table)]
+
+    output = module_param_dict.get('output') or 'both'
     if task_output:
-        result["stdout"] = "\n\n".join(str(entry) for entry in task_output)
-        for entry in task_output:
-            if isinstance(entry, Table):
-                result.setdefault("tables", []).append(entry.dict())
+        # Tables are only rendered as text with output text or both, other entries are always included in stdout
+        text_output = [entry for entry in task_output if output in ('both', 'text') or not isinstance(entry, Table)]
+        if text_output:
+            result["stdout"] = "\n\n".join(str(entry) for entry in text_output)
+        if output in ('both', 'tables'):
+            table_format = module_param_dict.get('table_format') or 'rows'
+            for entry in task_output:
+                if isinstance(entry, Table):
+                    result.setdefault("tables", []).append(table_dict(entry, table_format))
 
     if task.is_dryrun:
         result['stdout'] = result.get("stdout", "") + str(task.dryrun_report)
 
+    result.update(getattr(task, 'result_info', {}))
+
     result["trace"] = list(log_handler.message_iter())
     result["msg"] = f"Task completed {task.outcome('successfully', 'with caveats: {tally}')}"
 
@@ -0,0 +1,591 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent import futures
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Optional, Union
+from typing_extensions import Annotated
+from uuid import uuid4
+from pydantic import Field, field_validator, model_validator
+from cisco_sdwan.base.catalog import catalog_iter, CATALOG_TAG_ALL
+from cisco_sdwan.base.models_base import DATA_DIR, ServerInfo
+from cisco_sdwan.base.models_vmanage import (
+    DeviceConfig, DeviceConfigRFS, DeviceTemplate, DeviceTemplateAttached, DeviceTemplateValues, EdgeInventory,
+    ControlInventory, EdgeCertificate, ConfigGroup, ConfigGroupValues, ConfigGroupAssociated, ConfigGroupRules
+)
+from cisco_sdwan.base.rest_api import Rest, RestAPIException
+from cisco_sdwan.tasks.common import regex_search, clean_dir, archive_create
+from cisco_sdwan.tasks.implementation import TaskBackup as SastreTaskBackup, BackupArgs as SastreBackupArgs
+from .common_cache import concurrency_slot
+from .common_show import size_connection_pool
+
+# Index entry fields updated by vManage whenever the respective item is modified
+INDEX_UPDATE_TAGS = ('lastUpdatedOn', 'lastUpdated')
+
+# Item and running config requests pending per worker. Bounds the number of retrieved items held in memory.
+JOBS_PER_WORKER = 2
+
+
+def file_digest(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as read_f:
+        for chunk in iter(lambda: read_f.read(65536), b''):
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+def item_content(item):
+    """
+    @return: Content of the file written by item.save. DeviceConfig items save the device configuration text, other
+             items save their data as JSON.
+    """
+    if isinstance(item, DeviceConfig):
+        return item.data['config']
+
+    return json.dumps(item.data, indent=2)
+
+
+def index_entries(item_index):
+    """
+    @return: Dict of index entries keyed by item id
+    """
+    id_field = item_index.iter_fields[0]
+    return {entry.get(id_field): entry for entry in item_index.data if isinstance(entry, dict)}
+
+
+def link_file(source_path, target_path):
+    """
+    Hard-link target_path to source_path, copying it when source and target are on different file systems
+    @return: True if target_path was created, False if source_path could not be linked or copied
+    """
+    try:
+        os.link(source_path, target_path)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        try:
+            shutil.copyfile(source_path, target_path)
+        except OSError:
+            return False
+
+    return True
+
+
+def capped_call(slot_name, max_slots, fn, *args, **kwargs):
+    """
+    Call fn while holding one of max_slots concurrency slots associated with slot_name. Without limit when max_slots
+    is None.
+    """
+    if max_slots is None:
+        return fn(*args, **kwargs)
+
+    with concurrency_slot(slot_name, max_slots):
+        return fn(*args, **kwargs)
+
+
+def bounded_jobs(submit, job_iter, max_pending):
+    """
+    Submit jobs from job_iter, keeping at most max_pending of them submitted and not yet consumed
+    @param submit: Function submitting a request to the thread pool
+    @param job_iter: Iterable of (key, (fn, *args)) tuples, only advanced as jobs are consumed
+    @param max_pending: Maximum number of pending jobs
+    @return: Iterator of (key, future) tuples, in job_iter order
+    """
+    pending = deque()
+    for key, fn_args in job_iter:
+        pending.append((key, submit(*fn_args)))
+        if len(pending) >= max_pending:
+            yield pending.popleft()
+
+    while pending:
+        yield pending.popleft()
+
+
+def fetch_item(api, item_cls, item_id, base_item=None):
+    """
+    Retrieve an item together with its sub-items. Device templates have attached devices and values, config groups
+    with associated devices have associated devices, automated rules and values.
+    @param base_item: Item loaded from a previous backup. When provided, only its sub-items are retrieved. Config groups
+                      whose associated devices differ from the ones in base_item are retrieved again.
+    @return: (item, [(sub-item info, sub-item), ...]) tuple. Item or sub-items are None if they could not be
+             retrieved. Sub-items are the RestAPIException raised when their request failed.
+    """
+    item = base_item if base_item is not None else item_cls.get(api, item_id)
+
+    sub_items = []
+    if isinstance(item, DeviceTemplate):
+        devices_attached = DeviceTemplateAttached.get(api, item_id)
+        sub_items.append(('attached devices', devices_attached))
+        if devices_attached is not None and not devices_attached.is_empty:
+            try:
+                uuid_list = [uuid for uuid, _ in devices_attached]
+                values = DeviceTemplateValues(api.post(DeviceTemplateValues.api_params(item_id, uuid_list),
+                                                       DeviceTemplateValues.api_path.post))
+            except RestAPIException as ex:
+                values = ex
+            sub_items.append(('values', values))
+
+    associated = None
+    if isinstance(base_item, ConfigGroup):
+        # Device associations may change without changing the config group index entry
+        associated = ConfigGroupAssociated.get(api, configGroupId=item_id)
+        base_uuids = {entry.get('id') for entry in base_item.data.get('devices', [])}
+        if associated is None or set(associated.uuids) != base_uuids:
+            item = item_cls.get(api, item_id)
+
+    if isinstance(item, ConfigGroup) and item.devices_associated:
+        if associated is None:
+            associated = ConfigGroupAssociated.get(api, configGroupId=item_id)
+        sub_items.append(('associated devices', associated))
+        sub_items.extend(
+            (sub_item_info, sub_item_cls.get(api, configGroupId=item_id))
+            for sub_item_info, sub_item_cls in (('automated rules', ConfigGroupRules), ('values', ConfigGroupValues))
+        )
+
+    return item, sub_items
+
+
+class BackupManifest:
+    """
+    SHA-256 digest of each file saved to a backup workdir, keyed by file path relative to the workdir. Backups saved
+    to a content-addressed store only contain the manifest, with the store location relative to the workdir.
+    """
+    store_file = 'backup_manifest.json'
+
+    def __init__(self, files=None, store=None):
+        self.files = files or {}
+        self.store = store
+
+    @classmethod
+    def load(cls, workdir):
+        """
+        @param workdir: Backup directory, under DATA_DIR
+        @return: BackupManifest, or None if workdir has no (valid) manifest file
+        """
+        try:
+            with open(Path(DATA_DIR, workdir, cls.store_file)) as read_f:
+                data = json.load(read_f)
+            return cls(data['files'], data.get('store'))
+        except (FileNotFoundError, NotADirectoryError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self, workdir):
+        data = {'files': dict(sorted(self.files.items()))}
+        if self.store is not None:
+            data['store'] = self.store
+
+        Path(DATA_DIR, workdir).mkdir(parents=True, exist_ok=True)
+        with open(Path(DATA_DIR, workdir, self.store_file), 'w') as write_f:
+            json.dump(data, write_f, indent=2)
+
+
+def store_object_path(store_path, digest):
+    return Path(store_path, 'objects', digest[:2], digest)
+
+
+def materialize_backup(manifest, workdir_path, target_path):
+    """
+    Hard-link the files of a backup saved to a content-addressed store into target_path, with the same layout as a
+    regular backup workdir
+    @param manifest: BackupManifest of the backup
+    @param workdir_path: Path of the backup workdir, containing the manifest
+    @param target_path: Path of the directory where files are linked
+    @raise FileNotFoundError: If a file is missing from the store
+    """
+    store_path = Path(workdir_path, manifest.store)
+    for rel_path, digest in manifest.files.items():
+        file_path = Path(target_path, rel_path)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if not link_file(store_object_path(store_path, digest), file_path):
+            raise FileNotFoundError(f'Backup store "{store_path}" is missing {rel_path} ({digest})')
+
+
+@contextmanager
+def workdir_view(workdir):
+    """
+    Yield workdir as is if it is a regular backup directory. If workdir is a backup saved to a content-addressed
+    store, yield a temporary directory next to it, with the backup files hard-linked from the store. The temporary
+    directory is removed on exit.
+    @param workdir: Backup directory, under DATA_DIR. None is yielded as is.
+    @return: Backup directory to read from, under DATA_DIR
+    """
+    manifest = BackupManifest.load(workdir) if workdir is not None else None
+    if manifest is None or manifest.store is None:
+        yield workdir
+        return
+
+    workdir_path = Path(DATA_DIR, workdir)
+    with tempfile.TemporaryDirectory(prefix=f'{workdir_path.name}_', dir=workdir_path.parent) as view_dir:
+        materialize_backup(manifest, workdir_path, view_dir)
+        yield str(Path(workdir).with_name(Path(view_dir).name))
+
+
+class IncrementalWriter:
+    """
+    Saves backup items to workdir. Files whose content is the same as in the base backup are hard-linked to the base
+    backup files instead of being written.
+    """
+    def __init__(self, workdir, base_workdir=None):
+        """
+        @param workdir: Backup directory being saved, under DATA_DIR
+        @param base_workdir: Previous backup directory, under DATA_DIR. Either a regular backup or a backup saved to a
+                             content-addressed store, which is then linked to a temporary directory.
+        """
+        self.workdir_path = Path(DATA_DIR, workdir)
+        self.manifest = BackupManifest()
+        self.base_index_entries = {}
+        self.written = 0
+        self.linked = 0
+        self.fetch_skipped = 0
+
+        self.base_path = None
+        self.base_view = None
+        # Without a manifest, digests of base backup files are calculated as needed
+        self.base_manifest = None
+        if base_workdir is not None:
+            self.base_path = Path(DATA_DIR, base_workdir)
+            self.base_manifest = BackupManifest.load(self.base_path)
+            if self.base_manifest is not None and self.base_manifest.store is not None:
+                self.base_view = tempfile.TemporaryDirectory(prefix=f'{self.base_path.name}_',
+                                                             dir=self.base_path.resolve().parent)
+                materialize_backup(self.base_manifest, self.base_path, self.base_view.name)
+                self.base_path = Path(self.base_view.name)
+
+    def base_digest(self, rel_path):
+        if self.base_manifest is not None:
+            return self.base_manifest.files.get(rel_path)
+
+        base_file = Path(self.base_path, rel_path)
+        return file_digest(base_file) if base_file.is_file() else None
+
+    def write(self, rel_path, content):
+        """
+        Save content to rel_path under workdir, linking the file from the base backup when its content is unchanged
+        """
+        file_path = Path(self.workdir_path, rel_path)
+        digest = hashlib.sha256(content).hexdigest()
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if (self.base_path is not None and digest == self.base_digest(rel_path) and
+                link_file(Path(self.base_path, rel_path), file_path)):
+            self.linked += 1
+        else:
+            file_path.write_bytes(content)
+            self.written += 1
+        self.manifest.files[rel_path] = digest
+
+    def save(self, item, ext_name=False, item_name=None, item_id=None):
+        """
+        Same as item.save, via write
+        @return: True indicates data has been saved. False indicates no data to save (and no file has been created).
+        """
+        if item.is_empty:
+            return False
+
+        self.write(Path(*item.store_path, item.get_filename(ext_name, item_name, item_id)).as_posix(),
+                   item_content(item).encode())
+
+        return True
+
+    def unchanged_ids(self, index_cls, item_index):
+        """
+        Ids of items whose index entry, including the update timestamp set by vManage, is the same as in the base
+        backup index. Those can be loaded from the base backup instead of being retrieved from vManage. Items whose
+        index entry has no update timestamp (lastUpdatedOn or lastUpdated) are always retrieved.
+        @return: Set of item ids
+        """
+        if self.base_path is None:
+            return set()
+
+        if index_cls not in self.base_index_entries:
+            base_index = index_cls.load(str(self.base_path))
+            self.base_index_entries[index_cls] = index_entries(base_index) if base_index is not None else {}
+
+        base_entries = self.base_index_entries[index_cls]
+        return {
+            item_id for item_id, entry in index_entries(item_index).items()
+            if any(entry.get(tag) is not None for tag in INDEX_UPDATE_TAGS) and base_entries.get(item_id) == entry
+        }
+
+    def load_base(self, item_cls, ext_name, item_name, item_id):
+        """
+        @return: Item loaded from the base backup, or None if not found
+        """
+        item = item_cls.load(str(self.base_path), ext_name, item_name, item_id)
+        if item is not None:
+            self.fetch_skipped += 1
+
+        return item
+
+    def close(self):
+        self.manifest.save(self.workdir_path)
+        if self.base_view is not None:
+            self.base_view.cleanup()
+
+
+class StoreWriter(IncrementalWriter):
+    """
+    Saves backup files to a content-addressed store, each file content once under its SHA-256 digest. Workdir only
+    contains the backup manifest. Store files are read-only, as they are shared by all backups in the store.
+    """
+    def __init__(self, workdir, store, base_workdir=None):
+        """
+        @param workdir: Backup directory being saved, under DATA_DIR
+        @param store: Store directory, under DATA_DIR
+        @param base_workdir: Optional previous backup directory, used to avoid retrieving unchanged items
+        """
+        super().__init__(workdir, base_workdir)
+        self.store_path = Path(DATA_DIR, store)
+        self.manifest.store = os.path.relpath(self.store_path.resolve(), self.workdir_path.resolve())
+
+    def write(self, rel_path, content):
+        """
+        Save content to the store, unless already there. linked counts files already in the store.
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = store_object_path(self.store_path, digest)
+        if object_path.exists():
+            self.linked += 1
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            # Concurrent backups may save the same object, each one replaces it atomically with the same content
+            fd, tmp_path = tempfile.mkstemp(dir=object_path.parent, prefix='.tmp_')
+            try:
+                with os.fdopen(fd, 'wb') as write_f:
+                    write_f.write(content)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, object_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self.written += 1
+        self.manifest.files[rel_path] = digest
+
+
+class TaskBackup(SastreTaskBackup):
+    """
+    Same as Sastre TaskBackup, with concurrent requests, optional incremental backup from a previous backup workdir
+    and optional content-addressed backup store
+    """
+    def __init__(self):
+        super().__init__()
+        self.writer = None
+        self.result_info = {}
+
+    def save_item(self, item, workdir, ext_name=False, item_name=None, item_id=None):
+        if self.writer is None:
+            return item.save(workdir, ext_name, item_name, item_id)
+
+        return self.writer.save(item, ext_name, item_name, item_id)
+
+    def runner(self, parsed_args, api: Optional[Rest] = None) -> Union[None, list]:
+        """
+        Index and item requests are sent by a pool of parsed_args.workers threads, optionally capped to
+        parsed_args.vmanage_concurrency requests to the same vManage across all tasks. Index requests are submitted up
+        front. Item requests are submitted one index at a time, at most JOBS_PER_WORKER per worker ahead of the item
+        being saved. Items are saved, and logged, in the same order as when retrieved one at a time.
+        """
+        if parsed_args.archive:
+            self.log_info(f'Backup task: vManage URL: "{api.base_url}" -> Local archive file: "{parsed_args.archive}"')
+            parsed_args.workdir = str(uuid4())
+            self.log_debug(f'Temporary workdir: {parsed_args.workdir}')
+        else:
+            self.log_info(f'Backup task: vManage URL: "{api.base_url}" -> Local workdir: "{parsed_args.workdir}"')
+
+        base_workdir = parsed_args.incremental_from
+        is_base_workdir = (base_workdir is not None and
+                           Path(DATA_DIR, base_workdir).resolve() == Path(DATA_DIR, parsed_args.workdir).resolve())
+
+        # Backup workdir must be empty for a new backup
+        saved_workdir = clean_dir(parsed_args.workdir, max_saved=0 if parsed_args.no_rollover else 99)
+        if saved_workdir:
+            self.log_info(f'Previous backup under "{parsed_args.workdir}" was saved as "{saved_workdir}"')
+            if is_base_workdir:
+                # Incremental backup from the same workdir is based on the rolled over previous backup
+                base_workdir = str(Path(parsed_args.workdir).with_name(saved_workdir))
+
+        # First incremental backup, or previous backup removed. Also the case when incremental_from is the same as
+        # workdir and there was no previous backup to roll over.
+        if base_workdir is not None and not Path(DATA_DIR, base_workdir).is_dir():
+            self.log_warning(f'Incremental backup base "{base_workdir}" not found, saving a full backup')
+            base_workdir = None
+
+        if parsed_args.store is not None:
+            self.writer = StoreWriter(parsed_args.workdir, parsed_args.store, base_workdir)
+            self.log_info(f'Saving backup to store "{parsed_args.store}"')
+        elif parsed_args.incremental_from is not None:
+            # Full backups also save a manifest, to be used by the next incremental backup
+            self.writer = IncrementalWriter(parsed_args.workdir, base_workdir)
+        if base_workdir is not None:
+            self.log_info(f'Incremental backup from "{base_workdir}"')
+
+        target_info = ServerInfo(server_version=api.server_version)
+        if self.writer is not None:
+            self.writer.write(ServerInfo.store_file, json.dumps(target_info.data, indent=2).encode())
+            self.log_info('Saved vManage server information')
+        elif target_info.save(parsed_args.workdir):
+            self.log_info('Saved vManage server information')
+
+        size_connection_pool(api, parsed_args.workers)
+        max_pending = JOBS_PER_WORKER * parsed_args.workers
+        with futures.ThreadPoolExecutor(parsed_args.workers) as executor:
+            submit = partial(executor.submit, capped_call, api.base_url, parsed_args.vmanage_concurrency)
+
+            edge_certs_job = submit(EdgeCertificate.get, api) if CATALOG_TAG_ALL in parsed_args.tags else None
+            index_jobs = [
+                (info, index_cls, item_cls, submit(index_cls.get, api))
+                for _, info, index_cls, item_cls in catalog_iter(*parsed_args.tags, version=api.server_version)
+            ]
+
+            if parsed_args.save_running:
+                self.save_running_configs(
+                    bounded_jobs(submit, self.running_config_jobs(api), max_pending), parsed_args.workdir
+                )
+
+            # Backup items not registered to the catalog, but to be included when tag is 'all'
+            if edge_certs_job is not None:
+                edge_certs = edge_certs_job.result()
+                if edge_certs is None:
+                    self.log_error('Failed backup WAN edge certificates')
+                elif self.save_item(edge_certs, parsed_args.workdir):
+                    self.log_info('Saved WAN edge certificates')
+
+            # Backup items registered to the catalog. Items of an index are all saved before moving to the next index.
+            for info, index_cls, item_cls, index_job in index_jobs:
+                item_index = index_job.result()
+                if item_index is None:
+                    self.log_debug(f'Skipped {info}, item not supported by this vManage')
+                    continue
+                if self.save_item(item_index, parsed_args.workdir):
+                    self.log_info(f'Saved {info} index')
+
+                unchanged_ids = self.writer.unchanged_ids(index_cls, item_index) if self.writer is not None else set()
+
+                ext_name = item_index.need_extended_name
+                regex = parsed_args.regex or parsed_args.not_regex
+                matched_item_iter = (
+                    (item_id, item_name) for item_id, item_name in item_index
+                    if regex is None or regex_search(regex, item_name, inverse=parsed_args.regex is None)
+                )
+                # Unchanged items are loaded from the base backup as their jobs are submitted
+                item_job_iter = (
+                    ((item_id, item_name), (fetch_item, api, item_cls, item_id,
+                                            self.writer.load_base(item_cls, ext_name, item_name, item_id)
+                                            if item_id in unchanged_ids else None))
+                    for item_id, item_name in matched_item_iter
+                )
+                for (item_id, item_name), job in bounded_jobs(submit, item_job_iter, max_pending):
+                    item, sub_items = job.result()
+                    if item is None:
+                        self.log_error(f'Failed backup {info} {item_name}')
+                        continue
+                    if self.save_item(item, parsed_args.workdir, ext_name, item_name, item_id):
+                        self.log_info(f'Done {info} {item_name}')
+
+                    for sub_item_info, sub_item in sub_items:
+                        if isinstance(sub_item, RestAPIException):
+                            self.log_error(f'Failed backup {info} {item_name} {sub_item_info}: {sub_item}')
+                        elif sub_item is None:
+                            self.log_error(f'Failed backup {info} {item_name} {sub_item_info}')
+                        elif self.save_item(sub_item, parsed_args.workdir, ext_name, item_name, item_id):
+                            self.log_info(f'Done {info} {item_name} {sub_item_info}')
+                        elif isinstance(sub_item, DeviceTemplateAttached):
+                            self.log_debug(f'Skipped {info} {item_name} attached devices, none found')
+
+        if self.writer is not None:
+            self.writer.close()
+
+        if parsed_args.store is not None:
+            self.result_info["store"] = {
+                "path": parsed_args.store,
+                "written": self.writer.written,
+                "deduplicated": self.writer.linked,
+            }
+            self.log_info(f'Backup store: {self.writer.written} files written, {self.writer.linked} files already in '
+                          f'store')
+            if base_workdir is not None:
+                self.result_info["incremental"] = {
+                    "base_workdir": base_workdir,
+                    "fetch_skipped": self.writer.fetch_skipped,
+                }
+        elif self.writer is not None:
+            self.result_info["incremental"] = {
+                "base_workdir": base_workdir,
+                "written": self.writer.written,
+                "linked": self.writer.linked,
+                "fetch_skipped": self.writer.fetch_skipped,
+            }
+            self.log_info(f'Incremental backup: {self.writer.written} files written, {self.writer.linked} unchanged '
+                          f'files linked, {self.writer.fetch_skipped} unchanged items not retrieved')
+
+        if parsed_args.archive:
+            archive_create(parsed_args.archive, parsed_args.workdir)
+            self.log_info(f'Created archive file "{parsed_args.archive}"')
+            clean_dir(parsed_args.workdir, max_saved=0)
+            self.log_debug('Temporary workdir deleted')
+
+        return
+
+    def running_config_jobs(self, api: Rest):
+        """
+        CFS and RFS running configuration requests for all devices
+        @return: Iterator of ((hostname, uuid, config type), (fn, *args)) tuples, for bounded_jobs
+        """
+        inventory_list = [(ControlInventory.get(api), 'controller')]
+        if not api.is_provider or api.is_tenant_scope:
+            inventory_list.append((EdgeInventory.get(api), 'WAN edge'))
+
+        for inventory, info in inventory_list:
+            if inventory is None:
+                self.log_error(f'Failed retrieving {info} inventory')
+                continue
+
+            for uuid, _, hostname, _ in inventory.extended_iter():
+                if hostname is None:
+                    self.log_debug(f'Skipping {uuid}, no hostname')
+                    continue
+
+                for config_cls, config_type in ((DeviceConfig, 'CFS'), (DeviceConfigRFS, 'RFS')):
+                    yield (hostname, uuid, config_type), (config_cls.get, api, config_cls.api_params(uuid))
+
+    def save_running_configs(self, job_iter, workdir: str) -> None:
+        for (hostname, uuid, config_type), job in job_iter:
+            item = job.result()
+            if item is None:
+                self.log_error(f'Failed backup {config_type} device configuration {hostname}')
+                continue
+            if self.save_item(item, workdir, item_name=hostname, item_id=uuid):
+                self.log_info(f'Done {config_type} device configuration {hostname}')
+
+
+class BackupArgs(SastreBackupArgs):
+    incremental_from: Optional[str] = None
+    workers: Annotated[int, Field(ge=1, le=100)] = 1
+    vmanage_concurrency: Optional[Annotated[int, Field(ge=1)]] = None
+    store: Optional[str] = None
+
+    # Validators
+    @field_validator('store')
+    @classmethod
+    def validate_store(cls, v: Optional[str]) -> Optional[str]:
+        if v is not None and Path(DATA_DIR, v).is_file():
+            raise ValueError(f'Backup store "{v}" is not a directory')
+
+        return v
+
+    @model_validator(mode='after')
+    def incremental_validations(self) -> 'BackupArgs':
+        if (self.incremental_from is not None and self.workdir is not None and self.no_rollover and
+                Path(DATA_DIR, self.incremental_from).resolve() == Path(DATA_DIR, self.workdir).resolve()):
+            raise ValueError('Argument "incremental_from" must be a different directory than "workdir" when '
+                             '"no_rollover" is set')
+        if self.store is not None and self.archive is not None:
+            raise ValueError('Argument "store" is not allowed together with "archive"')
+
+        return self
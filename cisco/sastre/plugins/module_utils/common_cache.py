@@ -0,0 +1,134 @@
+import fcntl
+import hashlib
+import json
+import os
+import random
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_DIR_ENV = 'SASTRE_CACHE_DIR'
+
+
+def cache_dir(*sub_dirs):
+    """
+    Per-user cache directory, only accessible by the user running Ansible. Location can be changed via the
+    SASTRE_CACHE_DIR environment variable, default is $XDG_CACHE_HOME/sastre-ansible or ~/.cache/sastre-ansible.
+    @param sub_dirs: Optional subdirectories under the cache directory
+    @return: Path to the (created) cache directory
+    """
+    base_dir = os.environ.get(CACHE_DIR_ENV) or Path(os.environ.get('XDG_CACHE_HOME') or '~/.cache', 'sastre-ansible')
+    dir_path = Path(base_dir, *sub_dirs).expanduser()
+    dir_path.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    return dir_path
+
+
+def cache_salt():
+    """
+    Random salt created once per cache directory, used to derive credential digests included in cache keys
+    """
+    salt_path = cache_dir().joinpath('salt')
+    if not salt_path.exists():
+        fd, tmp_path = tempfile.mkstemp(dir=salt_path.parent, prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'w') as write_f:
+                write_f.write(os.urandom(16).hex())
+            # Linking fails if another process created the salt first, the existing salt is used in this case
+            os.link(tmp_path, salt_path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+
+    return salt_path.read_text()
+
+
+def cache_key(*key_fields):
+    """
+    Filename-safe key derived from one or more fields
+    """
+    return hashlib.sha256(json.dumps(key_fields).encode()).hexdigest()
+
+
+@contextmanager
+def file_lock(lock_path, shared=False):
+    """
+    Context manager holding an advisory lock on lock_path, which is created if needed. Used to serialize access to
+    cache entries across Ansible worker processes.
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def checkpoint_lock(checkpoint_path):
+    """
+    Advisory lock serializing access to a checkpoint file across Ansible worker processes
+    @param checkpoint_path: Resolved checkpoint file path
+    """
+    return file_lock(cache_dir('checkpoints').joinpath(f"{cache_key('checkpoint', str(checkpoint_path))}.lock"))
+
+
+def save_checkpoint(checkpoint_file, checkpoint):
+    """
+    Atomically save a checkpoint dict to checkpoint_file. Caller is to hold the checkpoint_lock of checkpoint_file
+    since the previous checkpoint was loaded.
+    """
+    save_json(Path(checkpoint_file).expanduser().resolve(), checkpoint)
+
+
+def load_json(file_path):
+    """
+    Load a JSON cache file
+    @return: Loaded data, or None if file does not exist or is not valid JSON
+    """
+    try:
+        with open(file_path) as read_f:
+            return json.load(read_f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_json(file_path, data):
+    """
+    Atomically save data to a JSON cache file only readable by the current user
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=Path(file_path).parent, prefix='.tmp_')
+    try:
+        with os.fdopen(fd, 'w') as write_f:
+            json.dump(data, write_f)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def concurrency_slot(name, max_slots):
+    """
+    Context manager holding one of max_slots advisory locks associated with name. Used to cap the number of concurrent
+    requests to the same vManage across threads and Ansible worker processes. When all slots are taken, waits on one
+    of them.
+    """
+    slot_dir = cache_dir('slots', cache_key(name))
+    slot_paths = [Path(slot_dir, f'slot_{index}.lock') for index in range(max_slots)]
+    random.shuffle(slot_paths)
+    for slot_path in slot_paths:
+        fd = os.open(slot_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            break
+        except BlockingIOError:
+            os.close(fd)
+    else:
+        fd = os.open(slot_paths[0], os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+    try:
+        yield
+    finally:
+        os.close(fd)
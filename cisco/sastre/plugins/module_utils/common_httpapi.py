@@ -0,0 +1,71 @@
+import json
+from urllib.parse import urlencode
+from ansible.module_utils.connection import Connection, ConnectionError as AnsibleConnectionError
+from cisco_sdwan.base.rest_api import Rest, RestAPIException, ServerRateLimitException, backoff_retry
+
+
+class ConnectionRest(Rest):
+    """
+    Rest API object sending requests over an Ansible persistent connection, using the cisco.sastre.vmanage httpapi
+    plugin. The vManage session is owned by the persistent connection, login and logout are not performed here.
+    """
+
+    def __init__(self, socket_path, timeout=20, verify=False):
+        # Not calling Rest.__init__ on purpose, login is performed by the persistent connection
+        self.connection = Connection(socket_path)
+        self.timeout = timeout
+        self.verify = verify
+        self.session = None
+
+        session_facts = self.rpc('get_session_facts')
+        self.base_url = session_facts['base_url']
+        self.server_facts = session_facts['server_facts']
+        self.is_tenant_scope = session_facts['is_tenant_scope']
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+    def rpc(self, name, *args, **kwargs):
+        try:
+            return getattr(self.connection, name)(*args, **kwargs)
+        except AnsibleConnectionError as ex:
+            raise RestAPIException(f'vManage connection error: {ex}') from None
+
+    def request(self, method, path_entries, input_data=None, params=None):
+        path = '/'.join(path.strip('/') for path in path_entries)
+        if params:
+            path = f'{path}?{urlencode(params)}'
+
+        response = self.rpc('send_request', json.dumps(input_data, indent=1) if input_data is not None else None,
+                            path=path, method=method)
+        if response['status'] != 200:
+            if response['status'] in {429, 503}:
+                raise ServerRateLimitException(f"Received rate-limit signal (status-code {response['status']})")
+
+            try:
+                reply_data = json.loads(response['text']) if response['text'] else {}
+            except ValueError:
+                reply_data = {'error': {'message': 'Check user permissions'}} if response['status'] == 403 else {}
+
+            details = reply_data.get("error", {}).get("details", "")
+            raise RestAPIException(f"{response['reason']} ({response['status']}): "
+                                   f'{reply_data.get("error", {}).get("message", "Unspecified error message")}'
+                                   f'{": " if details else ""}{details} [{method} {self._url(path)}]')
+
+        return json.loads(response['text']) if response['text'] else None
+
+    @backoff_retry
+    def get(self, *path_entries, **params):
+        return self.request('GET', path_entries, params=params)
+
+    @backoff_retry
+    def post(self, input_data, *path_entries):
+        return self.request('POST', path_entries, input_data=input_data)
+
+    @backoff_retry
+    def put(self, input_data, *path_entries):
+        return self.request('PUT', path_entries, input_data=input_data)
+
+    @backoff_retry
+    def delete(self, *path_entries, input_data=None, **params):
+        return self.request('DELETE', path_entries, input_data=input_data, params=params)
@@ -1,16 +1,33 @@
 #! /usr/bin/env python3
-from cisco_sdwan.base.rest_api import Rest
+import re
+from collections import defaultdict
+from pathlib import Path
+from time import time
 from typing import NamedTuple, List, Optional
 from typing_extensions import Annotated
 from cisco_sdwan.base.models_vmanage import Device
-from cisco_sdwan.tasks.common import regex_search
+from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.tasks.models import TaskArgs
 from cisco_sdwan.tasks.validators import validate_regex, validate_site_id, validate_ipv4
 from pydantic import field_validator, AfterValidator
-from .common import sdwan_api_args
+from .common import api_session
+from .common_cache import cache_dir, cache_key, file_lock, load_json, save_json
+from .common_session import credential_digest
 
 iter_fields = ('uuid', 'host-name', 'deviceId', 'site-id', 'reachability', 'device-type', 'device-model', 'version')
 
+BACKREFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=')
+
+# Equality filters that vManage device endpoint can apply server-side, mapped to the respective query parameter
+DEVICE_QUERY_PARAMS = {
+    'site_id': 'site-id',
+    'system_ip': 'system-ip',
+    'state': 'reachability',
+}
+
+# Device attributes kept in inventory snapshots, a device is reported as changed when any of them differs
+SNAPSHOT_FIELDS = ('name', 'system_ip', 'site_id', 'state', 'version')
+
 
 class DeviceInfo(NamedTuple):
     uuid: str
@@ -23,37 +40,320 @@ class DeviceInfo(NamedTuple):
     device_type: str
 
 
-def device_info_iter(api, cedge_models, task_args):
-    def device_type(device_class, device_model):
-        if device_class == 'vedge':
-            return 'cedge' if device_model in cedge_models else 'vedge'
-        return device_class
+class DeviceIndex:
+    """
+    Device entries with hash indexes on the attributes used by equality filters
+    """
+    indexed_fields = ('site_id', 'system_ip', 'device_type', 'state')
 
-    def match_name(device_name):
-        if task_args.regex_list is not None:
-            return any(regex_search(regex_entry, device_name) for regex_entry in task_args.regex_list)
+    def __init__(self, devices, cedge_models):
+        def device_type(device_class, device_model):
+            if device_class == 'vedge':
+                return 'cedge' if device_model in cedge_models else 'vedge'
+            return device_class
+
+        self.entries = [
+            DeviceInfo(uuid, name, system_ip, site_id, state, model, version, device_type(d_class, model))
+            for uuid, name, system_ip, site_id, state, d_class, model, version in devices.iter(*iter_fields)
+        ]
+        self.indexes = {field: defaultdict(list) for field in self.indexed_fields}
+        for position, entry in enumerate(self.entries):
+            for field, index in self.indexes.items():
+                index[getattr(entry, field)].append(position)
+
+    def candidates(self, equality_filters):
+        """
+        @param equality_filters: Dict of indexed field to required value
+        @return: List of entries matching all equality filters, in device list order
+        """
+        if not equality_filters:
+            return self.entries
+
+        position_lists = sorted((self.indexes[field].get(value, []) for field, value in equality_filters.items()),
+                                key=len)
+        positions = position_lists[0]
+        for other_positions in position_lists[1:]:
+            other_set = set(other_positions)
+            positions = [position for position in positions if position in other_set]
+
+        return [self.entries[position] for position in positions]
 
-        regex = task_args.regex or task_args.not_regex
-        return regex is None or regex_search(regex, device_name, inverse=task_args.regex is None)
 
-    for uuid, name, system_ip, site_id, state, d_class, model, version in Device.get_raise(api).iter(*iter_fields):
-        d_type = device_type(d_class, model)
-        if (match_name(name) and (not task_args.reachable or state == 'reachable') and
-                (task_args.site is None or site_id == task_args.site) and
-                (task_args.system_ip is None or system_ip == task_args.system_ip) and
-                (task_args.device_type is None or d_type == task_args.device_type)):
-            yield DeviceInfo(uuid, name, system_ip, site_id, state, model, version, d_type)
+class DeviceData:
+    def __init__(self, cedge_models, devices):
+        self.cedge_models = cedge_models
+        self.devices = devices
+        self._index = None
 
-        continue
+    @property
+    def index(self):
+        # Built on first use and kept, so that cached device data is indexed only once
+        if self._index is None:
+            self._index = DeviceIndex(self.devices, self.cedge_models)
+        return self._index
 
 
-def get_matched_devices(module_param_dict, task_args):
-    with Rest(**sdwan_api_args(module_param_dict=module_param_dict)) as api:
-        cedge_set = {
-            elem['name'] for elem in api.get('device/models')['data']
-            if elem['deviceClass'] in {'cisco-router', 'eio-lte', 'vbranch'}
+def compile_name_regex(regex_list):
+    """
+    Compile name regular expressions, combining them into a single alternation when possible. Patterns with numbered
+    or named backreferences, or with global inline flags, are compiled individually.
+    @return: List of compiled patterns
+    """
+    if len(regex_list) > 1 and not any(BACKREFERENCE_REGEX.search(regex) for regex in regex_list):
+        try:
+            return [re.compile('|'.join(f'(?:{regex})' for regex in regex_list))]
+        except re.error:
+            pass
+
+    return [re.compile(regex) for regex in regex_list]
+
+
+class DeviceFilter:
+    """
+    Device filter built once from InventoryArgs, name patterns are compiled upfront and equality filters are answered
+    from DeviceIndex hash indexes
+    """
+
+    def __init__(self, task_args):
+        self.equality_filters = {
+            field: value for field, value in (('site_id', task_args.site), ('system_ip', task_args.system_ip),
+                                              ('device_type', task_args.device_type))
+            if value is not None
         }
-        return [elem._asdict() for elem in device_info_iter(api, cedge_set, task_args)]
+        if task_args.reachable:
+            self.equality_filters['state'] = 'reachable'
+
+        if task_args.regex_list is not None:
+            self.name_patterns, self.is_inverse = compile_name_regex(task_args.regex_list), False
+        else:
+            regex = task_args.regex or task_args.not_regex
+            self.name_patterns = [re.compile(regex)] if regex is not None else []
+            self.is_inverse = task_args.regex is None
+
+    @property
+    def query_params(self):
+        return device_query_params(self.equality_filters)
+
+    def match_name(self, device_name):
+        if not self.name_patterns:
+            return True
+
+        # Devices not yet provisioned may have no name, matched as an empty name
+        return self.is_inverse ^ any(pattern.search(device_name or '') for pattern in self.name_patterns)
+
+    def filter(self, device_index):
+        return (
+            entry for entry in device_index.candidates(self.equality_filters) if self.match_name(entry.name)
+        )
+
+
+def device_info_iter(device_index, task_args):
+    return DeviceFilter(task_args).filter(device_index)
+
+
+def device_query_params(equality_filters):
+    """
+    @param equality_filters: Dict of DeviceInfo field to required value
+    @return: Dict of device endpoint query parameters for the equality filters that can be applied by vManage
+    """
+    return {
+        param: equality_filters[field] for field, param in DEVICE_QUERY_PARAMS.items() if field in equality_filters
+    }
+
+
+def get_devices(api, query_params=None):
+    """
+    Retrieve the device list, asking vManage to only return devices matching query_params. If the query is rejected
+    the full device list is retrieved instead. Callers still need to filter the result client-side, as vManage
+    versions not supporting a query parameter ignore it.
+    @param api: Rest API object
+    @param query_params: Dict of device endpoint query parameters, as returned by device_query_params
+    @return: Device object
+    """
+    if query_params:
+        try:
+            return Device.get_raise(api, **query_params)
+        except RestAPIException:
+            pass
+
+    return Device.get_raise(api)
+
+
+def fetch_device_data(api, query_params=None):
+    cedge_models = {
+        elem['name'] for elem in api.get('device/models')['data']
+        if elem['deviceClass'] in {'cisco-router', 'eio-lte', 'vbranch'}
+    }
+    return DeviceData(cedge_models, get_devices(api, query_params))
+
+
+def matched_devices(device_data, device_filter):
+    return [elem._asdict() for elem in device_filter.filter(device_data.index)]
+
+
+class DeviceCache:
+    """
+    In-process and on-disk cache of vManage device models and device list, keyed by vManage address, user, tenant and
+    a salted digest of the password. Differently filtered inventory queries within max_age seconds are answered from
+    the cache. Only the device fields needed for filtering are kept. The in-process cache keeps DeviceData objects, so
+    that their indexes are reused.
+    """
+    entries = {}  # cache key: (timestamp, DeviceData)
+
+    def __init__(self, key_fields, max_age=0, refresh=False):
+        self.key = cache_key('devices', *key_fields)
+        self.max_age = max_age or 0
+        self.refresh = refresh
+
+    @property
+    def is_enabled(self):
+        return self.max_age > 0
+
+    def is_fresh(self, timestamp):
+        return time() - timestamp <= self.max_age
+
+    def load(self, cache_file):
+        timestamp, device_data = DeviceCache.entries.get(self.key, (0, None))
+        if device_data is not None and self.is_fresh(timestamp):
+            return device_data
+
+        entry = load_json(cache_file)
+        if entry is None or not self.is_fresh(entry['timestamp']):
+            return None
+
+        device_data = DeviceData(set(entry['cedge_models']), Device(entry['devices']))
+        DeviceCache.entries[self.key] = (entry['timestamp'], device_data)
+
+        return device_data
+
+    def get(self):
+        """
+        @return: DeviceData from the cache, or None if caching is disabled, refresh requested or cache is stale
+        """
+        if not self.is_enabled or self.refresh:
+            return None
+
+        return self.load(cache_dir('inventory').joinpath(f"{self.key}.json"))
+
+    def fetch(self, api, query_params=None):
+        """
+        Retrieve device data from vManage and update the cache. Concurrent fetches for the same key are serialized, so
+        that only one of them queries vManage while the others use its result.
+        @param query_params: Device endpoint query parameters, only pushed to vManage when caching is disabled, as the
+                             cache needs the full device list
+        @return: DeviceData
+        """
+        if not self.is_enabled:
+            return fetch_device_data(api, query_params)
+
+        inventory_dir = cache_dir('inventory')
+        with file_lock(inventory_dir.joinpath(f"{self.key}.lock")):
+            device_data = None if self.refresh else self.load(inventory_dir.joinpath(f"{self.key}.json"))
+            if device_data is not None:
+                return device_data
+
+            device_data = fetch_device_data(api)
+            entry = {
+                'timestamp': time(),
+                'cedge_models': sorted(device_data.cedge_models),
+                'devices': [
+                    {field: device.get(field) for field in iter_fields} for device in device_data.devices.data
+                ],
+            }
+            save_json(inventory_dir.joinpath(f"{self.key}.json"), entry)
+            DeviceCache.entries[self.key] = (entry['timestamp'], device_data)
+
+        return device_data
+
+
+def device_cache(module_param_dict, socket_path=None):
+    key_fields = [module_param_dict.get(field) for field in ('address', 'port', 'user', 'tenant')]
+    key_fields.append(credential_digest(module_param_dict.get('password')))
+    return DeviceCache(key_fields + [socket_path], module_param_dict.get('max_age'),
+                       module_param_dict.get('refresh', False))
+
+
+def matched_device_iter(module_param_dict, task_args, socket_path=None):
+    """
+    @return: Iterator of DeviceInfo entries matching the filters in task_args
+    """
+    device_filter = DeviceFilter(task_args)
+    cache = device_cache(module_param_dict, socket_path)
+    device_data = cache.get()
+    if device_data is None:
+        with api_session(module_param_dict, socket_path) as api:
+            device_data = cache.fetch(api, device_filter.query_params)
+
+    return device_filter.filter(device_data.index)
+
+
+def get_matched_devices(module_param_dict, task_args, socket_path=None):
+    return [elem._asdict() for elem in matched_device_iter(module_param_dict, task_args, socket_path)]
+
+
+def device_delta(devices, snapshot):
+    """
+    Compare devices against a snapshot, keyed by device uuid
+    @param devices: Iterator of DeviceInfo entries
+    @param snapshot: Snapshot devices dict, uuid: list of SNAPSHOT_FIELDS values
+    @return: (added, removed, changed, devices snapshot) tuple. Changed devices include a previous dict with the
+             former values of the attributes that changed.
+    """
+    added, changed, current = [], [], {}
+    for device in devices:
+        values = [getattr(device, field) for field in SNAPSHOT_FIELDS]
+        current[device.uuid] = values
+        previous_values = snapshot.get(device.uuid)
+        if previous_values is None:
+            added.append(device._asdict())
+        elif previous_values != values:
+            previous = {
+                field: old for field, old, new in zip(SNAPSHOT_FIELDS, previous_values, values) if old != new
+            }
+            changed.append(dict(device._asdict(), previous=previous))
+
+    removed = [
+        dict(zip(SNAPSHOT_FIELDS, values), uuid=uuid) for uuid, values in snapshot.items() if uuid not in current
+    ]
+
+    return added, removed, changed, current
+
+
+def get_device_delta(module_param_dict, task_args, snapshot_file, socket_path=None, check_mode=False):
+    """
+    Devices added, removed or changed since the snapshot persisted in snapshot_file, which is then updated with the
+    current devices. The snapshot generation is incremented whenever the snapshot is updated. A snapshot file that is
+    not a valid snapshot is replaced by a new snapshot, with all devices reported as added.
+    @param snapshot_file: Path to the snapshot file, created on first use
+    @param check_mode: If True, the snapshot file is not written. Delta and updated are those of a regular run.
+    @return: (delta, updated) tuple. Delta is a dict with generation, added, removed and changed devices. Updated
+             indicates whether the snapshot file was (or, in check mode, would be) written.
+    """
+    snapshot_path = Path(snapshot_file).expanduser().resolve()
+    devices = matched_device_iter(module_param_dict, task_args, socket_path)
+
+    with file_lock(cache_dir('inventory').joinpath(f"{cache_key('snapshot', str(snapshot_path))}.lock")):
+        snapshot = load_json(snapshot_path)
+        if (not isinstance(snapshot, dict) or not isinstance(snapshot.get('devices'), dict) or
+                not isinstance(snapshot.get('generation'), int)):
+            snapshot = {}
+        added, removed, changed, current = device_delta(devices, snapshot.get('devices', {}))
+
+        generation = snapshot.get('generation', 0)
+        updated = bool(added or removed or changed or not snapshot)
+        if updated:
+            generation += 1
+        if updated and not check_mode:
+            save_json(snapshot_path, {'generation': generation, 'timestamp': time(), 'devices': current})
+
+    delta = {
+        'generation': generation,
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+    }
+
+    return delta, updated
 
 
 RegEx = Annotated[str, AfterValidator(validate_regex)]
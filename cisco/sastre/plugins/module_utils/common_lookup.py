@@ -1,7 +1,19 @@
+import os
+import threading
+from contextlib import contextmanager
+from multiprocessing.util import Finalize, register_after_fork
+from time import monotonic, time
 from ansible.errors import AnsibleOptionsError
+from ansible.module_utils.parsing.convert_bool import boolean
 from cisco_sdwan.base.rest_api import Rest
 from cisco_sdwan.__main__ import REST_TIMEOUT, VMANAGE_PORT
-from .common import sdwan_api_args
+from .common import api_session, sdwan_api_args
+from .common_session import SessionRest, credential_digest, session_key, session_state, is_session_valid
+from .common_cache import cache_dir, cache_key, file_lock, load_json, save_json
+from .common_output import table_dict
+
+# Pooled sessions idle for longer than this many seconds are validated before being reused
+POOL_VALIDATE_INTERVAL = 60
 
 
 def get_lookup_args(variables):
@@ -11,35 +23,197 @@ def get_lookup_args(variables):
         password=variables.get('ansible_password'),
         tenant=variables.get('tenant'),
         port=variables.get('vmanage_port') or VMANAGE_PORT,
-        timeout=variables.get('timeout') or REST_TIMEOUT
+        timeout=variables.get('timeout') or REST_TIMEOUT,
+        session_broker=variables.get('sastre_session_broker'),
+        session_cache=boolean(variables.get('sastre_session_cache', True), strict=False)
     )
 
 
-def run_task(task_cls, task_args, module_param_dict):
+class PoolEntry:
+    def __init__(self, module_param_dict):
+        self.module_param_dict = module_param_dict
+        self.password = module_param_dict['password']
+        self.lock = threading.Lock()
+        # Number of borrowers currently using the session, which is only validated or closed when not in use
+        self.borrowers = 0
+        # Set when the entry is replaced while in use, it is closed once returned by its last borrower
+        self.retired = False
+        self.context = None
+        self.api = None
+        self.is_owner = False
+        self.last_used = monotonic()
+
+    def open(self):
+        if self.module_param_dict.get('session_broker') or self.module_param_dict.get('session_cache'):
+            # Sessions from session broker or session cache are not logged out on close
+            self.context = api_session(self.module_param_dict)
+            self.api = self.context.__enter__()
+        else:
+            self.api = Rest(**sdwan_api_args(module_param_dict=self.module_param_dict))
+            self.is_owner = True
+
+    def close(self):
+        context, api, self.context, self.api = self.context, self.api, None, None
+        if context is not None:
+            context.__exit__(None, None, None)
+        elif api is not None and self.is_owner:
+            api.__exit__(None, None, None)
+        elif api is not None:
+            api.session.close()
+
+    def detach(self):
+        """
+        Re-create the session over new connections, without ownership, so that it is not logged out on close
+        """
+        if self.api is not None:
+            self.api = SessionRest(self.api.base_url, session_state(self.api), timeout=self.api.timeout)
+            self.context = None
+            self.is_owner = False
+
+
+class SessionPool:
+    """
+    Process-wide pool of vManage sessions used by lookup plugins, keyed by connection parameters. Sessions are kept
+    for the lifetime of the process and closed when it exits. Worker processes forked from a process holding pooled
+    sessions reuse those authenticated sessions over new connections, leaving their logout to the parent process.
+
+    Ansible runs lookups in the worker process of each task, so pooled sessions are only shared by the lookups of a
+    task (e.g. lookups evaluated for each loop item). Pooled sessions are borrowed from the session cache (enabled by
+    default for lookups) or the session broker, which reuse them across tasks and hosts.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.register_finalizer()
+        os.register_at_fork(after_in_child=self.after_fork)
+        # Multiprocessing clears finalizers in child processes, they need to be registered again
+        register_after_fork(self, SessionPool.register_finalizer)
+
+    def register_finalizer(self):
+        # Finalizers also run when multiprocessing child processes exit, atexit handlers would not
+        Finalize(self, self.close, exitpriority=10)
+
+    @contextmanager
+    def session(self, module_param_dict):
+        key = session_key(sdwan_api_args(module_param_dict=module_param_dict))
+        stale_entry = None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.password != module_param_dict['password']:
+                stale_entry, entry = entry, PoolEntry(module_param_dict)
+                self.entries[key] = entry
+                if stale_entry is not None and stale_entry.borrowers > 0:
+                    stale_entry.retired = True
+                    stale_entry = None
+            entry.borrowers += 1
+
+        if stale_entry is not None:
+            with stale_entry.lock:
+                stale_entry.close()
+
+        try:
+            with entry.lock:
+                # Sessions in use by other borrowers are not validated, as validation could close them
+                if entry.api is not None and entry.borrowers == 1 and \
+                        monotonic() - entry.last_used > POOL_VALIDATE_INTERVAL and not is_session_valid(entry.api):
+                    entry.close()
+                if entry.api is None:
+                    entry.open()
+                entry.last_used = monotonic()
+
+            yield entry.api
+        finally:
+            with self.lock:
+                entry.borrowers -= 1
+                entry.last_used = monotonic()
+                is_retired = entry.retired and entry.borrowers == 0
+            if is_retired:
+                with entry.lock:
+                    entry.close()
+
+    def close(self):
+        with self.lock:
+            entries = list(self.entries.values())
+            self.entries.clear()
+
+        for entry in entries:
+            entry.close()
+
+    def after_fork(self):
+        # Locks may have been held by other threads at fork time. Connections cannot be shared with the parent process,
+        # which remains responsible for logging out inherited sessions.
+        self.lock = threading.Lock()
+        for entry in self.entries.values():
+            entry.lock = threading.Lock()
+            entry.detach()
+
+
+session_pool = SessionPool()
+
+
+def lookup_session(module_param_dict):
+    """
+    Context manager providing a pooled Rest API object to lookup plugins
+    """
+    return session_pool.session(module_param_dict)
+
+
+def run_task(task_cls, task_args, module_param_dict, max_age=0, table_format='rows'):
+    """
+    Run a Sastre task, returning its result tables as a list of dicts, in the layout selected by table_format. With
+    max_age greater than 0, results are memoized on disk per task arguments, vManage connection and credentials.
+    Identical queries within max_age seconds reuse the previous result, and concurrent identical queries are serialized
+    so that only the first one runs the task.
+    """
+    if not max_age:
+        return execute_task(task_cls, task_args, module_param_dict, table_format)
+
+    task_fields = {field: value for field, value in task_args.model_dump().items() if not callable(value)}
+    connection_fields = [module_param_dict.get(field) for field in ('address', 'port', 'user', 'tenant')]
+    connection_fields.append(credential_digest(module_param_dict.get('password')))
+    key = cache_key('lookup', task_cls.__name__, task_fields, table_format, *connection_fields)
+
+    lookups_dir = cache_dir('lookups')
+    cache_file = lookups_dir.joinpath(f"{key}.json")
+    with file_lock(lookups_dir.joinpath(f"{key}.lock")):
+        entry = load_json(cache_file)
+        if entry is not None and time() - entry['timestamp'] <= max_age:
+            return entry['result']
+
+        result = execute_task(task_cls, task_args, module_param_dict, table_format)
+        save_json(cache_file, {'timestamp': time(), 'result': result})
+
+    return result
+
+
+def execute_task(task_cls, task_args, module_param_dict, table_format='rows'):
     task = task_cls()
     if task.is_api_required(task_args):
-        with Rest(**sdwan_api_args(module_param_dict=module_param_dict)) as api:
+        with lookup_session(module_param_dict) as api:
             task_output = task.runner(task_args, api)
     else:
         task_output = task.runner(task_args)
 
     result = []
     if task_output:
-        result = [table.dict() for table in task_output]
+        result = [table_dict(table, table_format) for table in task_output]
 
     return result
 
 
 def validate_show_mandatory_args(**kwargs):
+    # Either one of the alternative parameter names is mandatory
     mandatory_args = [
-        ('cmd', list, 'a list')
+        (('cmd', 'commands'), list, 'a list')
     ]
-    for arg_name, arg_type, arg_hint in mandatory_args:
-        arg_val = kwargs.get(arg_name)
-        if arg_val is None:
-            raise AnsibleOptionsError(f"Parameter {arg_name} is mandatory")
-        elif not isinstance(arg_val, arg_type):
-            raise AnsibleOptionsError(f"Parameter {arg_name} must be {arg_hint}")
+    for arg_names, arg_type, arg_hint in mandatory_args:
+        provided_args = [(arg_name, kwargs[arg_name]) for arg_name in arg_names if kwargs.get(arg_name) is not None]
+        if not provided_args:
+            raise AnsibleOptionsError(f"Parameter {' or '.join(arg_names)} is mandatory")
+        for arg_name, arg_val in provided_args:
+            if not isinstance(arg_val, arg_type):
+                raise AnsibleOptionsError(f"Parameter {arg_name} must be {arg_hint}")
 
 
 def validate_show_type_args(**kwargs):
@@ -50,6 +224,13 @@ def validate_show_type_args(**kwargs):
         ('site', str, 'a string'),
         ('system_ip', str, 'a string'),
         ('detail', bool, 'a boolean'),
+        ('workers', int, 'an integer'),
+        ('device_timeout', int, 'an integer'),
+        ('max_age', int, 'an integer'),
+        ('table_format', str, 'a string'),
+        ('shard', str, 'a string'),
+        ('aggregate', list, 'a list'),
+        ('bucket', str, 'a string'),
     ]
     for arg_name, arg_type, arg_hint in type_args:
         arg_val = kwargs.get(arg_name)
@@ -60,7 +241,9 @@ def validate_show_type_args(**kwargs):
 def set_show_default_args(**kwargs):
     default_args = [
         ('save_csv', 'None'),
-        ('save_json', 'None')
+        ('save_json', 'None'),
+        ('max_age', 'None'),
+        ('table_format', 'None')
     ]
     for arg_name, arg_default in default_args:
         kwargs.pop(arg_name, arg_default)
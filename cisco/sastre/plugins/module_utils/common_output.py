@@ -0,0 +1,312 @@
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from ansible.module_utils.basic import missing_required_lib
+from cisco_sdwan.base.models_base import filename_safe
+from cisco_sdwan.tasks.common import TaskException
+from cisco_sdwan.tasks.implementation import TaskList, TaskShowTemplate
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import pyarrow.parquet
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+OUTPUT_FORMATS = ('jsonl', 'json')
+OUTPUT_MODES = ('both', 'text', 'tables', 'none')
+TABLE_FORMATS = ('rows', 'columnar')
+COMPRESS_FORMATS = ('gzip', 'zstd')
+
+
+def table_rows(table):
+    """
+    @return: Iterator of table rows, skipping marker rows
+    """
+    return (row for row in table if row is not None)
+
+
+def table_dict(table, table_format='rows'):
+    """
+    @param table: Table
+    @param table_format: 'rows' for the Table.dict layout, with data as a list of row dicts. 'columnar' for the same
+                         header, with column ids in columns and data as a list of row value lists in rows, so that
+                         column ids are not repeated in every row.
+    @return: Dict representation of table
+    """
+    if table_format != 'columnar':
+        return table.dict()
+
+    column_ids = [f'column_{i}' for i in range(len(table.header))]
+    return {
+        "header": {
+            "name": table.name or "",
+            "title": dict(zip(column_ids, table.header))
+        },
+        "columns": column_ids,
+        "rows": [list(row) for row in table_rows(table)]
+    }
+
+
+def export_jsonl(table_iter, export_file):
+    summary = []
+    for table in table_iter:
+        name = table.name or ""
+        row_count = 0
+        for row in table_rows(table):
+            export_file.write(json.dumps({"table": name, "row": dict(zip(table.header, row))}, default=str))
+            export_file.write('\n')
+            row_count += 1
+        summary.append({"name": name, "rows": row_count})
+
+    return summary
+
+
+def export_json(table_iter, export_file):
+    # Same layout as Sastre export_json, with one table dict built at a time
+    summary = []
+    export_file.write('[')
+    for index, table in enumerate(table_iter):
+        if index > 0:
+            export_file.write(',\n')
+        table_dict = table.dict()
+        json.dump(table_dict, export_file, default=str)
+        summary.append({"name": table.name or "", "rows": len(table_dict["data"])})
+    export_file.write(']\n')
+
+    return summary
+
+
+def export_tables(table_iter, filename, output_format='jsonl'):
+    """
+    Write tables to a file, one table at a time
+    @param table_iter: Iterable of Table
+    @param filename: Output file name
+    @param output_format: 'jsonl' for one JSON object per table row, with table name and row values keyed by column
+                          title. 'json' for a JSON list of table dicts.
+    @return: List of dicts with name and number of rows of each table written
+    """
+    export_fn = export_jsonl if output_format == 'jsonl' else export_json
+    with open(filename, 'w') as export_file:
+        return export_fn(table_iter, export_file)
+
+
+# Number of table rows held in memory as Arrow arrays when writing Parquet or Arrow IPC files
+ARROW_BATCH_SIZE = 65536
+
+
+def arrow_types(table):
+    """
+    Arrow type of each table column, inferred from all its values. Columns with integer and float values are float64,
+    columns with mixed or other types are string.
+    """
+    column_value_types = [set() for _ in table.header]
+    for row in table_rows(table):
+        for value_types, value in zip(column_value_types, row):
+            if value is not None:
+                value_types.add(type(value))
+
+    def arrow_type(value_types):
+        if value_types == {bool}:
+            return pyarrow.bool_()
+        if value_types == {int}:
+            return pyarrow.int64()
+        if value_types and value_types <= {int, float}:
+            return pyarrow.float64()
+        return pyarrow.string()
+
+    return [arrow_type(value_types) for value_types in column_value_types]
+
+
+def arrow_batch_iter(table, schema):
+    """
+    @return: Iterator of Arrow record batches of up to ARROW_BATCH_SIZE rows of table
+    """
+    def column_values(column_index, field_type, rows):
+        values = (row[column_index] for row in rows)
+        if field_type == pyarrow.string():
+            return [value if value is None else str(value) for value in values]
+        return list(values)
+
+    rows = []
+    for row in table_rows(table):
+        rows.append(row)
+        if len(rows) == ARROW_BATCH_SIZE:
+            yield pyarrow.record_batch([column_values(index, field.type, rows) for index, field in enumerate(schema)],
+                                       schema=schema)
+            rows = []
+
+    if rows or not table:
+        yield pyarrow.record_batch([column_values(index, field.type, rows) for index, field in enumerate(schema)],
+                                   schema=schema)
+
+
+def export_arrow(table_iter, export_dir, file_prefix=None):
+    """
+    Write each table as a Parquet file with zstd compression under export_dir, one row group at a time. When pyarrow
+    is built without Parquet support, tables are written as Arrow IPC (Feather v2) files instead.
+    @param table_iter: Iterable of Table
+    @param export_dir: Directory where files are written, created if needed
+    @param file_prefix: Optional prefix to file names, which are otherwise based on table names
+    @return: List of file paths written
+    """
+    Path(export_dir).mkdir(parents=True, exist_ok=True)
+    file_list = []
+    for index, table in enumerate(table_iter):
+        filename_tokens = [file_prefix] if file_prefix else []
+        if table.name:
+            filename_tokens.append(filename_safe(table.name, lower=True).replace(' ', '_'))
+        else:
+            filename_tokens.append(f'table_{index}')
+        file_path = Path(export_dir, f"{'_'.join(filename_tokens)}.{'parquet' if HAS_PARQUET else 'arrow'}")
+
+        schema = pyarrow.schema([
+            pyarrow.field(str(title), field_type) for title, field_type in zip(table.header, arrow_types(table))
+        ])
+        if HAS_PARQUET:
+            with pyarrow.parquet.ParquetWriter(file_path, schema, compression='zstd') as writer:
+                for batch in arrow_batch_iter(table, schema):
+                    writer.write_batch(batch)
+        else:
+            options = pyarrow.ipc.IpcWriteOptions(compression='zstd')
+            with pyarrow.ipc.new_file(file_path, schema, options=options) as writer:
+                for batch in arrow_batch_iter(table, schema):
+                    writer.write_batch(batch)
+
+        file_list.append(str(file_path))
+
+    return file_list
+
+
+# File suffix and leading bytes of each compression format
+COMPRESS_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESS_MAGIC = {'gzip': b'\x1f\x8b', 'zstd': b'\x28\xb5\x2f\xfd'}
+
+# Same as zlib default, gzip.open default of 9 is several times slower for a few percent smaller files
+GZIP_LEVEL = 6
+
+
+def compressed_filename(filename, compress):
+    """
+    @return: filename with the suffix of the compress format appended, unless it already ends with it
+    """
+    suffix = COMPRESS_SUFFIXES[compress]
+    return str(filename) if str(filename).endswith(suffix) else f"{filename}{suffix}"
+
+
+def open_compressed(filename, compress, mode='wt', **kwargs):
+    """
+    Open a gzip or zstd compressed file, data is (de)compressed as it is written or read
+    @param filename: File name
+    @param compress: 'gzip' or 'zstd'
+    @param mode: File open mode, text or binary
+    @param kwargs: Passed to the text wrapper, e.g. newline
+    @return: File object
+    """
+    if compress == 'zstd':
+        return zstandard.open(filename, mode, **kwargs)
+    return gzip.open(filename, mode, compresslevel=GZIP_LEVEL, **kwargs)
+
+
+def save_csv_compressed(table, filename, compress):
+    # Same as Sastre Table.save, writing through the compressor
+    with open_compressed(filename, compress, newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(table.header)
+        writer.writerows(table_rows(table))
+
+
+def export_compressed(tables, task_cls, task_args, compress):
+    """
+    Save tables as compressed CSV and/or JSON files, as requested by the save_csv and save_json task arguments. File
+    names follow the same conventions as the task_cls Sastre task, with the compress format suffix appended.
+    @param tables: List of Table
+    @param task_cls: Sastre task class, TaskList, TaskShowTemplate or TaskShow subclasses
+    @param task_args: Task arguments, with save_csv and save_json
+    @param compress: 'gzip' or 'zstd'
+    @return: List of file paths written
+    """
+    file_list = []
+    save_csv = getattr(task_args, 'save_csv', None)
+    if save_csv is not None and tables:
+        if issubclass(task_cls, TaskList):
+            # List tasks save their single table to the save_csv file
+            csv_files = [(tables[0], Path(save_csv))]
+        else:
+            Path(save_csv).mkdir(parents=True, exist_ok=True)
+            if issubclass(task_cls, TaskShowTemplate):
+                csv_files = [(table, Path(save_csv, table.meta)) for table in tables]
+            else:
+                csv_files = []
+                for table in tables:
+                    filename_tokens = [task_args.subtask_info]
+                    if table.name is not None:
+                        filename_tokens.append(filename_safe(table.name, lower=True).replace(' ', '_'))
+                    csv_files.append((table, Path(save_csv, f"{'_'.join(filename_tokens)}.csv")))
+
+        for table, csv_file in csv_files:
+            filename = compressed_filename(csv_file, compress)
+            save_csv_compressed(table, filename, compress)
+            file_list.append(filename)
+
+    save_json = getattr(task_args, 'save_json', None)
+    if save_json is not None and tables:
+        filename = compressed_filename(save_json, compress)
+        with open_compressed(filename, compress) as export_file:
+            # Same format as Sastre export_json
+            json.dump([table.dict() for table in tables], export_file, indent=2)
+        file_list.append(filename)
+
+    return file_list
+
+
+def compress_format(filename):
+    """
+    @return: 'gzip' or 'zstd' if filename is compressed, as detected from its leading bytes, otherwise None
+    """
+    with open(filename, 'rb') as f:
+        leading_bytes = f.read(4)
+
+    return next((compress for compress, magic in COMPRESS_MAGIC.items() if leading_bytes.startswith(magic)), None)
+
+
+@contextmanager
+def decompressed_file(filename):
+    """
+    Yield the name of a decompressed temporary copy of filename if it is gzip or zstd compressed, which is removed on
+    exit. Otherwise, yield filename as is.
+    @param filename: File name
+    @raise TaskException: When filename is zstd compressed and the zstandard package is not installed
+    """
+    compress = compress_format(filename) if Path(filename).is_file() else None
+    if compress is None:
+        yield filename
+        return
+
+    if compress == 'zstd' and not HAS_ZSTD:
+        raise TaskException(f"Unable to read zstd compressed file '{filename}': {missing_required_lib('zstandard')}")
+
+    file_path = Path(filename)
+    suffix = COMPRESS_SUFFIXES[compress]
+    with tempfile.TemporaryDirectory(prefix='sastre_') as temp_dir:
+        temp_file = Path(temp_dir, file_path.name[:-len(suffix)] if file_path.name.endswith(suffix) else file_path.name)
+        with open_compressed(filename, compress, 'rb') as compressed_f, open(temp_file, 'wb') as temp_f:
+            shutil.copyfileobj(compressed_f, temp_f)
+
+        yield str(temp_file)
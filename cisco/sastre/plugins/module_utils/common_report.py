@@ -0,0 +1,91 @@
+from typing import Optional, Union
+from cisco_sdwan.base.rest_api import Rest
+from cisco_sdwan.tasks.common import TaskException
+from cisco_sdwan.tasks.implementation import TaskReport as SastreTaskReport
+from cisco_sdwan.tasks.implementation._report import (
+    Report as SastreReport, DEFAULT_CONTENT_SPEC, load_content_spec, diff_html, diff_txt
+)
+from .common_output import decompressed_file
+
+
+class Report(SastreReport):
+    """
+    Same as Sastre Report, loading gzip or zstd compressed report files transparently
+    """
+    @classmethod
+    def load(cls, filename: str):
+        with decompressed_file(filename) as report_file:
+            report = super().load(report_file)
+        report.filename = filename
+
+        return report
+
+
+class TaskReport(SastreTaskReport):
+    """
+    Same as Sastre TaskReport, with create and diff subtasks loading reports via Report above. Task arguments reference
+    Sastre TaskReport subtask handlers, runner dispatches them to the ones defined here by name.
+    """
+    def runner(self, parsed_args, api: Optional[Rest] = None) -> Union[None, list]:
+        return getattr(self, parsed_args.subtask_handler.__name__)(parsed_args, api)
+
+    def subtask_create(self, parsed_args, api: Optional[Rest]) -> Union[None, list]:
+        source_info = f'Local workdir: "{parsed_args.workdir}"' if api is None else f'vManage URL: "{api.base_url}"'
+        self.log_info(f'Report create task: {source_info} -> "{parsed_args.file}"')
+
+        self.log_info("Loading report specification")
+        content_spec = load_content_spec(parsed_args.spec_file, parsed_args.spec_json, DEFAULT_CONTENT_SPEC)
+
+        report = Report(parsed_args.file)
+        for description, task_cls, task_args in self.section_iter(content_spec, api is not None, parsed_args.workdir):
+            try:
+                task_output = task_cls().runner(task_args, api)
+                if task_output:
+                    report.add_section(description, task_output)
+            except (TaskException, FileNotFoundError) as ex:
+                self.log_error(f'Task {task_cls.__name__} error: {ex}')
+
+        result = None
+        if parsed_args.diff:
+            self.log_info(f'Starting diff from "{parsed_args.diff}" to "{parsed_args.file}"')
+            previous_report = Report.load(parsed_args.diff)
+            self.log_info(f'Loaded previous report "{parsed_args.diff}"')
+            skip_sections = content_spec.skip_section_set
+            result = [diff_txt(previous_report.trimmed(skip_sections), report.trimmed(skip_sections))]
+            self.log_info('Completed diff')
+
+        # Saving current report after running the diff in case the previous report had the same filename
+        report.save()
+        self.log_info(f'Report saved as "{parsed_args.file}"')
+
+        return result
+
+    # noinspection PyUnusedLocal
+    def subtask_diff(self, parsed_args, api: Optional[Rest]) -> Union[None, list]:
+        self.log_info(f'Report diff task: "{parsed_args.report_a}" <-> "{parsed_args.report_b}"')
+        report_a = Report.load(parsed_args.report_a)
+        self.log_info(f'Loaded report "{parsed_args.report_a}"')
+        report_b = Report.load(parsed_args.report_b)
+        self.log_info(f'Loaded report "{parsed_args.report_b}"')
+
+        if parsed_args.spec_file or parsed_args.spec_json:
+            self.log_info("Loading report specification, trimming sections with skip_diff set")
+            skip_sections = load_content_spec(parsed_args.spec_file, parsed_args.spec_json).skip_section_set
+            report_a = report_a.trimmed(skip_sections)
+            report_b = report_b.trimmed(skip_sections)
+
+        result = None
+        if parsed_args.save_html:
+            with open(parsed_args.save_html, 'w') as f:
+                f.write(diff_html(report_a, report_b))
+            self.log_info(f'HTML report diff saved as "{parsed_args.save_html}"')
+
+        if parsed_args.save_txt:
+            with open(parsed_args.save_txt, 'w') as f:
+                f.write(diff_txt(report_a, report_b))
+            self.log_info(f'Text report diff saved as "{parsed_args.save_txt}"')
+
+        if not parsed_args.save_html and not parsed_args.save_txt:
+            result = [diff_txt(report_a, report_b)]
+
+        return result
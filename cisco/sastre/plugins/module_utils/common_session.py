@@ -0,0 +1,167 @@
+import hashlib
+import hmac
+import os
+import requests
+from contextlib import contextmanager
+from time import time
+from urllib3 import disable_warnings
+from urllib3.exceptions import InsecureRequestWarning
+from cisco_sdwan.base.rest_api import Rest, RestAPIException
+from .common_cache import cache_dir, cache_key, cache_salt, file_lock, load_json, save_json
+
+# Session headers that need to be carried over when an authenticated session is reused
+SESSION_HEADERS = ('X-XSRF-TOKEN', 'VSessionId', 'Content-Type')
+
+# Cached sessions not used for longer than this are discarded without validation, vManage would have expired them
+SESSION_CACHE_IDLE_TIMEOUT = 1800
+
+
+class SessionRest(Rest):
+    """
+    Rest API object built from the state of a previously authenticated vManage session, instead of performing a new
+    login. Logout is not performed on exit, the session is owned by whoever provided the session state. auth_failed is
+    set if vManage rejected the session on any request, so that its owner can discard it.
+    """
+
+    def __init__(self, base_url, session_state, timeout=20, verify=False):
+        # Not calling Rest.__init__ on purpose, as it would perform a new login
+        self.base_url = base_url
+        self.timeout = timeout
+        self.verify = verify
+        self.server_facts = session_state['server_facts']
+        self.is_tenant_scope = session_state.get('is_tenant_scope', False)
+        self.auth_failed = False
+
+        if not verify:
+            disable_warnings(InsecureRequestWarning)
+
+        self.session = requests.Session()
+        self.session.cookies.update(session_state['cookies'])
+        self.session.headers.update(session_state['headers'])
+        self.session.hooks['response'].append(self.check_auth)
+
+    def check_auth(self, response, *args, **kwargs):
+        if is_auth_failure(response):
+            self.auth_failed = True
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.session.close()
+
+        return False
+
+
+def session_key(api_args):
+    """
+    Key identifying an authenticated vManage session
+    @param api_args: Rest API arguments, as returned by sdwan_api_args
+    @return: Tuple of base_url, username and tenant
+    """
+    return api_args['base_url'], api_args['username'], api_args.get('tenant')
+
+
+def session_state(api):
+    """
+    Extract the state of an authenticated vManage session, so that it can be reused by SessionRest
+    @param api: Authenticated Rest API object
+    @return: JSON serializable dict with the session state
+    """
+    return {
+        'cookies': api.session.cookies.get_dict(),
+        'headers': {
+            header: api.session.headers[header] for header in SESSION_HEADERS if header in api.session.headers
+        },
+        'server_facts': api.server_facts,
+        'is_tenant_scope': api.is_tenant_scope,
+    }
+
+
+def is_auth_failure(response):
+    """
+    @return: True if vManage rejected the session used for the request. Expired sessions are redirected to the login
+             page instead of getting an error status code.
+    """
+    if response.status_code == 401:
+        return True
+
+    return 'text/html' in response.headers.get('Content-Type', '') and b'j_security_check' in response.content
+
+
+def is_session_valid(api):
+    """
+    Validate an authenticated session with a cheap vManage call. An expired session is redirected to the login page,
+    which makes JSON decoding fail.
+    @param api: Rest API object
+    @return: True if the session is still valid, False otherwise
+    """
+    try:
+        return api.get('client/server').get('data') is not None
+    except (RestAPIException, ValueError, requests.exceptions.RequestException):
+        return False
+
+
+def password_digest(password, salt):
+    return hashlib.sha256(f"{salt}:{password}".encode()).hexdigest()
+
+
+def credential_digest(password):
+    """
+    Salted digest of a password, to be included in the key of cached results, so that they are only returned to callers
+    providing the same credentials
+    """
+    return password_digest(password, cache_salt())
+
+
+def load_cached_session(cache_file, api_args):
+    """
+    Load and validate a session from the session cache
+    @return: (cache entry, SessionRest) tuple, or None if there is no usable session in the cache
+    """
+    entry = load_json(cache_file)
+    if entry is None or time() - entry.get('last_used', 0) > SESSION_CACHE_IDLE_TIMEOUT:
+        return None
+
+    # Only reuse the session if the password matches the one used to authenticate it
+    if not hmac.compare_digest(entry['password_digest'], password_digest(api_args['password'], entry['salt'])):
+        return None
+
+    api = SessionRest(api_args['base_url'], entry['state'], timeout=api_args['timeout'])
+    if not is_session_valid(api):
+        api.session.close()
+        return None
+
+    return entry, api
+
+
+@contextmanager
+def cached_session(api_args):
+    """
+    Context manager providing a Rest API object which reuses an authenticated session persisted in the session cache.
+    A new login is only performed if there is no cached session or if the cached session is rejected by vManage.
+    Logins are serialized across processes, so concurrent tasks against the same vManage share a single session.
+    Logout is not performed on exit, in order for the session to be reused by subsequent tasks.
+    @param api_args: Rest API arguments, as returned by sdwan_api_args
+    """
+    sessions_dir = cache_dir('sessions')
+    key = cache_key(*session_key(api_args))
+    cache_file = sessions_dir.joinpath(f"{key}.json")
+
+    with file_lock(sessions_dir.joinpath(f"{key}.lock")):
+        cached = load_cached_session(cache_file, api_args)
+        if cached is None:
+            api = Rest(**api_args)
+            salt = os.urandom(16).hex()
+            entry = {
+                'salt': salt,
+                'password_digest': password_digest(api_args['password'], salt),
+                'state': session_state(api),
+            }
+        else:
+            entry, api = cached
+
+        entry['last_used'] = time()
+        save_json(cache_file, entry)
+
+    try:
+        yield api
+    finally:
+        api.session.close()
@@ -0,0 +1,739 @@
+import base64
+import binascii
+import copy
+import hashlib
+import json
+import math
+import re
+import requests
+import statistics
+import threading
+from concurrent import futures
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from operator import attrgetter
+from pathlib import Path
+from time import monotonic, time
+from typing import Callable, ClassVar, List, Literal, Optional
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field, field_validator, model_validator
+from cisco_sdwan.base.catalog import op_catalog_iter, OpType
+from cisco_sdwan.base.models_base import RecordItem, entry_time_parse
+from cisco_sdwan.base.models_vmanage import datetime_format
+from cisco_sdwan.base.rest_api import RestAPIException
+from cisco_sdwan.tasks.common import regex_search, Table
+from cisco_sdwan.tasks.models import const, validate_op_cmd
+from cisco_sdwan.tasks.implementation import (
+    TaskShow as SastreTaskShow, ShowRealtimeArgs as SastreShowRealtimeArgs, ShowStateArgs as SastreShowStateArgs,
+    ShowStatisticsArgs as SastreShowStatisticsArgs, ShowAlarmsArgs as SastreShowAlarmsArgs,
+    ShowEventsArgs as SastreShowEventsArgs
+)
+from cisco_sdwan.tasks.implementation._show import (
+    DeviceInfo, THREAD_POOL_SIZE, TIME_FORMAT, retrieve_rt_task, table_fields
+)
+from .common_cache import load_json
+from .common_inventory import device_query_params, get_devices
+
+
+def timeout_api(api, timeout):
+    """
+    Rest API object sharing the session of api, with a different request timeout. Requests over a persistent httpapi
+    connection are subject to the connection timeout instead.
+    @param api: Rest API object
+    @param timeout: Request timeout in seconds, or None to keep the timeout of api
+    """
+    if timeout is None:
+        return api
+
+    api_copy = copy.copy(api)
+    api_copy.timeout = timeout
+
+    return api_copy
+
+
+def size_connection_pool(api, pool_size):
+    """
+    Allow up to pool_size concurrent connections to vManage on the session of api, requests keeps at most 10 by
+    default. Not applicable to Rest API objects without a requests session, such as ConnectionRest.
+    """
+    if getattr(api, 'session', None) is None or pool_size <= requests.adapters.DEFAULT_POOLSIZE:
+        return
+
+    api.session.mount(api.base_url, requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+
+
+class DeviceDeadlines:
+    """
+    Deadline of each device, shared by all realtime requests to that device. The deadline of a device is set timeout
+    seconds after its first request is sent, so that all its commands together are limited to timeout seconds.
+    """
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.deadlines = {}
+
+    def remaining(self, device):
+        """
+        @return: Seconds left until the deadline of device
+        """
+        with self.lock:
+            deadline = self.deadlines.setdefault(device.system_ip, monotonic() + self.timeout)
+
+        return deadline - monotonic()
+
+
+def retrieve_device_rt(api, rt_cls, device, deadlines=None):
+    """
+    Same as Sastre retrieve_rt_task, also treating connection errors as a failure to retrieve from this device only
+    @param deadlines: Optional DeviceDeadlines. Requests are sent with the time left until the device deadline as
+                      timeout, and not sent once the deadline has passed.
+    """
+    if deadlines is not None:
+        remaining = deadlines.remaining(device)
+        if remaining <= 0:
+            return device, None
+        api = timeout_api(api, remaining)
+
+    try:
+        return retrieve_rt_task(api, rt_cls, device)
+    except requests.exceptions.RequestException:
+        return device, None
+
+
+def encode_cursor(scroll_id, start_time, end_time):
+    """
+    Opaque paging cursor, carrying the vManage scroll id and the query time window it belongs to
+    """
+    cursor_dict = {'scroll_id': scroll_id, 'start_time': start_time.timestamp(), 'end_time': end_time.timestamp()}
+
+    return base64.urlsafe_b64encode(json.dumps(cursor_dict).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    @return: (<scroll id>, <start time>, <end time>) tuple from a cursor created by encode_cursor
+    """
+    try:
+        cursor_dict = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (cursor_dict['scroll_id'], datetime.fromtimestamp(cursor_dict['start_time'], tz=timezone.utc),
+                datetime.fromtimestamp(cursor_dict['end_time'], tz=timezone.utc))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor') from None
+
+
+def get_records_page(api, op_cls, start_time, end_time, page_size, scroll_id=None, sort_order='desc'):
+    """
+    Retrieve a page of alarms or events via the vManage scroll API
+    @param op_cls: RecordItem subclass
+    @param scroll_id: Scroll id from the pageInfo of the previous page, None to retrieve the first page
+    @param sort_order: Entry time sort order, 'desc' (newest first) or 'asc'
+    @return: Page payload
+    """
+    query = op_cls.query(start_time, end_time, page_size)
+    for sort_entry in query['sort']:
+        sort_entry['order'] = sort_order
+
+    page_params = {'query': json.dumps(query), 'count': page_size}
+    if scroll_id is not None:
+        page_params['scrollId'] = scroll_id
+
+    return api.get(op_cls.api_path.post, 'page', **page_params)
+
+
+def record_id(record):
+    """
+    Identity of an alarm or event record, from its uuid or id, or its contents if neither is available
+    """
+    return record.get('uuid') or record.get('id') or hashlib.sha256(
+        json.dumps(record, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def high_water_mark(records, checkpoint):
+    """
+    @param records: Records retrieved since checkpoint
+    @param checkpoint: Previous checkpoint dict
+    @return: Checkpoint dict with the newest entry time in records and the ids of all records retrieved with that
+             entry time. vManage queries have 1 second resolution, so entry times are compared by the second.
+    """
+    entry_time = max(float(record['entry_time']) for record in records)
+    entry_second = entry_time // 1000
+    ids = {record_id(record) for record in records if float(record['entry_time']) // 1000 == entry_second}
+    if checkpoint.get('entry_time') is not None and float(checkpoint['entry_time']) // 1000 == entry_second:
+        ids.update(checkpoint.get('ids', []))
+
+    return {'entry_time': entry_time, 'ids': sorted(ids), 'timestamp': time()}
+
+
+def parse_interval(interval):
+    """
+    @param interval: Time interval as a number followed by m (minutes), h (hours) or d (days). E.g. 30m, 1h.
+    @return: timedelta
+    """
+    match = re.fullmatch(r'(\d+)\s*([mhd])', interval.strip())
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f'Invalid interval "{interval}", expected a positive number followed by m, h or d')
+
+    unit = {'m': 'minutes', 'h': 'hours', 'd': 'days'}[match.group(2)]
+
+    return timedelta(**{unit: int(match.group(1))})
+
+
+def time_shards(start_time, end_time, shard_interval=None):
+    """
+    Split a time range into consecutive sub-ranges of shard_interval, the last one possibly shorter
+    @return: List of (<shard start>, <shard end>) tuples, oldest first
+    """
+    if shard_interval is None:
+        return [(start_time, end_time)]
+
+    shards = []
+    shard_start = start_time
+    while shard_start < end_time:
+        shard_end = min(shard_start + shard_interval, end_time)
+        shards.append((shard_start, shard_end))
+        shard_start = shard_end
+
+    return shards
+
+
+def merge_op_items(op_obj_list):
+    """
+    Merge bulk state or statistics items retrieved in multiple queries into the first one, in list order. Queries on
+    adjacent time ranges may both return entries at the shared boundary, those are only merged once.
+    """
+    merged_obj, *other_obj_list = op_obj_list
+    previous_data = merged_obj._data
+    for op_obj in other_obj_list:
+        boundary_time = max((entry.get('entry_time', 0) for entry in previous_data), default=None)
+        boundary_entries = {
+            json.dumps(entry, sort_keys=True) for entry in previous_data if entry.get('entry_time') == boundary_time
+        }
+        data = [
+            entry for entry in op_obj._data
+            if entry.get('entry_time') != boundary_time or json.dumps(entry, sort_keys=True) not in boundary_entries
+        ]
+        merged_obj.add_payload({'data': data, 'pageInfo': op_obj._page_info})
+        previous_data = op_obj._data
+
+    return merged_obj
+
+
+def percentile_95(values):
+    """
+    95th percentile of values, nearest-rank method
+    """
+    return sorted(values)[math.ceil(0.95 * len(values)) - 1]
+
+
+def is_numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def numeric_conversion_fns(op_cls, fields):
+    """
+    Conversion functions for numeric fields of op_cls, returning None for missing values instead of the empty string
+    returned by field_value_iter, and instead of applying op_cls conversion functions to them
+    """
+    def conversion_fn(convert):
+        return lambda value: None if value is None or value == '' else convert(value)
+
+    return {field: conversion_fn(op_cls.field_conversion_fns.get(field, lambda value: value)) for field in fields}
+
+
+def time_series_key(op_cls, sample, node_id, series_values):
+    """
+    Key identifying the time series of a statistics sample, as defined by op_cls.time_series_key, within node_id. When
+    the fields used by op_cls.time_series_key are not in the sample, the non-numeric field values in the table are
+    used instead.
+    """
+    try:
+        return node_id, op_cls.time_series_key(sample)
+    except AttributeError:
+        return node_id, tuple(series_values)
+
+
+# Reductions available to aggregate statistics
+AGGREGATE_FNS = {
+    'min': min,
+    'avg': statistics.fmean,
+    'max': max,
+    'p95': percentile_95,
+}
+
+
+class TaskShow(SastreTaskShow):
+    """
+    Sastre show task with device selection filters on site, system ip and reachability pushed to vManage, so that only
+    matching devices are retrieved. Selection is still validated client-side.
+    Realtime, state and statistics subtasks accept multiple commands, devices are selected once and shared by all of
+    them. Alarms and events can be retrieved one page at a time, or incrementally since a persisted checkpoint.
+    Additional entries to the module result, such as the paging cursor, are provided in result_info.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.result_info = {}
+
+    @staticmethod
+    def op_iter(op_type, parsed_args, api):
+        """
+        @return: Iterator of (<info>, <op_cls>) tuples for all requested commands, in request order and without
+                 duplicates when commands overlap
+        """
+        op_cls_set = set()
+        for cmd in parsed_args.cmd_list:
+            for info, op_cls in op_catalog_iter(op_type, *cmd, version=api.server_version):
+                if op_cls in op_cls_set:
+                    continue
+                op_cls_set.add(op_cls)
+                yield info, op_cls
+
+    def selected_devices(self, parsed_args, api):
+        equality_filters = {
+            field: value for field, value in (('site_id', parsed_args.site), ('system_ip', parsed_args.system_ip))
+            if value is not None
+        }
+        if parsed_args.reachable:
+            equality_filters['state'] = 'reachable'
+
+        regex = parsed_args.regex or parsed_args.not_regex
+        matched_items = [
+            DeviceInfo(name, system_ip, site_id, state, d_type, model)
+            for _, name, system_ip, site_id, state, d_type, model in
+            get_devices(api, device_query_params(equality_filters)).extended_iter(default='-')
+            if ((regex is None or regex_search(regex, name, d_type, model, inverse=parsed_args.regex is None)) and
+                (not parsed_args.reachable or state == 'reachable') and
+                (parsed_args.site is None or site_id == parsed_args.site) and
+                (parsed_args.system_ip is None or system_ip == parsed_args.system_ip))
+        ]
+        # Sort device list by hostname then system ip
+        matched_items.sort(key=attrgetter('hostname', 'system_ip'))
+
+        self.log_info(f'Device selection matched {len(matched_items)} devices')
+
+        return matched_items
+
+    def records(self, parsed_args, api):
+        if parsed_args.checkpoint_file is not None:
+            return self.records_incremental(parsed_args, api)
+
+        if parsed_args.page_size is None:
+            return super().records(parsed_args, api)
+
+        return self.records_page(parsed_args, api)
+
+    def records_page(self, parsed_args, api):
+        """
+        Retrieve a single page of alarms or events via the vManage scroll API. When more records are available,
+        result_info next_cursor is set with the cursor to the next page.
+        """
+        if parsed_args.cursor is None:
+            scroll_id = None
+            end_time = datetime.now(tz=timezone.utc)
+            start_time = end_time - timedelta(days=parsed_args.days, hours=parsed_args.hours)
+        else:
+            scroll_id, start_time, end_time = decode_cursor(parsed_args.cursor)
+        self.log_info(f'Records query: {start_time:%Y-%m-%d %H:%M:%S %Z} -> {end_time:%Y-%m-%d %H:%M:%S %Z}')
+
+        op_cls = parsed_args.subtask_op_cls
+        try:
+            payload = get_records_page(api, op_cls, start_time, end_time, parsed_args.page_size, scroll_id)
+        except RestAPIException as ex:
+            self.log_error(f'Failed to retrieve {parsed_args.subtask_info.lower()}: {ex}')
+            return []
+
+        page_info = payload['pageInfo']
+        if page_info.get('hasMoreData') and page_info.get('scrollId'):
+            self.result_info['next_cursor'] = encode_cursor(page_info['scrollId'], start_time, end_time)
+
+        return self.records_tables(parsed_args, api, op_cls(payload))
+
+    def records_incremental(self, parsed_args, api):
+        """
+        Retrieve alarms or events newer than the high-water mark persisted in parsed_args.checkpoint_file, oldest first
+        and up to parsed_args.max records. Records sharing the high-water mark entry time with records already
+        retrieved by the previous run are skipped. Without checkpoint, records since days/hours ago are retrieved.
+        The new high-water mark is set in result_info checkpoint, it is only persisted by run_task once the records
+        have been returned or saved, so that records are retrieved again if that fails. run_task holds the checkpoint
+        lock from before the checkpoint is loaded here until the new checkpoint is saved.
+        """
+        checkpoint_path = Path(parsed_args.checkpoint_file).expanduser().resolve()
+        op_cls = parsed_args.subtask_op_cls
+
+        checkpoint = load_json(checkpoint_path) or {}
+        end_time = datetime.now(tz=timezone.utc)
+        if checkpoint.get('entry_time') is not None:
+            start_time = entry_time_parse(checkpoint['entry_time'])
+        else:
+            start_time = end_time - timedelta(days=parsed_args.days, hours=parsed_args.hours)
+        self.log_info(f'Records query: {start_time:%Y-%m-%d %H:%M:%S %Z} -> {end_time:%Y-%m-%d %H:%M:%S %Z}')
+
+        seen_ids = set(checkpoint.get('ids', []))
+        records, payload, scroll_id = [], None, None
+        try:
+            while len(records) < parsed_args.max:
+                # Oldest first, so that records left out due to max are retrieved by the next run
+                payload = get_records_page(api, op_cls, start_time, end_time,
+                                           min(parsed_args.max - len(records), RecordItem.QUERY_SIZE_MAX),
+                                           scroll_id, sort_order='asc')
+                records.extend(record for record in payload['data'] if record_id(record) not in seen_ids)
+                scroll_id = payload['pageInfo'].get('scrollId')
+                if not payload['pageInfo'].get('hasMoreData') or scroll_id is None:
+                    break
+        except RestAPIException as ex:
+            self.log_error(f'Failed to retrieve {parsed_args.subtask_info.lower()}: {ex}')
+            return []
+        del records[parsed_args.max:]
+
+        result_tables = self.records_tables(parsed_args, api, op_cls(dict(payload, data=records)))
+
+        if records:
+            self.result_info['checkpoint'] = high_water_mark(records, checkpoint)
+
+        return result_tables
+
+    def records_tables(self, parsed_args, api, op_obj):
+        """
+        @return: List with a table of the alarms or events in op_obj, or empty list if there are none
+        """
+        device_map = {system_ip: name for _, name, system_ip, *_ in get_devices(api).extended_iter(default='-')}
+
+        def device_names(devices_field):
+            system_ips = (entry.get('system-ip', '') for entry in devices_field)
+            return ', '.join(device_map.get(system_ip, system_ip) for system_ip in system_ips)
+
+        fields = table_fields(parsed_args.subtask_op_cls, parsed_args.detail, parsed_args.simple)
+        field_conversion_fns = {**op_obj.field_conversion_fns, 'devices': device_names}
+        table = Table(*op_obj.field_info(*fields))
+        table.extend(row for row in op_obj.field_value_iter(*fields, **field_conversion_fns))
+        self.log_info(f'Retrieved {len(table)} {parsed_args.subtask_info.lower()}')
+
+        return [table] if table else []
+
+    def realtime(self, parsed_args, api):
+        """
+        Realtime commands for all selected devices are retrieved by a single pool of parsed_args.workers threads,
+        instead of one command at a time. All commands to a device share a parsed_args.device_timeout deadline, set
+        when the first request to the device is sent. Commands not completed by then are reported as failed.
+        """
+        devices = self.selected_devices(parsed_args, api)
+
+        rt_commands = []
+        for info, rt_cls in self.op_iter(OpType.RT, parsed_args, api):
+            devices_in_scope = [dev_info for dev_info in devices if rt_cls.is_in_scope(dev_info.model)]
+            if not devices_in_scope:
+                self.log_debug(f"Skipping {info.lower()}, not applicable to any of the devices selected")
+                continue
+
+            self.log_info(f'Retrieving {info.lower()} for {len(devices_in_scope)} devices')
+            rt_commands.append((info, rt_cls, devices_in_scope))
+
+        deadlines = DeviceDeadlines(parsed_args.device_timeout) if parsed_args.device_timeout is not None else None
+        pool_size = max(min(sum(len(devices_in_scope) for *_, devices_in_scope in rt_commands), parsed_args.workers), 1)
+        size_connection_pool(api, pool_size)
+
+        result_tables = []
+        with futures.ThreadPoolExecutor(pool_size) as executor:
+            rt_jobs = [
+                (info, rt_cls, [executor.submit(retrieve_device_rt, api, rt_cls, dev_info, deadlines)
+                                for dev_info in devices_in_scope])
+                for info, rt_cls, devices_in_scope in rt_commands
+            ]
+            # Tables are built in command order, while jobs for subsequent commands are still running
+            for info, rt_cls, job_list in rt_jobs:
+                table = None
+                fields = table_fields(rt_cls, parsed_args.detail, parsed_args.simple)
+                for job in job_list:
+                    device, rt_obj = job.result()
+                    if rt_obj is None:
+                        self.log_error(f'Failed to retrieve {info.lower()} from {device.hostname}')
+                        continue
+
+                    if table is None:
+                        table = Table('Device', *rt_obj.field_info(*fields), name=info)
+
+                    table.extend(
+                        (device.hostname, *row_values)
+                        for row_values in sorted(rt_obj.field_value_iter(*fields, **rt_cls.field_conversion_fns))
+                    )
+                    table.add_marker()
+
+                if table:
+                    result_tables.append(table)
+
+        return result_tables
+
+    def bulk_state(self, parsed_args, api):
+        devices = self.selected_devices(parsed_args, api)
+        table_fn = partial(self.node_table, parsed_args, devices, 'field_value_iter', ())
+
+        return self.bulk_tables(OpType.STATE, parsed_args, api, devices, [{'count': 10000}], table_fn)
+
+    def bulk_stats(self, parsed_args, api):
+        """
+        Statistics query time range is optionally split in parsed_args.shard sub-ranges, which are retrieved
+        concurrently and merged in time order. With parsed_args.aggregate, tables contain reductions of the numeric
+        fields per device and time bucket instead of averages of the newest samples.
+        """
+        devices = self.selected_devices(parsed_args, api)
+        end_time = datetime.now(tz=timezone.utc) - timedelta(days=parsed_args.days, hours=parsed_args.hours)
+        start_time = end_time - timedelta(minutes=self.STATS_QUERY_RANGE_MINS)
+        query_params_list = [
+            {
+                "endDate": shard_end.strftime(TIME_FORMAT),
+                "startDate": shard_start.strftime(TIME_FORMAT),
+                "count": 10000,
+                "timeZone": "UTC"
+            }
+            for shard_start, shard_end in time_shards(start_time, end_time, parsed_args.shard_interval)
+        ]
+        self.log_info(f'Query timestamp: {end_time:%Y-%m-%d %H:%M:%S %Z}')
+        if len(query_params_list) > 1:
+            self.log_info(f'Query split in {len(query_params_list)} shards of {parsed_args.shard}')
+
+        if parsed_args.aggregate:
+            table_fn = partial(self.aggregate_table, parsed_args, devices)
+        else:
+            table_fn = partial(self.node_table, parsed_args, devices, 'aggregated_value_iter',
+                               (self.STATS_AVG_INTERVAL_SECS,))
+
+        return self.bulk_tables(OpType.STATS, parsed_args, api, devices, query_params_list, table_fn)
+
+    def bulk_tables(self, op_type, parsed_args, api, devices, query_params_list, table_fn):
+        """
+        Retrieve bulk state or statistics for all requested commands concurrently, building one table per command
+        from the same device selection
+        @param query_params_list: List of query parameters, one query per list entry is issued for each command and
+                                  their results are merged in list order
+        @param table_fn: Function building a table from (<info>, <op_cls>, <op_obj>)
+        """
+        op_list = list(self.op_iter(op_type, parsed_args, api))
+
+        result_tables = []
+        pool_size = max(min(len(op_list) * len(query_params_list), THREAD_POOL_SIZE), 1)
+        with futures.ThreadPoolExecutor(pool_size) as executor:
+            op_jobs = []
+            for info, op_cls in op_list:
+                self.log_info(f'Retrieving {info.lower()} for {len(devices)} devices')
+                op_jobs.append((info, op_cls, [executor.submit(op_cls.get, api, **query_params)
+                                               for query_params in query_params_list]))
+
+            for info, op_cls, job_list in op_jobs:
+                op_obj_list = [job.result() for job in job_list]
+                if any(op_obj is None for op_obj in op_obj_list):
+                    self.log_error(f'Failed to retrieve {info.lower()}')
+                    continue
+
+                table = table_fn(info, op_cls, merge_op_items(op_obj_list))
+                if table:
+                    result_tables.append(table)
+
+        return result_tables
+
+    def node_table(self, parsed_args, devices, value_iter_name, value_iter_args, info, op_cls, op_obj):
+        """
+        Table with the field values of each device
+        @param value_iter_name: Name of the op_obj method iterating over node id and field values
+        @param value_iter_args: Tuple of arguments to value_iter_name preceding the fields
+        """
+        fields = table_fields(op_cls, parsed_args.detail, parsed_args.simple)
+        node_data_dict = {}
+        value_iter = getattr(op_obj, value_iter_name)
+        for node_id, *node_data_sample in value_iter(*value_iter_args, op_cls.field_node_id, *fields,
+                                                     **op_cls.field_conversion_fns):
+            node_data_dict.setdefault(node_id, []).append(node_data_sample)
+
+        return self.build_table(info, op_obj.field_info(*fields), devices, node_data_dict)
+
+    def aggregate_table(self, parsed_args, devices, info, op_cls, op_obj):
+        """
+        Table with parsed_args.aggregate reductions of the numeric fields of each time series of each device, one row
+        per parsed_args.bucket time interval, or a single row for the whole query range without bucket. Time series are
+        identified by op_cls.time_series_key (e.g. per interface for interface info, per tunnel for app-route), rows
+        include the standard non-numeric fields identifying them. Samples missing a numeric field are skipped for
+        that field.
+        """
+        table_field_list = table_fields(op_cls, parsed_args.detail, parsed_args.simple)
+        fields = [field for field in table_field_list if field in op_cls.fields_to_avg]
+        if not fields:
+            self.log_warning(f'{info} has no numeric fields to aggregate')
+            return None
+        # Standard non-numeric fields identify the time series, extended ones are counters varying between samples
+        series_fields = [
+            field for field in table_field_list
+            if field in op_cls.fields_std and field not in op_cls.fields_to_avg and
+            field not in (op_cls.field_node_id, op_cls.field_entry_time)
+        ]
+
+        bucket_ms = int(parsed_args.bucket_interval.total_seconds() * 1000) if parsed_args.bucket else None
+        # node id: {time series key: (<series field values>, {bucket: (<samples of each field>, ...)})}
+        node_series = {}
+        for sample in op_obj.field_value_iter(op_cls.field_node_id, op_cls.field_entry_time, *series_fields, *fields,
+                                              **numeric_conversion_fns(op_cls, fields)):
+            node_id, entry_time, *values = sample
+            series_values, values = values[:len(series_fields)], values[len(series_fields):]
+            series_key = time_series_key(op_cls, sample, node_id, series_values)
+            _, buckets = node_series.setdefault(node_id, {}).setdefault(series_key, (series_values, {}))
+
+            bucket = int(entry_time) - int(entry_time) % bucket_ms if bucket_ms else None
+            field_samples = buckets.setdefault(bucket, tuple([] for _ in fields))
+            for samples, value in zip(field_samples, values):
+                if is_numeric(value):
+                    samples.append(value)
+
+        reduce_fns = [AGGREGATE_FNS[name] for name in parsed_args.aggregate]
+        headers = [f'{title} {name}' for title in op_obj.field_info(*fields) for name in parsed_args.aggregate]
+        table = Table('Device', *op_obj.field_info(*series_fields), *(['Bucket'] if bucket_ms else []), *headers,
+                      name=info)
+        for device in devices:
+            series_dict = node_series.get(device.system_ip)
+            if series_dict is None:
+                self.log_info(f'{info} missing for {device.hostname}')
+                continue
+
+            for series_values, buckets in sorted(series_dict.values(), key=lambda series: [str(v) for v in series[0]]):
+                for bucket in sorted(buckets, key=lambda bucket_start: bucket_start or 0):
+                    table.add(
+                        device.hostname,
+                        *series_values,
+                        *([datetime_format(bucket)] if bucket_ms else []),
+                        *(reduce_fn(samples) if samples else None
+                          for samples in buckets[bucket] for reduce_fn in reduce_fns)
+                    )
+            table.add_marker()
+
+        return table
+
+
+class CommandArgs(BaseModel):
+    """
+    Show arguments with either a single command, as a list of command tokens in cmd, or multiple commands, as a list of
+    command strings in commands. Each command is a group (e.g. 'bfd') or a specific command (e.g. 'bfd sessions').
+    """
+    op_type: ClassVar[OpType]
+    cmd: Optional[List[str]] = None
+    commands: Optional[List[str]] = None
+
+    # Validators
+    @field_validator('cmd')
+    @classmethod
+    def validate_cmd(cls, cmd_list: Optional[List[str]]) -> Optional[List[str]]:
+        return cmd_list if cmd_list is None else validate_op_cmd(cls.op_type, cmd_list)
+
+    @field_validator('commands')
+    @classmethod
+    def validate_commands(cls, commands: Optional[List[str]]) -> Optional[List[str]]:
+        if commands is not None:
+            for command in commands:
+                validate_op_cmd(cls.op_type, command.split())
+        return commands
+
+    @model_validator(mode='after')
+    def cmd_validations(self) -> 'CommandArgs':
+        if self.cmd is None and self.commands is None:
+            raise ValueError('Either argument "cmd" or "commands" is required')
+
+        if self.cmd is not None and self.commands is not None:
+            raise ValueError('Argument "commands" not allowed with "cmd"')
+
+        return self
+
+    @property
+    def cmd_list(self) -> List[List[str]]:
+        return [self.cmd] if self.cmd is not None else [command.split() for command in self.commands]
+
+
+class ShowRealtimeArgs(CommandArgs, SastreShowRealtimeArgs):
+    op_type: ClassVar[OpType] = OpType.RT
+    subtask_handler: const(Callable, TaskShow.realtime)
+    workers: Annotated[int, Field(ge=1, le=100)] = THREAD_POOL_SIZE
+    device_timeout: Optional[Annotated[int, Field(ge=1)]] = None
+
+
+class ShowStateArgs(CommandArgs, SastreShowStateArgs):
+    op_type: ClassVar[OpType] = OpType.STATE
+    subtask_handler: const(Callable, TaskShow.bulk_state)
+
+
+class ShowStatisticsArgs(CommandArgs, SastreShowStatisticsArgs):
+    op_type: ClassVar[OpType] = OpType.STATS
+    subtask_handler: const(Callable, TaskShow.bulk_stats)
+    shard: Optional[str] = None
+    aggregate: Optional[List[Literal['min', 'avg', 'max', 'p95']]] = None
+    bucket: Optional[str] = None
+
+    # Validators
+    @field_validator('shard', 'bucket')
+    @classmethod
+    def validate_interval(cls, interval: Optional[str]) -> Optional[str]:
+        if interval is not None:
+            parse_interval(interval)
+        return interval
+
+    @model_validator(mode='after')
+    def aggregate_validations(self) -> 'ShowStatisticsArgs':
+        if self.bucket is not None and not self.aggregate:
+            raise ValueError('Argument "bucket" requires "aggregate"')
+
+        query_range = timedelta(minutes=TaskShow.STATS_QUERY_RANGE_MINS)
+        if self.shard is not None and self.shard_interval >= query_range:
+            raise ValueError(f'Argument "shard" must be less than the statistics query time range '
+                             f'({TaskShow.STATS_QUERY_RANGE_MINS} minutes)')
+
+        return self
+
+    @property
+    def shard_interval(self) -> Optional[timedelta]:
+        return parse_interval(self.shard) if self.shard is not None else None
+
+    @property
+    def bucket_interval(self) -> Optional[timedelta]:
+        return parse_interval(self.bucket) if self.bucket is not None else None
+
+
+class PageArgs(BaseModel):
+    """
+    Alarms and events arguments to retrieve one page of page_size records at a time. The first page is retrieved
+    without cursor, subsequent pages with the cursor returned with the previous page.
+    """
+    page_size: Optional[Annotated[int, Field(ge=1, le=RecordItem.QUERY_SIZE_MAX)]] = None
+    cursor: Optional[str] = None
+
+    # Validators
+    @field_validator('cursor')
+    @classmethod
+    def validate_cursor(cls, cursor: Optional[str]) -> Optional[str]:
+        if cursor is not None:
+            decode_cursor(cursor)
+        return cursor
+
+    @model_validator(mode='after')
+    def page_validations(self) -> 'PageArgs':
+        if self.cursor is not None and self.page_size is None:
+            raise ValueError('Argument "cursor" requires "page_size"')
+
+        return self
+
+
+class CheckpointArgs(BaseModel):
+    """
+    Alarms and events arguments to retrieve only records newer than those retrieved by the previous run with the same
+    checkpoint_file
+    """
+    checkpoint_file: Optional[str] = None
+
+    @model_validator(mode='after')
+    def checkpoint_validations(self) -> 'CheckpointArgs':
+        if self.checkpoint_file is not None and getattr(self, 'page_size', None) is not None:
+            raise ValueError('Argument "checkpoint_file" not allowed with "page_size"')
+
+        return self
+
+
+class ShowAlarmsArgs(PageArgs, CheckpointArgs, SastreShowAlarmsArgs):
+    subtask_handler: const(Callable, TaskShow.records)
+
+
+class ShowEventsArgs(PageArgs, CheckpointArgs, SastreShowEventsArgs):
+    subtask_handler: const(Callable, TaskShow.records)
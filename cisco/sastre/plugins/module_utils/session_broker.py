@@ -0,0 +1,64 @@
+"""
+Sastre-Ansible session broker client. Modules borrow authenticated vManage sessions from a session broker running on
+the Ansible controller (plugin_utils/session_broker.py), over a Unix socket.
+"""
+import json
+import socket
+
+BROKER_CLIENT_TIMEOUT = 60
+
+
+class BrokerException(ConnectionError):
+    """ Session broker request failed """
+    pass
+
+
+class BrokerUnavailableException(BrokerException):
+    """ Session broker is not running or not reachable """
+    pass
+
+
+def broker_request(socket_path, request):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(BROKER_CLIENT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode() + b'\n')
+            with sock.makefile('rb') as sock_file:
+                response = json.loads(sock_file.readline())
+    except (FileNotFoundError, ConnectionRefusedError) as ex:
+        raise BrokerUnavailableException(f"Session broker not running on {socket_path}: {ex}") from None
+    except (OSError, ValueError) as ex:
+        raise BrokerException(f"Session broker request failed: {ex}") from None
+
+    if 'error' in response:
+        raise BrokerException(f"Session broker error: {response['error']}")
+
+    return response
+
+
+def broker_session_state(socket_path, api_args):
+    """
+    Borrow an authenticated session from the session broker
+    @param socket_path: Unix socket where the session broker is listening
+    @param api_args: Rest API arguments, as returned by sdwan_api_args
+    @return: (session state dict, lease id) tuple. Session state is to be used with SessionRest, lease id is to be
+             passed to broker_release once the session is no longer used.
+    """
+    response = broker_request(socket_path, {'op': 'acquire', 'api_args': api_args})
+
+    return response['state'], response['lease']
+
+
+def broker_release(socket_path, lease):
+    """
+    Return a borrowed session to the session broker
+    """
+    broker_request(socket_path, {'op': 'release', 'lease': lease})
+
+
+def broker_invalidate(socket_path, api_args):
+    """
+    Notify the session broker that a borrowed session is no longer valid
+    """
+    broker_request(socket_path, {'op': 'invalidate', 'api_args': api_args})
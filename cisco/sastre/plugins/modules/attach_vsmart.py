@@ -110,6 +110,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -203,7 +218,7 @@ def main():
             **module_params('workdir', 'attach_file', 'templates', 'config_groups', 'devices', 'reachable', 'activate', 'site', 'system_ip',
                             'dryrun', 'batch', module_param_dict=module.params)
         )
-        task_result = run_task(TaskAttach, task_args, module.params)
+        task_result = run_task(TaskAttach, task_args, module.params, module._socket_path)
 
         result = {
             "changed": False
@@ -39,6 +39,46 @@ options:
     required: false
     type: bool
     default: False
+  incremental_from:
+    description:
+    - Previous backup directory, under the same 'data' directory as workdir. Only items that changed since that
+      backup are written, files with the same content are hard-linked to the previous backup files (copied if on a
+      different file system). Items whose vManage index entry, including its last updated timestamp, is unchanged
+      are not retrieved from vManage. Items without a last updated timestamp are always retrieved, as are config
+      groups whose associated devices changed. A backup_manifest.json file with the SHA-256 digest of each file is
+      saved with the backup, to be used by the next incremental backup. When incremental_from is the same as
+      workdir, the backup is based on the previous backup renamed by the automatic rollover. When the previous
+      backup does not exist, such as on the first run, a full backup is saved (with its backup_manifest.json) and
+      a warning is logged.
+    - Hard-linked files are the same files in both backups, editing a file in either backup also changes it in the
+      other one. Edit a copy of the file instead.
+    required: false
+    type: str
+  workers:
+    description:
+    - Number of index and item requests sent to vManage concurrently. Items are saved in the same order and to the
+      same files as when retrieved one at a time.
+    required: false
+    type: int
+    default: 1
+  vmanage_concurrency:
+    description:
+    - Maximum number of concurrent requests to the same vManage, shared by all backup tasks running on this host, or
+      can also be defined via SASTRE_VMANAGE_CONCURRENCY environment variable. By default, only workers limits the
+      number of concurrent requests of each task.
+    required: false
+    type: int
+  store:
+    description:
+    - Content-addressed backup store directory, under the same 'data' directory as workdir. Each backup file is
+      saved to the store once, named after the SHA-256 digest of its content, so files with the same content are
+      shared by all backups in the store, across vManages and dates. Workdir then only contains a
+      backup_manifest.json file mapping each backup file to its digest. The restore, list_configuration,
+      list_transform and transform modules read backups saved to a store the same as regular backups. Store files
+      are read-only and are not removed when backups are deleted. Can be combined with incremental_from, in which
+      case items not retrieved from vManage are loaded from the previous backup. Not allowed together with archive.
+    required: false
+    type: str
   regex:
     description:
     - Regular expression matching item names to be backed up, within selected tags
@@ -103,6 +143,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -133,6 +188,33 @@ EXAMPLES = """
     workdir: backup_test_3
     regex: ".*"
     tags: "all"
+- name: "Backup all vManage configuration with 8 concurrent requests, at most 16 across all hosts to this vManage"
+  cisco.sastre.backup:
+    address: "198.18.1.10"
+    user: admin
+    password: admin
+    workers: 8
+    vmanage_concurrency: 16
+    tags: "all"
+- name: "Nightly incremental backup, based on the previous backup in the same workdir"
+  cisco.sastre.backup:
+    address: "198.18.1.10"
+    user: admin
+    password: admin
+    workdir: backup_nightly
+    incremental_from: backup_nightly
+    tags: "all"
+- name: "Daily backup of two vManages to a shared backup store"
+  cisco.sastre.backup:
+    address: "{{ item }}"
+    user: admin
+    password: admin
+    workdir: "backup_{{ item }}_{{ ansible_date_time.date }}"
+    store: backup_store
+    tags: "all"
+  loop:
+    - "198.18.1.10"
+    - "198.18.1.11"
 - name: "Backup vManage configuration with all defaults"
   cisco.sastre.backup: 
     address: "198.18.1.10"
@@ -152,15 +234,26 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: ['Successfully backed up files at backup_198.18.1.10_20210628']
+incremental:
+  description: Base backup directory and number of files written, linked and items not retrieved from vManage.
+    base_workdir is null when the previous backup was not found and a full backup was saved.
+  returned: when incremental_from is set
+  type: dict
+  sample: {"base_workdir": "data/backup_nightly_1", "written": 12, "linked": 1630, "fetch_skipped": 1201}
+store:
+  description: Backup store directory, number of files written to the store and files already in the store
+  returned: when store is set
+  type: dict
+  sample: {"path": "backup_store", "written": 12, "deduplicated": 1630}
 """
-from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.basic import AnsibleModule, env_fallback
 from pydantic import ValidationError
 from cisco_sdwan.tasks.utils import default_workdir
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskBackup, BackupArgs
 from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from ansible_collections.cisco.sastre.plugins.module_utils.common_backup import TaskBackup, BackupArgs
 
 
 def main():
@@ -172,11 +265,15 @@ def main():
         save_running=dict(type="bool"),
         workdir=dict(type="str"),
         archive=dict(type="str"),
+        incremental_from=dict(type="str"),
+        workers=dict(type="int", default=1),
+        vmanage_concurrency=dict(type="int", fallback=(env_fallback, ['SASTRE_VMANAGE_CONCURRENCY'])),
+        store=dict(type="str"),
         tags=dict(type="list", elements="str", required=True)
     )
     module = AnsibleModule(
         argument_spec=argument_spec,
-        mutually_exclusive=[('regex', 'not_regex'), ('workdir', 'archive')],
+        mutually_exclusive=[('regex', 'not_regex'), ('workdir', 'archive'), ('store', 'archive')],
         supports_check_mode=True
     )
 
@@ -186,9 +283,10 @@ def main():
 
         task_args = BackupArgs(
             **module_params('workdir', 'archive', 'regex', 'not_regex', 'no_rollover', 'save_running', 'tags',
+                            'incremental_from', 'workers', 'vmanage_concurrency', 'store',
                             module_param_dict=module.params)
         )
-        task_result = run_task(TaskBackup, task_args, module.params)
+        task_result = run_task(TaskBackup, task_args, module.params, module._socket_path)
 
         result = {
             "changed": False
@@ -64,6 +64,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -94,10 +109,10 @@ stdout:
 """
 from ansible.module_utils.basic import AnsibleModule
 from cisco_sdwan.tasks.common import TaskException
-from cisco_sdwan.base.rest_api import RestAPIException, Rest
+from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
 from cisco_sdwan.base.models_vmanage import DeviceBootstrap
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, sdwan_api_args
+from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, api_session
 
 
 def main():
@@ -114,7 +129,7 @@ def main():
     )
 
     try:
-        with Rest(**sdwan_api_args(module_param_dict=module.params)) as api:
+        with api_session(module.params, module._socket_path) as api:
             response = DeviceBootstrap.get(api, **module_params('uuid', 'config_type', 'include_default_root_certs',
                                                                 'version', module_param_dict=module.params))
 
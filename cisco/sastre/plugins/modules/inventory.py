@@ -43,6 +43,30 @@ options:
     - Match on device type to include. Supported values are 'vmanage', 'vsmart', 'vbond', 'vedge', 'cedge'
     required: false
     type: str
+  max_age:
+    description:
+    - Maximum age in seconds of cached device data. When greater than 0, the vManage device list and device models
+      are cached in-process and on disk, and inventory queries within this period are answered from the cache,
+      regardless of filters. Default 0 disables caching.
+    required: false
+    type: int
+    default: 0
+  refresh:
+    description:
+    - When set to true, cached device data is not used and the cache is updated from vManage.
+    required: false
+    type: bool
+    default: False
+  snapshot_file:
+    description:
+    - Path to a device snapshot file. When provided, only devices added, removed or changed since the snapshot are
+      returned, and the snapshot is updated with the current devices. Devices are compared by uuid on name, system
+      IP, site ID, reachability and version. The snapshot file is created on first use, with all devices reported as
+      added. A separate snapshot file should be used for each set of filters. The task reports changed when the
+      snapshot file is updated. In check mode, the delta against the snapshot is returned and changed reports whether
+      the snapshot would be updated, but the snapshot file is not written.
+    required: false
+    type: str
   address:
     description:
     - vManage IP address or can also be defined via VMANAGE_IP environment variable
@@ -75,6 +99,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -99,6 +138,15 @@ EXAMPLES = """
     port: 8443
     user: admin
     password: admin
+- name: Get devices added, removed or changed since last run
+  cisco.sastre.inventory:
+    device_type: cedge
+    snapshot_file: inventory_snapshot.json
+    address: 198.18.1.10
+    port: 8443
+    user: admin
+    password: admin
+  register: inventory_delta
 """
 
 RETURN = """
@@ -112,15 +160,26 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: show table view data
+json:
+  description:
+  - List of matched devices. When snapshot_file is provided, dict with the snapshot generation and the lists of
+    added, removed and changed devices. Changed devices include a previous dict with the former values of the
+    attributes that changed.
+  returned: success
+  type: raw
+  sample: {"generation": 2, "added": [], "removed": [], "changed": [{"name": "cEdge_1", "state": "unreachable",
+           "previous": {"state": "reachable"}}]}
 """
 from ansible.module_utils.basic import AnsibleModule
 from pydantic import ValidationError
 from cisco_sdwan.base.rest_api import RestAPIException
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params
-from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import get_matched_devices, InventoryArgs
+from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, exit_module
+from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import (
+    get_matched_devices, get_device_delta, InventoryArgs
+)
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         regex_list=dict(type="list", elements="str"),
@@ -129,29 +188,49 @@ def main():
         reachable=dict(type="bool"),
         site=dict(type="str"),
         system_ip=dict(type="str"),
-        device_type=dict(type="str")
-    )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('regex', 'not_regex', 'regex_list')],
-        supports_check_mode=True
+        device_type=dict(type="str"),
+        max_age=dict(type="int", default=0),
+        refresh=dict(type="bool", default=False),
+        snapshot_file=dict(type="str")
     )
 
+    return argument_spec
+
+
+MUTUALLY_EXCLUSIVE = [('regex', 'not_regex', 'regex_list')]
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = InventoryArgs(**module_params('regex_list', 'regex', 'not_regex', 'reachable', 'site', 'system_ip',
-                                                  'device_type', module_param_dict=module.params))
-        task_result = get_matched_devices(module.params, task_args)
+                                                  'device_type', module_param_dict=module_param_dict))
+        snapshot_updated = False
+        if module_param_dict.get('snapshot_file') is not None:
+            task_result, snapshot_updated = get_device_delta(module_param_dict, task_args,
+                                                             module_param_dict['snapshot_file'], socket_path,
+                                                             check_mode)
+        else:
+            task_result = get_matched_devices(module_param_dict, task_args, socket_path)
 
         result = {
-            "changed": False,
+            "changed": snapshot_updated,
             "json": task_result
         }
-        module.exit_json(**result)
+        return result
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid inventory parameter: {ex}")
-    except (RestAPIException, ConnectionError) as ex:
-        module.fail_json(msg=f"inventory error: {ex}")
+        return {"failed": True, "msg": f"Invalid inventory parameter: {ex}"}
+    except (RestAPIException, ConnectionError, FileNotFoundError) as ex:
+        return {"failed": True, "msg": f"inventory error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
@@ -35,6 +35,7 @@ options:
   workdir:
     description:
     - list will read from the specified directory instead of target vManage. Either workdir or vManage address/user/password is mandatory
+    - Backups saved to a content-addressed backup store, via the backup module store option, are also supported.
     required: false
     type: str
   save_csv:
@@ -47,6 +48,14 @@ options:
     - Export table as a json file
     required: false
     type: str
+  compress:
+    description:
+    - Compress files exported with save_csv and save_json while they are written. A .gz or .zst suffix is appended
+      to file names, according to the compression format. zstd requires the zstandard Python package. Result tables
+      are not returned in the module result, as with save_csv and save_json. Requires save_csv or save_json.
+    required: false
+    type: str
+    choices: ["gzip", "zstd"]
   tags:
     description:
     - Defines one or more tags for selecting groups of items. Multiple tags should be
@@ -79,6 +88,40 @@ options:
       For transform option, this param is mandatory.
     required: true
     type: str
+  output:
+    description:
+    - Result content. text returns result tables rendered as text in stdout, tables returns them as a list of table
+      dicts in tables, both returns stdout and tables, none returns neither. Rendering wide tables as text is costly,
+      use tables or none when stdout is not needed.
+    required: false
+    type: str
+    choices: ["both", "text", "tables", "none"]
+    default: "both"
+  table_format:
+    description:
+    - Layout of table dicts returned in tables. rows returns table data as a list of row dicts, keyed by column id.
+      columnar returns column ids once in columns and table data as a list of row value lists in rows, so that
+      column ids are not repeated in every row. Much smaller and faster to serialize for large results.
+    required: false
+    type: str
+    choices: ["rows", "columnar"]
+    default: "rows"
+  output_file:
+    description:
+    - Write result tables to this file instead of returning them in the module result. Table rows are written
+      to the file table by table, the module result only includes a summary with the number of rows of each table
+      (output_summary) and the file path (output_file). Useful with large results, which are otherwise held in
+      memory multiple times and transferred back to the controller.
+    required: false
+    type: str
+  output_format:
+    description:
+    - Format of output_file. jsonl writes one JSON object per table row, with the table name and row values keyed
+      by column title. json writes a JSON list of tables, in the same format as save_json.
+    required: false
+    type: str
+    choices: ["jsonl", "json"]
+    default: "jsonl"
   address:
     description:
     - vManage IP address or can also be defined via VMANAGE_IP environment variable
@@ -111,6 +154,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -153,6 +211,21 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: show table view data
+output_file:
+  description: Path of the file where result tables were written
+  returned: when output_file is set
+  type: str
+  sample: 'show_output.jsonl'
+output_summary:
+  description: Name and number of rows of each table written to output_file
+  returned: when output_file is set
+  type: list
+  sample: [{"name": "Control connections", "rows": 42}]
+saved_files:
+  description: Compressed files written with save_csv and save_json
+  returned: when compress is set along with save_csv or save_json
+  type: list
+  sample: ["list_transform.csv.gz", "list_transform.json.gz"]
 """
 from ansible.module_utils.basic import AnsibleModule
 from pydantic import ValidationError
@@ -160,10 +233,13 @@ from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
 from cisco_sdwan.tasks.implementation import TaskList, ListTransformArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, output_arg_spec, OUTPUT_REQUIRED_IF, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_backup import workdir_view
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         regex=dict(type="str"),
@@ -176,28 +252,44 @@ def main():
         tags=dict(type="list", elements="str", required=True),
         name_regex=dict(type="str", required=True)
     )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('regex', 'not_regex')],
-        supports_check_mode=True
-    )
+    argument_spec.update(output_arg_spec())
+
+    return argument_spec
+
 
+MUTUALLY_EXCLUSIVE = [('regex', 'not_regex')]
+
+REQUIRED_IF = OUTPUT_REQUIRED_IF
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
-        task_args = ListTransformArgs(
-            **module_params('regex', 'not_regex', 'exclude', 'include', 'workdir', 'save_csv', 'save_json', 'tags',
-                            'name_regex', module_param_dict=module.params)
-        )
-        task_result = run_task(TaskList, task_args, module.params)
+        with workdir_view(module_param_dict['workdir']) as workdir:
+            task_args = ListTransformArgs(
+                **module_params('regex', 'not_regex', 'exclude', 'include', 'workdir', 'save_csv', 'save_json', 'tags',
+                                'name_regex', module_param_dict={**module_param_dict, 'workdir': workdir})
+            )
+            task_result = run_task(TaskList, task_args, module_param_dict, socket_path, check_mode)
 
         result = {
             "changed": False
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid list transform parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid list transform parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"List transform error: {ex}")
+        return {"failed": True, "msg": f"List transform error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        required_if=REQUIRED_IF,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
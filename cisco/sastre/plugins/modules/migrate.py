@@ -91,6 +91,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -160,7 +175,7 @@ def main():
             **module_params('scope', 'output', 'no_rollover', 'name', 'from_version', 'to_version', 'workdir',
                             module_param_dict=module.params)
         )
-        task_result = run_task(TaskMigrate, task_args, module.params)
+        task_result = run_task(TaskMigrate, task_args, module.params, module._socket_path)
 
         result = {
             "changed": False
@@ -33,7 +33,8 @@ options:
     type: str
   diff:
     description: 
-    - generate diff between the specified previous report and the current report
+    - generate diff between the specified previous report and the current report. The previous report may be gzip
+      or zstd compressed, it is decompressed transparently.
     required: false
     type: str
   address:
@@ -74,6 +75,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -107,11 +123,14 @@ from ansible.module_utils.basic import AnsibleModule
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskReport, ReportCreateArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from cisco_sdwan.tasks.implementation import ReportCreateArgs
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_report import TaskReport
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         workdir=dict(type="str"),
@@ -120,28 +139,39 @@ def main():
         spec_json=dict(type="json"),
         diff=dict(type="str")
     )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('spec_file', 'spec_json')],
-        supports_check_mode=True
-    )
 
+    return argument_spec
+
+
+MUTUALLY_EXCLUSIVE = [('spec_file', 'spec_json')]
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = ReportCreateArgs(
-            **module_params('workdir', 'file', 'spec_file', 'spec_json', 'diff', module_param_dict=module.params)
+            **module_params('workdir', 'file', 'spec_file', 'spec_json', 'diff', module_param_dict=module_param_dict)
         )
-        task_result = run_task(TaskReport, task_args, module.params)
+        task_result = run_task(TaskReport, task_args, module_param_dict, socket_path, check_mode)
 
         # changed flag is True when 'diff' option is provided and diff comparison indicates differences between reports
         result = {
-            "changed": module.params['diff'] is not None and len(task_result.get('stdout', '').splitlines()) > 4
+            "changed": module_param_dict['diff'] is not None and len(task_result.get('stdout', '').splitlines()) > 4
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid report create parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid report create parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"Report create error: {ex}")
+        return {"failed": True, "msg": f"Report create error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
@@ -13,12 +13,12 @@ notes:
 options: 
   report_a:
     description: 
-    - report a filename (from)
+    - report a filename (from). gzip or zstd compressed reports are decompressed transparently.
     required: true
     type: str
   report_b:
     description: 
-    - report b filename (to)
+    - report b filename (to). gzip or zstd compressed reports are decompressed transparently.
     required: true
     type: str
   spec_file:
@@ -79,6 +79,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -109,11 +124,14 @@ from ansible.module_utils.basic import AnsibleModule
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskReport, ReportDiffArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from cisco_sdwan.tasks.implementation import ReportDiffArgs
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_report import TaskReport
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         report_a=dict(type="str", required=True),
@@ -123,28 +141,39 @@ def main():
         save_html=dict(type="str"),
         save_txt=dict(type="str")
     )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('spec_file', 'spec_json')],
-        supports_check_mode=True
-    )
 
+    return argument_spec
+
+
+MUTUALLY_EXCLUSIVE = [('spec_file', 'spec_json')]
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = ReportDiffArgs(
             **module_params('report_a', 'report_b', 'spec_file', 'spec_json', 'save_html', 'save_txt',
-                            module_param_dict=module.params)
+                            module_param_dict=module_param_dict)
         )
-        task_result = run_task(TaskReport, task_args, module.params)
+        task_result = run_task(TaskReport, task_args, module_param_dict, socket_path, check_mode)
 
         result = {
             "changed": False
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid report diff parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid report diff parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"Report diff error: {ex}")
+        return {"failed": True, "msg": f"Report diff error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
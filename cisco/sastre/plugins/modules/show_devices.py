@@ -59,6 +59,48 @@ options:
     - Export results as JSON-formatted file
     required: false
     type: str
+  compress:
+    description:
+    - Compress files exported with save_csv and save_json while they are written. A .gz or .zst suffix is appended
+      to file names, according to the compression format. zstd requires the zstandard Python package. Result tables
+      are not returned in the module result, as with save_csv and save_json. Requires save_csv or save_json.
+    required: false
+    type: str
+    choices: ["gzip", "zstd"]
+  output:
+    description:
+    - Result content. text returns result tables rendered as text in stdout, tables returns them as a list of table
+      dicts in tables, both returns stdout and tables, none returns neither. Rendering wide tables as text is costly,
+      use tables or none when stdout is not needed.
+    required: false
+    type: str
+    choices: ["both", "text", "tables", "none"]
+    default: "both"
+  table_format:
+    description:
+    - Layout of table dicts returned in tables. rows returns table data as a list of row dicts, keyed by column id.
+      columnar returns column ids once in columns and table data as a list of row value lists in rows, so that
+      column ids are not repeated in every row. Much smaller and faster to serialize for large results.
+    required: false
+    type: str
+    choices: ["rows", "columnar"]
+    default: "rows"
+  output_file:
+    description:
+    - Write result tables to this file instead of returning them in the module result. Table rows are written
+      to the file table by table, the module result only includes a summary with the number of rows of each table
+      (output_summary) and the file path (output_file). Useful with large results, which are otherwise held in
+      memory multiple times and transferred back to the controller.
+    required: false
+    type: str
+  output_format:
+    description:
+    - Format of output_file. jsonl writes one JSON object per table row, with the table name and row values keyed
+      by column title. json writes a JSON list of tables, in the same format as save_json.
+    required: false
+    type: str
+    choices: ["jsonl", "json"]
+    default: "jsonl"
   address:
     description:
     - vManage IP address or can also be defined via VMANAGE_IP environment variable
@@ -91,6 +133,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -132,17 +189,35 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: show table view data
+output_file:
+  description: Path of the file where result tables were written
+  returned: when output_file is set
+  type: str
+  sample: 'show_output.jsonl'
+output_summary:
+  description: Name and number of rows of each table written to output_file
+  returned: when output_file is set
+  type: list
+  sample: [{"name": "Control connections", "rows": 42}]
+saved_files:
+  description: Compressed files written with save_csv and save_json
+  returned: when compress is set along with save_csv or save_json
+  type: list
+  sample: ["show_state_csv/control_connections.csv.gz", "show_state.json.gz"]
 """
 from ansible.module_utils.basic import AnsibleModule
 from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowDevicesArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from cisco_sdwan.tasks.implementation import ShowDevicesArgs
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, output_arg_spec, OUTPUT_REQUIRED_IF, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         exclude=dict(type="str"),
@@ -155,28 +230,43 @@ def main():
         save_csv=dict(type="str"),
         save_json=dict(type="str")
     )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('regex', 'not_regex')],
-        supports_check_mode=True
-    )
+    argument_spec.update(output_arg_spec())
+
+    return argument_spec
 
+
+MUTUALLY_EXCLUSIVE = [('regex', 'not_regex')]
+
+REQUIRED_IF = OUTPUT_REQUIRED_IF
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = ShowDevicesArgs(
             **module_params('exclude', 'include', 'regex', 'not_regex', 'reachable', 'site', 'system_ip', 'save_csv',
-                            'save_json', module_param_dict=module.params)
+                            'save_json', module_param_dict=module_param_dict)
         )
-        task_result = run_task(TaskShow, task_args, module.params)
+        task_result = run_task(TaskShow, task_args, module_param_dict, socket_path, check_mode)
 
         result = {
             "changed": False
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid show devices parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid show devices parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"Show devices error: {ex}")
+        return {"failed": True, "msg": f"Show devices error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        required_if=REQUIRED_IF,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
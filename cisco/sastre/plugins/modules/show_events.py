@@ -53,6 +53,30 @@ options:
     required: false
     type: bool
     default: False
+  page_size:
+    description:
+    - Retrieve events one page of page_size records at a time, using the vManage scroll API. When more records are
+      available, next_cursor is returned and the next page is retrieved by providing it as cursor. Mutually
+      exclusive with max.
+    required: false
+    type: int
+  cursor:
+    description:
+    - Cursor to the next page of events, as returned in next_cursor by the previous page. The query time window of
+      the first page is kept, days and hours are ignored. Requires page_size.
+    required: false
+    type: str
+  checkpoint_file:
+    description:
+    - Retrieve only events newer than those retrieved by the previous run with the same checkpoint_file. The entry
+      time and ids of the newest events retrieved are saved to this file, which is created on first use. On the
+      first run, events since days/hours ago are retrieved. Events are retrieved oldest first, up to max
+      per run, events left out due to max are retrieved by the next run. The checkpoint also covers events
+      filtered out by include or exclude. The checkpoint is only updated once events have been returned or saved
+      to files, if that fails the same events are retrieved by the next run. In check mode, the checkpoint file is
+      not updated.
+    required: false
+    type: str
   save_csv:
     description:
     - Export results as CSV files under the specified directory
@@ -63,6 +87,56 @@ options:
     - Export results as JSON-formatted file
     required: false
     type: str
+  compress:
+    description:
+    - Compress files exported with save_csv and save_json while they are written. A .gz or .zst suffix is appended
+      to file names, according to the compression format. zstd requires the zstandard Python package. Result tables
+      are not returned in the module result, as with save_csv and save_json. Requires save_csv or save_json.
+    required: false
+    type: str
+    choices: ["gzip", "zstd"]
+  save_parquet:
+    description:
+    - Export result tables as Parquet files, with typed columns and zstd compression, under the specified directory.
+      Tables are written one row group at a time. Requires the pyarrow Python package, tables are written as Arrow
+      IPC (Feather) files instead if pyarrow is built without Parquet support. Result tables are not returned in the
+      module result. Mutually exclusive with save_csv and save_json.
+    required: false
+    type: str
+  output:
+    description:
+    - Result content. text returns result tables rendered as text in stdout, tables returns them as a list of table
+      dicts in tables, both returns stdout and tables, none returns neither. Rendering wide tables as text is costly,
+      use tables or none when stdout is not needed.
+    required: false
+    type: str
+    choices: ["both", "text", "tables", "none"]
+    default: "both"
+  table_format:
+    description:
+    - Layout of table dicts returned in tables. rows returns table data as a list of row dicts, keyed by column id.
+      columnar returns column ids once in columns and table data as a list of row value lists in rows, so that
+      column ids are not repeated in every row. Much smaller and faster to serialize for large results.
+    required: false
+    type: str
+    choices: ["rows", "columnar"]
+    default: "rows"
+  output_file:
+    description:
+    - Write result tables to this file instead of returning them in the module result. Table rows are written
+      to the file table by table, the module result only includes a summary with the number of rows of each table
+      (output_summary) and the file path (output_file). Useful with large results, which are otherwise held in
+      memory multiple times and transferred back to the controller.
+    required: false
+    type: str
+  output_format:
+    description:
+    - Format of output_file. jsonl writes one JSON object per table row, with the table name and row values keyed
+      by column title. json writes a JSON list of tables, in the same format as save_json.
+    required: false
+    type: str
+    choices: ["jsonl", "json"]
+    default: "jsonl"
   address:
     description:
     - vManage IP address or can also be defined via VMANAGE_IP environment variable
@@ -95,6 +169,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -117,6 +206,26 @@ EXAMPLES = """
     port: 8443
     user: admin
     password: admin
+- name: Show events from the last day, 1000 at a time, continuing from the previous page
+  cisco.sastre.show_events:
+    days: 1
+    hours: 0
+    page_size: 1000
+    cursor: "{{ previous_page.next_cursor | default(omit) }}"
+    output: tables
+    address: 198.18.1.10
+    port: 8443
+    user: admin
+    password: admin
+  register: previous_page
+- name: Show events since the previous run, polled periodically
+  cisco.sastre.show_events:
+    max: 10000
+    checkpoint_file: "{{ playbook_dir }}/events_checkpoint.json"
+    address: 198.18.1.10
+    port: 8443
+    user: admin
+    password: admin
 """
 
 RETURN = """
@@ -130,17 +239,46 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: show table view data
+output_file:
+  description: Path of the file where result tables were written
+  returned: when output_file is set
+  type: str
+  sample: 'show_output.jsonl'
+output_summary:
+  description: Name and number of rows of each table written to output_file
+  returned: when output_file is set
+  type: list
+  sample: [{"name": "Control connections", "rows": 42}]
+next_cursor:
+  description: Cursor to the next page of events, only returned when page_size is set and more events are available
+  returned: when more events are available
+  type: str
+  sample: 'eyJzY3JvbGxfaWQiOiAiRjFZUkY...'
+checkpoint:
+  description:
+  - High-water mark of the events retrieved, saved to checkpoint_file once results have been returned or written to
+    files. Entry time is in milliseconds since epoch, ids are those of the events retrieved with that entry time.
+  returned: when checkpoint_file is set and new events were retrieved
+  type: dict
+  sample: {"entry_time": 1718035200000.0, "ids": ["a3c1e2f0-5d41-4c1e-9f3a-0b6f1c2d7e11"], "timestamp": 1718035260.5}
+saved_files:
+  description: Compressed files written with save_csv and save_json
+  returned: when compress is set along with save_csv or save_json
+  type: list
+  sample: ["show_state_csv/control_connections.csv.gz", "show_state.json.gz"]
 """
 from ansible.module_utils.basic import AnsibleModule
 from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowEventsArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, output_arg_spec, OUTPUT_REQUIRED_IF, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow, ShowEventsArgs
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         exclude=dict(type="str"),
@@ -151,30 +289,50 @@ def main():
         detail=dict(type="bool"),
         simple=dict(type="bool"),
         save_csv=dict(type="str"),
-        save_json=dict(type="str")
-    )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('detail', 'simple')],
-        supports_check_mode=True
+        save_json=dict(type="str"),
+        save_parquet=dict(type="str"),
+        page_size=dict(type="int"),
+        cursor=dict(type="str"),
+        checkpoint_file=dict(type="str")
     )
+    argument_spec.update(output_arg_spec())
+
+    return argument_spec
+
+
+MUTUALLY_EXCLUSIVE = [('detail', 'simple'), ('max', 'page_size'), ('checkpoint_file', 'page_size'),
+                      ('checkpoint_file', 'cursor'), ('save_csv', 'save_parquet'), ('save_json', 'save_parquet')]
 
+REQUIRED_IF = OUTPUT_REQUIRED_IF
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = ShowEventsArgs(
             **module_params('exclude', 'include', 'max', 'days', 'hours', 'detail', 'simple', 'save_csv', 'save_json',
-                            module_param_dict=module.params)
+                            'page_size', 'cursor', 'checkpoint_file', module_param_dict=module_param_dict)
         )
-        task_result = run_task(TaskShow, task_args, module.params)
+        task_result = run_task(TaskShow, task_args, module_param_dict, socket_path, check_mode)
 
         result = {
             "changed": False
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid show events parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid show events parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"Show events error: {ex}")
+        return {"failed": True, "msg": f"Show events error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        required_if=REQUIRED_IF,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
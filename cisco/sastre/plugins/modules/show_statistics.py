@@ -59,14 +59,38 @@ options:
     - Export results as JSON-formatted file
     required: false
     type: str
+  compress:
+    description:
+    - Compress files exported with save_csv and save_json while they are written. A .gz or .zst suffix is appended
+      to file names, according to the compression format. zstd requires the zstandard Python package. Result tables
+      are not returned in the module result, as with save_csv and save_json. Requires save_csv or save_json.
+    required: false
+    type: str
+    choices: ["gzip", "zstd"]
+  save_parquet:
+    description:
+    - Export result tables as Parquet files, with typed columns and zstd compression, under the specified directory.
+      Tables are written one row group at a time. Requires the pyarrow Python package, tables are written as Arrow
+      IPC (Feather) files instead if pyarrow is built without Parquet support. Result tables are not returned in the
+      module result. Mutually exclusive with save_csv and save_json.
+    required: false
+    type: str
   cmd:
     description:
     - group of, or specific command to execute.
       Group options are all, bfd, control, interface, omp, system. 
       Command options are bfd sessions, control connections, control local-properties, interface cedge,
       interface vedge, omp peers, system info.
-    required: true
+      Either cmd or commands is required.
+    required: false
+    type: list
+  commands:
+    description:
+    - List of groups or specific commands to execute, e.g. ['bfd', 'control connections'].
+      Devices are selected once and shared by all commands. Mutually exclusive with cmd.
+    required: false
     type: list
+    elements: str
   detail:
     description:
     - Detailed output (i.e. more columns)
@@ -91,6 +115,66 @@ options:
     required: false
     type: int
     default: 0
+  shard:
+    description:
+    - Split the statistics query time range into sub-ranges of this interval, which are retrieved concurrently and
+      merged in time order. Interval is a number followed by m (minutes), h (hours) or d (days), e.g. 30m or 1h.
+      Smaller queries are less likely to exceed the vManage REST API timeout on large deployments.
+    - The query time range is fixed at 2 hours, ending days/hours ago. Shard must be less than 2 hours.
+    required: false
+    type: str
+  aggregate:
+    description:
+    - Return reductions of the numeric fields of each command (e.g. latency, loss and jitter for app-route stats)
+      per device and time series, instead of averages of the newest samples of each time series. Time series are
+      the same as without aggregate, e.g. one per interface for interface info and one per tunnel for app-route
+      stats, table rows include the fields identifying them. Reductions are computed over all samples in the query
+      time range, or in each bucket interval if bucket is set. Samples missing a numeric field are left out of the
+      reductions of that field.
+    required: false
+    type: list
+    elements: str
+    choices: ["min", "avg", "max", "p95"]
+  bucket:
+    description:
+    - Time interval to group samples by when aggregate is set, one table row per device, time series and bucket.
+      Interval is a number followed by m (minutes), h (hours) or d (days), e.g. 15m. Requires aggregate.
+    required: false
+    type: str
+  output:
+    description:
+    - Result content. text returns result tables rendered as text in stdout, tables returns them as a list of table
+      dicts in tables, both returns stdout and tables, none returns neither. Rendering wide tables as text is costly,
+      use tables or none when stdout is not needed.
+    required: false
+    type: str
+    choices: ["both", "text", "tables", "none"]
+    default: "both"
+  table_format:
+    description:
+    - Layout of table dicts returned in tables. rows returns table data as a list of row dicts, keyed by column id.
+      columnar returns column ids once in columns and table data as a list of row value lists in rows, so that
+      column ids are not repeated in every row. Much smaller and faster to serialize for large results.
+    required: false
+    type: str
+    choices: ["rows", "columnar"]
+    default: "rows"
+  output_file:
+    description:
+    - Write result tables to this file instead of returning them in the module result. Table rows are written
+      to the file table by table, the module result only includes a summary with the number of rows of each table
+      (output_summary) and the file path (output_file). Useful with large results, which are otherwise held in
+      memory multiple times and transferred back to the controller.
+    required: false
+    type: str
+  output_format:
+    description:
+    - Format of output_file. jsonl writes one JSON object per table row, with the table name and row values keyed
+      by column title. json writes a JSON list of tables, in the same format as save_json.
+    required: false
+    type: str
+    choices: ["jsonl", "json"]
+    default: "jsonl"
   address:
     description:
     - vManage IP address or can also be defined via VMANAGE_IP environment variable
@@ -123,6 +207,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -158,6 +257,32 @@ EXAMPLES = """
     port: 8443
     user: admin
     password: admin
+- name: Show statistics data for multiple commands
+  cisco.sastre.show_statistics:
+    site: "100"
+    commands:
+      - app-route stats
+      - interface info
+    address: 198.18.1.10
+    port: 8443
+    user: admin
+    password: admin
+- name: Show app-route latency, loss and jitter per device in 15 minute buckets
+  cisco.sastre.show_statistics:
+    cmd:
+      - app-route
+      - stats
+    aggregate:
+      - min
+      - avg
+      - max
+      - p95
+    bucket: 15m
+    output: tables
+    address: 198.18.1.10
+    port: 8443
+    user: admin
+    password: admin
 """
 
 RETURN = """
@@ -171,17 +296,34 @@ stdout_lines:
   returned: always apart from low level errors
   type: list
   sample: show table view data
+output_file:
+  description: Path of the file where result tables were written
+  returned: when output_file is set
+  type: str
+  sample: 'show_output.jsonl'
+output_summary:
+  description: Name and number of rows of each table written to output_file
+  returned: when output_file is set
+  type: list
+  sample: [{"name": "Control connections", "rows": 42}]
+saved_files:
+  description: Compressed files written with save_csv and save_json
+  returned: when compress is set along with save_csv or save_json
+  type: list
+  sample: ["show_state_csv/control_connections.csv.gz", "show_state.json.gz"]
 """
 from ansible.module_utils.basic import AnsibleModule
 from pydantic import ValidationError
 from cisco_sdwan.tasks.common import TaskException
 from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
-from cisco_sdwan.tasks.implementation import TaskShow, ShowStatisticsArgs
-from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from ansible_collections.cisco.sastre.plugins.module_utils.common import (
+    common_arg_spec, output_arg_spec, OUTPUT_REQUIRED_IF, module_params, run_task, exit_module
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow, ShowStatisticsArgs
 
 
-def main():
+def module_argument_spec():
     argument_spec = common_arg_spec()
     argument_spec.update(
         exclude=dict(type="str"),
@@ -193,34 +335,56 @@ def main():
         system_ip=dict(type="str"),
         save_csv=dict(type="str"),
         save_json=dict(type="str"),
-        cmd=dict(type="list", elements="str", required=True),
+        save_parquet=dict(type="str"),
+        cmd=dict(type="list", elements="str"),
+        commands=dict(type="list", elements="str"),
         detail=dict(type="bool"),
         simple=dict(type="bool"),
         days=dict(type="int"),
-        hours=dict(type="int")
-    )
-    module = AnsibleModule(
-        argument_spec=argument_spec,
-        mutually_exclusive=[('regex', 'not_regex'), ('detail', 'simple')],
-        supports_check_mode=True
+        hours=dict(type="int"),
+        shard=dict(type="str"),
+        aggregate=dict(type="list", elements="str", choices=["min", "avg", "max", "p95"]),
+        bucket=dict(type="str")
     )
+    argument_spec.update(output_arg_spec())
+
+    return argument_spec
+
+
+MUTUALLY_EXCLUSIVE = [('regex', 'not_regex'), ('detail', 'simple'), ('cmd', 'commands'),
+                      ('save_csv', 'save_parquet'), ('save_json', 'save_parquet')]
 
+REQUIRED_IF = OUTPUT_REQUIRED_IF
+
+
+def run_module(module_param_dict, socket_path=None, check_mode=False):
     try:
         task_args = ShowStatisticsArgs(
             **module_params('exclude', 'include', 'regex', 'not_regex', 'reachable', 'site', 'system_ip', 'save_csv',
-                            'save_json', 'cmd', 'detail', 'simple', 'days', 'hours', module_param_dict=module.params)
+                            'save_json', 'cmd', 'commands', 'detail', 'simple', 'days', 'hours', 'shard',
+                            'aggregate', 'bucket', module_param_dict=module_param_dict)
         )
-        task_result = run_task(TaskShow, task_args, module.params)
+        task_result = run_task(TaskShow, task_args, module_param_dict, socket_path, check_mode)
 
         result = {
             "changed": False
         }
-        module.exit_json(**result, **task_result)
+        return dict(**result, **task_result)
 
     except ValidationError as ex:
-        module.fail_json(msg=f"Invalid show statistics parameter: {ex}")
+        return {"failed": True, "msg": f"Invalid show statistics parameter: {ex}"}
     except (RestAPIException, ConnectionError, FileNotFoundError, ModelException, TaskException) as ex:
-        module.fail_json(msg=f"Show statistics error: {ex}")
+        return {"failed": True, "msg": f"Show statistics error: {ex}"}
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=module_argument_spec(),
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        required_if=REQUIRED_IF,
+        supports_check_mode=True
+    )
+    exit_module(module, run_module(module.params, module._socket_path, module.check_mode))
 
 
 if __name__ == "__main__":
@@ -16,6 +16,7 @@ options:
   workdir:
     description: 
     - transform will read from the specified directory instead of target vManage
+    - Backups saved to a content-addressed backup store, via the backup module store option, are also supported.
     required: false
     type: str
   no_rollover:
@@ -96,6 +97,21 @@ options:
     required: false
     type: int
     default: 300
+  session_broker:
+    description:
+    - Unix socket path of a running Sastre-Ansible session broker or can also be defined via SASTRE_SESSION_BROKER
+      environment variable. When provided, an authenticated vManage session is borrowed from the session broker
+      instead of logging in and out on every task.
+    required: false
+    type: str
+  session_cache:
+    description:
+    - Reuse an authenticated vManage session saved in a per-user cache file, or can also be defined via
+      SASTRE_SESSION_CACHE environment variable. The cached session is validated and a new login is only performed
+      when vManage rejects it. Logout is not performed at the end of the task.
+    required: false
+    type: bool
+    default: False
 """
 
 EXAMPLES = """
@@ -141,6 +157,7 @@ from cisco_sdwan.base.rest_api import RestAPIException
 from cisco_sdwan.base.models_base import ModelException
 from cisco_sdwan.tasks.implementation import TaskTransform, TransformCopyArgs
 from ansible_collections.cisco.sastre.plugins.module_utils.common import common_arg_spec, module_params, run_task
+from ansible_collections.cisco.sastre.plugins.module_utils.common_backup import workdir_view
 
 
 def main():
@@ -162,11 +179,12 @@ def main():
     )
 
     try:
-        task_args = TransformCopyArgs(
-            **module_params('output', 'workdir', 'no_rollover', 'tag', 'regex', 'not_regex', 'name_regex',
-                            module_param_dict=module.params)
-        )
-        task_result = run_task(TaskTransform, task_args, module.params)
+        with workdir_view(module.params['workdir']) as workdir:
+            task_args = TransformCopyArgs(
+                **module_params('output', 'workdir', 'no_rollover', 'tag', 'regex', 'not_regex', 'name_regex',
+                                module_param_dict={**module.params, 'workdir': workdir})
+            )
+            task_result = run_task(TaskTransform, task_args, module.params, module._socket_path)
 
         result = {
             "changed": False
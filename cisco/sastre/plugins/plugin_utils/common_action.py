@@ -0,0 +1,70 @@
+import os
+import traceback
+from contextlib import contextmanager
+from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+from ansible.module_utils.common.parameters import remove_values
+from ansible.plugins.action import ActionBase
+from ansible_collections.cisco.sastre.plugins.module_utils.common import log_handler
+
+
+@contextmanager
+def task_environment(environment):
+    """
+    Apply the task environment keyword to the controller process environment, so that option fallbacks to environment
+    variables behave as when the module runs in its own process. Variables set are restored to their previous value
+    (or removed) on exit, so that they do not apply to later tasks run by the same worker process.
+    """
+    saved_values = {key: os.environ.get(key) for key in environment}
+    os.environ.update({key: str(value) for key, value in environment.items()})
+    try:
+        yield
+    finally:
+        for key, value in saved_values.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+class SastreActionBase(ActionBase):
+    """
+    Runs a Sastre-Ansible module directly in the controller process, instead of packaging it with AnsiballZ and
+    executing it in a new Python interpreter. Only applicable to modules that are not changing vManage state, and
+    which define module_argument_spec, MUTUALLY_EXCLUSIVE, run_module and optionally REQUIRED_IF.
+    """
+    sastre_module = None
+
+    def run(self, tmp=None, task_vars=None):
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        # As with AnsibleModule, values of no_log options are masked anywhere in the result
+        no_log_values = set()
+        try:
+            environment = {}
+            self._compute_environment_string(environment)
+            with task_environment(environment):
+                validator = ArgumentSpecValidator(self.sastre_module.module_argument_spec(),
+                                                  mutually_exclusive=self.sastre_module.MUTUALLY_EXCLUSIVE,
+                                                  required_if=getattr(self.sastre_module, 'REQUIRED_IF', None))
+                validation = validator.validate(self._task.args)
+                no_log_values = validation._no_log_values
+                if validation.error_messages:
+                    result.update(failed=True, msg=', '.join(validation.error_messages))
+                else:
+                    # Discard log messages from other tasks, which may have been inherited from the parent process
+                    list(log_handler.message_iter())
+
+                    result.update(
+                        self.sastre_module.run_module(validation.validated_parameters,
+                                                      getattr(self._connection, 'socket_path', None),
+                                                      check_mode=self._task.check_mode)
+                    )
+        except Exception as ex:
+            # Same as a module failing with an unexpected exception, instead of a controller traceback
+            result.update(failed=True, msg=f"{self._task.action} error: {ex}", exception=traceback.format_exc())
+
+        if 'stdout' in result and 'stdout_lines' not in result:
+            result['stdout_lines'] = result['stdout'].splitlines()
+
+        return remove_values(result, no_log_values)
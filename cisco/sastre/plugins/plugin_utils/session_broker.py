@@ -0,0 +1,273 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sastre-Ansible session broker
+
+Long-lived process holding authenticated vManage sessions, which are lent to Sastre-Ansible modules over a Unix socket.
+Modules opt in via the session_broker option (or SASTRE_SESSION_BROKER environment variable), borrowing the broker
+session instead of performing a login/logout on each task. Client side is in module_utils/session_broker.py.
+
+Start the broker on the Ansible controller with:
+    python3 -m ansible_collections.cisco.sastre.plugins.plugin_utils.session_broker <socket path>
+"""
+import argparse
+import hmac
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from time import monotonic
+from uuid import uuid4
+from cisco_sdwan.base.rest_api import Rest, RestAPIException
+from ansible_collections.cisco.sastre.plugins.module_utils.common_session import (
+    session_key, session_state, is_session_valid
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.session_broker import BrokerException
+
+BROKER_IDLE_TIMEOUT = 900  # Sessions not borrowed within this many seconds are logged out
+BROKER_VALIDATE_INTERVAL = 60  # Sessions idle for longer than this many seconds are validated before being lent
+BROKER_LEASE_TIMEOUT = 3600  # Leases not released within this many seconds are assumed abandoned by a dead client
+
+
+class BrokerSession:
+    def __init__(self, api_args):
+        self.api_args = api_args
+        self.api = None
+        self.lock = threading.Lock()
+        self.last_used = monotonic()
+        # Lease id -> time it was acquired, for sessions currently lent to clients
+        self.leases = {}
+        # Set when the session is replaced while lent, it is closed once all leases are released
+        self.retired = False
+
+    def in_use(self):
+        now = monotonic()
+        for lease, acquired in list(self.leases.items()):
+            if now - acquired > BROKER_LEASE_TIMEOUT:
+                del self.leases[lease]
+
+        return bool(self.leases)
+
+    def matches(self, api_args):
+        return hmac.compare_digest(self.api_args['password'].encode(), api_args['password'].encode())
+
+    def login(self):
+        self.api = Rest(**self.api_args)
+        logging.getLogger(__name__).info(f"Logged in to {self.api.base_url} as {self.api_args['username']}")
+
+    def close(self):
+        api, self.api = self.api, None
+        if api is None:
+            return
+        try:
+            api.__exit__(None, None, None)
+        except (RestAPIException, OSError) as ex:
+            logging.getLogger(__name__).debug(f"Logout from {api.base_url} failed: {ex}")
+
+
+class SessionBroker(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, idle_timeout=BROKER_IDLE_TIMEOUT, validate_interval=BROKER_VALIDATE_INTERVAL):
+        self.idle_timeout = idle_timeout
+        self.validate_interval = validate_interval
+        self.sessions = {}
+        # Lease id -> BrokerSession lent under that lease
+        self.leases = {}
+        self.sessions_lock = threading.Lock()
+        self.reaper_done = threading.Event()
+
+        remove_stale_socket(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, BrokerRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def acquire(self, api_args):
+        """
+        Lend an authenticated session, performing a new login if there is no session for this key or if the existing
+        session went stale. The session is not logged out while lent, until the returned lease is released.
+        @param api_args: Rest API arguments, as returned by sdwan_api_args
+        @return: (session state dict, lease id) tuple
+        """
+        key = session_key(api_args)
+        lease = uuid4().hex
+        replaced = None
+        with self.sessions_lock:
+            entry = self.sessions.get(key)
+            if entry is None or not entry.matches(api_args):
+                replaced, entry = entry, BrokerSession(api_args)
+                self.sessions[key] = entry
+                if replaced is not None and replaced.in_use():
+                    replaced.retired = True
+                    replaced = None
+            entry.leases[lease] = monotonic()
+            self.leases[lease] = entry
+
+        if replaced is not None:
+            with replaced.lock:
+                replaced.close()
+
+        with entry.lock:
+            try:
+                if entry.api is None:
+                    entry.login()
+                elif monotonic() - entry.last_used > self.validate_interval and not is_session_valid(entry.api):
+                    logging.getLogger(__name__).info(f"Session to {key[0]} went stale, logging in again")
+                    entry.close()
+                    entry.login()
+            except Exception:
+                with self.sessions_lock:
+                    if self.sessions.get(key) is entry:
+                        del self.sessions[key]
+                    entry.leases.pop(lease, None)
+                    self.leases.pop(lease, None)
+                raise
+
+            entry.last_used = monotonic()
+            return session_state(entry.api), lease
+
+    def release(self, lease):
+        """
+        Return a lent session. Sessions replaced while lent are logged out once their last lease is released.
+        """
+        with self.sessions_lock:
+            entry = self.leases.pop(lease, None)
+            if entry is None:
+                return
+            entry.leases.pop(lease, None)
+            entry.last_used = monotonic()
+            if not entry.retired or entry.in_use():
+                return
+
+        with entry.lock:
+            entry.close()
+
+    def invalidate(self, api_args):
+        """
+        Discard a session rejected by vManage, regardless of other leases, as it is no longer usable by any client.
+        The next acquire performs a new login.
+        """
+        key = session_key(api_args)
+        with self.sessions_lock:
+            entry = self.sessions.get(key)
+            if entry is None or not entry.matches(api_args):
+                return
+            del self.sessions[key]
+
+        logging.getLogger(__name__).info(f"Session to {key[0]} rejected by vManage, logging in again on next request")
+        with entry.lock:
+            entry.close()
+
+    def expire_idle(self):
+        now = monotonic()
+        with self.sessions_lock:
+            expired = [
+                (key, entry) for key, entry in self.sessions.items()
+                if entry.api is not None and now - entry.last_used > self.idle_timeout and not entry.in_use()
+            ]
+            for key, _ in expired:
+                del self.sessions[key]
+
+            # Drop leases abandoned by dead clients, closing sessions that were replaced while lent
+            for entry in set(self.leases.values()):
+                entry.in_use()
+            abandoned = [lease for lease, entry in self.leases.items() if lease not in entry.leases]
+            for lease in abandoned:
+                entry = self.leases.pop(lease)
+                if entry.retired and not entry.leases:
+                    entry.retired = False
+                    expired.append((session_key(entry.api_args), entry))
+
+        for key, entry in expired:
+            logging.getLogger(__name__).info(f"Session to {key[0]} idle for {self.idle_timeout}s, logging out")
+            with entry.lock:
+                entry.close()
+
+    def reaper(self):
+        while not self.reaper_done.wait(min(self.idle_timeout, self.validate_interval)):
+            self.expire_idle()
+
+    def serve_forever(self, poll_interval=0.5):
+        reaper_thread = threading.Thread(target=self.reaper, daemon=True)
+        reaper_thread.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self.reaper_done.set()
+
+    def server_close(self):
+        super().server_close()
+        with self.sessions_lock:
+            entries = set(self.sessions.values()) | set(self.leases.values())
+            self.sessions.clear()
+            self.leases.clear()
+        for entry in entries:
+            entry.close()
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+class BrokerRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            op = request['op']
+            if op == 'acquire':
+                state, lease = self.server.acquire(request['api_args'])
+                response = {'state': state, 'lease': lease}
+            elif op == 'release':
+                self.server.release(request['lease'])
+                response = {}
+            elif op == 'invalidate':
+                self.server.invalidate(request['api_args'])
+                response = {}
+            else:
+                response = {'error': f"Invalid broker operation: {op}"}
+        except (ValueError, KeyError, TypeError) as ex:
+            response = {'error': f"Invalid broker request: {ex}"}
+        except (RestAPIException, OSError) as ex:
+            response = {'error': str(ex)}
+
+        self.wfile.write(json.dumps(response).encode() + b'\n')
+
+
+def remove_stale_socket(socket_path):
+    if not os.path.exists(socket_path):
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        else:
+            raise BrokerException(f"Session broker already running on {socket_path}")
+
+
+def main():
+    cli_parser = argparse.ArgumentParser(description='Sastre-Ansible session broker')
+    cli_parser.add_argument('socket', metavar='<socket>', help='Unix socket path to listen on')
+    cli_parser.add_argument('--idle-timeout', metavar='<seconds>', type=int, default=BROKER_IDLE_TIMEOUT,
+                            help='log out sessions not used for this long (default: %(default)s)')
+    cli_parser.add_argument('--validate-interval', metavar='<seconds>', type=int, default=BROKER_VALIDATE_INTERVAL,
+                            help='validate sessions idle for longer than this before lending them '
+                                 '(default: %(default)s)')
+    cli_args = cli_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    with SessionBroker(cli_args.socket, cli_args.idle_timeout, cli_args.validate_interval) as broker:
+        logging.getLogger(__name__).info(f"Session broker listening on {cli_args.socket}")
+        try:
+            broker.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
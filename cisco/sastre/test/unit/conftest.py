@@ -0,0 +1,18 @@
+"""
+Unit tests import this collection as ansible_collections.cisco.sastre, as when installed. When the collection is not
+installed under an ansible_collections directory in sys.path, the source tree is exposed under that name instead, so
+that tests run from a repository checkout with:
+    python -m pytest cisco/sastre/test/unit
+"""
+import sys
+import types
+from importlib.util import find_spec
+from pathlib import Path
+
+# Directory containing cisco/sastre
+COLLECTIONS_ROOT = Path(__file__).resolve().parents[4]
+
+if find_spec('ansible_collections') is None:
+    ansible_collections = types.ModuleType('ansible_collections')
+    ansible_collections.__path__ = [str(COLLECTIONS_ROOT)]
+    sys.modules['ansible_collections'] = ansible_collections
@@ -0,0 +1,138 @@
+import hashlib
+from concurrent import futures
+from pathlib import Path
+import pytest
+from cisco_sdwan.base.models_vmanage import (
+    ConfigGroup, ConfigGroupAssociated, ConfigGroupIndex, ConfigGroupRules, ConfigGroupValues
+)
+from ansible_collections.cisco.sastre.plugins.module_utils import common_backup
+from ansible_collections.cisco.sastre.plugins.module_utils.common_backup import (
+    BackupManifest, IncrementalWriter, StoreWriter, bounded_jobs, fetch_item, workdir_view
+)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data_path = Path(tmp_path, 'data')
+    monkeypatch.setattr(common_backup, 'DATA_DIR', str(data_path))
+    return data_path
+
+
+def test_bounded_jobs():
+    submitted = []
+
+    def submit(fn, *args):
+        submitted.append(args[0])
+        future = futures.Future()
+        future.set_result(fn(*args))
+        return future
+
+    job_iter = ((n, (str, n)) for n in range(5))
+    consumed = []
+    for key, job in bounded_jobs(submit, job_iter, 2):
+        # At most 2 jobs submitted and not yet consumed
+        assert len(submitted) - len(consumed) <= 2
+        consumed.append(key)
+        assert job.result() == str(key)
+
+    assert consumed == submitted == list(range(5))
+
+
+def test_backup_manifest(data_dir):
+    assert BackupManifest.load('backup') is None
+
+    BackupManifest({'b.json': 'bb', 'a.json': 'aa'}).save('backup')
+    manifest = BackupManifest.load('backup')
+    assert manifest.files == {'a.json': 'aa', 'b.json': 'bb'}
+    assert manifest.store is None
+
+    BackupManifest({'a.json': 'aa'}, store='../store').save('backup')
+    assert BackupManifest.load('backup').store == '../store'
+
+    Path(data_dir, 'backup', BackupManifest.store_file).write_text('{"not_files": {}}')
+    assert BackupManifest.load('backup') is None
+
+
+def test_workdir_view(data_dir):
+    Path(data_dir, 'regular').mkdir(parents=True)
+    with workdir_view('regular') as workdir:
+        assert workdir == 'regular'
+    with workdir_view(None) as workdir:
+        assert workdir is None
+
+    writer = StoreWriter('stored', 'store')
+    writer.write('feature_templates/a.json', b'{"a": 1}')
+    writer.write('feature_templates/b.json', b'{"a": 1}')
+    writer.close()
+    assert (writer.written, writer.linked) == (1, 1)
+    assert [path.name for path in Path(data_dir, 'stored').iterdir()] == [BackupManifest.store_file]
+
+    with workdir_view('stored') as workdir:
+        view_path = Path(data_dir, workdir)
+        assert workdir != 'stored' and view_path.parent == data_dir
+        assert Path(view_path, 'feature_templates', 'a.json').read_bytes() == b'{"a": 1}'
+        assert Path(view_path, 'feature_templates', 'b.json').read_bytes() == b'{"a": 1}'
+    assert not view_path.exists()
+
+    digest = hashlib.sha256(b'{"a": 1}').hexdigest()
+    Path(data_dir, 'store', 'objects', digest[:2], digest).unlink()
+    with pytest.raises(FileNotFoundError):
+        with workdir_view('stored'):
+            pass
+
+
+def test_unchanged_ids(data_dir):
+    base_index = ConfigGroupIndex([
+        {'id': 'g1', 'name': 'g1', 'lastUpdatedOn': 1000},
+        {'id': 'g2', 'name': 'g2', 'lastUpdatedOn': 1000},
+        {'id': 'g3', 'name': 'g3'},
+    ])
+    base_index.save(str(Path(data_dir, 'base')))
+
+    writer = IncrementalWriter('backup', 'base')
+    item_index = ConfigGroupIndex([
+        {'id': 'g1', 'name': 'g1', 'lastUpdatedOn': 1000},
+        {'id': 'g2', 'name': 'g2', 'lastUpdatedOn': 2000},
+        {'id': 'g3', 'name': 'g3'},
+        {'id': 'g4', 'name': 'g4', 'lastUpdatedOn': 1000},
+    ])
+    # Items without update timestamp are retrieved, even if their index entry is unchanged
+    assert writer.unchanged_ids(ConfigGroupIndex, item_index) == {'g1'}
+    assert IncrementalWriter('backup').unchanged_ids(ConfigGroupIndex, item_index) == set()
+
+
+def test_fetch_item_config_group(monkeypatch):
+    associated_devices = [{'id': 'uuid-1'}, {'id': 'uuid-2'}]
+    requests = []
+
+    def get(cls, api, *path_entries, **path_vars):
+        requests.append(cls)
+        if cls is ConfigGroup:
+            return cls({'id': 'g1', 'name': 'g1', 'devices': associated_devices})
+        if cls is ConfigGroupAssociated:
+            return cls({'devices': associated_devices})
+        return cls({})
+
+    for item_cls in (ConfigGroup, ConfigGroupAssociated, ConfigGroupRules, ConfigGroupValues):
+        monkeypatch.setattr(item_cls, 'get', classmethod(get))
+
+    # Base item with the same associated devices is kept, its sub-items are retrieved
+    base_item = ConfigGroup({'id': 'g1', 'name': 'g1', 'devices': [{'id': 'uuid-2'}, {'id': 'uuid-1'}]})
+    item, sub_items = fetch_item(None, ConfigGroup, 'g1', base_item)
+    assert item is base_item
+    assert [info for info, _ in sub_items] == ['associated devices', 'automated rules', 'values']
+    assert requests == [ConfigGroupAssociated, ConfigGroupRules, ConfigGroupValues]
+
+    # Associated devices changed since the base backup, item is retrieved again
+    requests.clear()
+    base_item = ConfigGroup({'id': 'g1', 'name': 'g1', 'devices': []})
+    item, sub_items = fetch_item(None, ConfigGroup, 'g1', base_item)
+    assert item is not base_item and item.devices_associated == 2
+    assert [info for info, _ in sub_items] == ['associated devices', 'automated rules', 'values']
+    assert requests == [ConfigGroupAssociated, ConfigGroup, ConfigGroupRules, ConfigGroupValues]
+
+    # No longer any associated devices, no sub-items
+    associated_devices = []
+    base_item = ConfigGroup({'id': 'g1', 'name': 'g1', 'devices': [{'id': 'uuid-1'}]})
+    item, sub_items = fetch_item(None, ConfigGroup, 'g1', base_item)
+    assert item.devices_associated == 0 and sub_items == []
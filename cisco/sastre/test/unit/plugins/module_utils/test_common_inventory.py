@@ -0,0 +1,107 @@
+import json
+from pathlib import Path
+import pytest
+from cisco_sdwan.base.models_vmanage import Device
+from ansible_collections.cisco.sastre.plugins.module_utils import common_inventory
+from ansible_collections.cisco.sastre.plugins.module_utils.common_cache import CACHE_DIR_ENV
+from ansible_collections.cisco.sastre.plugins.module_utils.common_inventory import (
+    DeviceFilter, DeviceIndex, InventoryArgs, compile_name_regex, device_delta, get_device_delta
+)
+
+CEDGE_MODELS = {'vedge-C8000V'}
+
+
+def device_entry(uuid, name, system_ip, site_id, state='reachable', device_type='vedge', model='vedge-C8000V',
+                 version='17.9.4'):
+    return {'uuid': uuid, 'host-name': name, 'deviceId': system_ip, 'site-id': site_id, 'reachability': state,
+            'device-type': device_type, 'device-model': model, 'version': version}
+
+
+DEVICES = [
+    device_entry('uuid-1', 'cedge-1', '10.0.0.1', '100'),
+    device_entry('uuid-2', 'cedge-2', '10.0.0.2', '100', state='unreachable'),
+    device_entry('uuid-3', 'vedge-3', '10.0.0.3', '200', model='vedge-cloud', version='20.9.4'),
+    device_entry('uuid-4', 'vsmart-1', '10.0.0.4', '1', device_type='vsmart', model='vsmart'),
+    device_entry('uuid-5', None, '10.0.0.5', '200'),
+]
+
+
+@pytest.fixture
+def device_index():
+    return DeviceIndex(Device({'data': DEVICES}), CEDGE_MODELS)
+
+
+def filtered_names(device_index, **task_args):
+    return [entry.name for entry in DeviceFilter(InventoryArgs(**task_args)).filter(device_index)]
+
+
+def test_device_index(device_index):
+    assert [entry.device_type for entry in device_index.entries] == ['cedge', 'cedge', 'vedge', 'vsmart', 'cedge']
+    assert device_index.candidates({}) == device_index.entries
+    assert [entry.uuid for entry in device_index.candidates({'site_id': '200', 'device_type': 'cedge'})] == ['uuid-5']
+    assert device_index.candidates({'site_id': '300'}) == []
+
+
+def test_device_filter(device_index):
+    assert filtered_names(device_index) == ['cedge-1', 'cedge-2', 'vedge-3', 'vsmart-1', None]
+    assert filtered_names(device_index, reachable=True, site='100') == ['cedge-1']
+    assert filtered_names(device_index, system_ip='10.0.0.3') == ['vedge-3']
+    assert filtered_names(device_index, device_type='cedge', regex='^cedge') == ['cedge-1', 'cedge-2']
+    # Devices without name are matched as an empty name
+    assert filtered_names(device_index, not_regex='edge') == ['vsmart-1', None]
+    assert filtered_names(device_index, regex_list=['-1$', '^vedge']) == ['cedge-1', 'vedge-3', 'vsmart-1']
+
+    device_filter = DeviceFilter(InventoryArgs(site='100', device_type='cedge', reachable=True))
+    assert device_filter.query_params == {'site-id': '100', 'reachability': 'reachable'}
+
+
+def test_compile_name_regex():
+    assert len(compile_name_regex(['^a', 'b$'])) == 1
+    # Backreferences are only valid within their own pattern
+    patterns = compile_name_regex([r'(a)\1', '^b'])
+    assert len(patterns) == 2 and patterns[0].search('xaa')
+
+
+def test_device_delta(device_index):
+    added, removed, changed, snapshot = device_delta(iter(device_index.entries[:3]), {})
+    assert [device['uuid'] for device in added] == ['uuid-1', 'uuid-2', 'uuid-3']
+    assert removed == [] and changed == []
+    assert snapshot['uuid-1'] == ['cedge-1', '10.0.0.1', '100', 'reachable', '17.9.4']
+
+    current = device_index.entries[1:4]
+    snapshot['uuid-2'] = ['cedge-2', '10.0.0.2', '100', 'reachable', '17.6.1']
+    added, removed, changed, _ = device_delta(iter(current), snapshot)
+    assert [device['uuid'] for device in added] == ['uuid-4']
+    assert removed == [{'name': 'cedge-1', 'system_ip': '10.0.0.1', 'site_id': '100', 'state': 'reachable',
+                        'version': '17.9.4', 'uuid': 'uuid-1'}]
+    assert len(changed) == 1 and changed[0]['uuid'] == 'uuid-2'
+    assert changed[0]['previous'] == {'state': 'reachable', 'version': '17.6.1'}
+
+
+def test_get_device_delta(device_index, tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(Path(tmp_path, 'cache')))
+    current_devices = list(device_index.entries)
+    monkeypatch.setattr(common_inventory, 'matched_device_iter', lambda *args: iter(current_devices))
+    snapshot_file = Path(tmp_path, 'snapshot.json')
+
+    delta, updated = get_device_delta({}, InventoryArgs(), str(snapshot_file))
+    assert updated and delta['generation'] == 1 and len(delta['added']) == 5
+    assert json.loads(snapshot_file.read_text())['generation'] == 1
+
+    delta, updated = get_device_delta({}, InventoryArgs(), str(snapshot_file))
+    assert not updated and delta == {'generation': 1, 'added': [], 'removed': [], 'changed': []}
+
+    # Check mode reports what would change, without writing the snapshot
+    current_devices.pop()
+    snapshot_content = snapshot_file.read_text()
+    delta, updated = get_device_delta({}, InventoryArgs(), str(snapshot_file), check_mode=True)
+    assert updated and delta['generation'] == 2 and [device['uuid'] for device in delta['removed']] == ['uuid-5']
+    assert snapshot_file.read_text() == snapshot_content
+
+    delta, updated = get_device_delta({}, InventoryArgs(), str(snapshot_file))
+    assert updated and delta['generation'] == 2 and [device['uuid'] for device in delta['removed']] == ['uuid-5']
+
+    # Invalid snapshot is replaced, all devices reported as added
+    snapshot_file.write_text('{"devices": []}')
+    delta, updated = get_device_delta({}, InventoryArgs(), str(snapshot_file))
+    assert updated and delta['generation'] == 1 and len(delta['added']) == 4
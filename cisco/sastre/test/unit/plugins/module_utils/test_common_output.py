@@ -0,0 +1,111 @@
+import csv
+import gzip
+import json
+from pathlib import Path
+from types import SimpleNamespace
+import pytest
+from cisco_sdwan.tasks.common import Table, export_json
+from cisco_sdwan.tasks.implementation import TaskList
+from ansible_collections.cisco.sastre.plugins.module_utils.common_output import (
+    HAS_PARQUET, compress_format, compressed_filename, decompressed_file, export_arrow, export_compressed,
+    open_compressed
+)
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import TaskShow
+
+
+def sample_tables():
+    interfaces = Table('Device', 'Interface', 'Rx packets', name='Interface stats')
+    interfaces.add('cedge-1', 'ge0/0', 100)
+    interfaces.add('cedge-1', 'ge0/1', 2.5)
+    tunnels = Table('Device', 'Up', name='Tunnels')
+    tunnels.add('cedge-1', True)
+
+    return [interfaces, tunnels]
+
+
+def test_compressed_filename():
+    assert compressed_filename('devices.csv', 'gzip') == 'devices.csv.gz'
+    assert compressed_filename('devices.csv.gz', 'gzip') == 'devices.csv.gz'
+    assert compressed_filename(Path('devices.json'), 'zstd') == 'devices.json.zst'
+
+
+def test_export_compressed_json(tmp_path):
+    tables = sample_tables()
+    task_args = SimpleNamespace(save_csv=None, save_json=str(Path(tmp_path, 'stats.json')))
+
+    saved_files = export_compressed(tables, TaskShow, task_args, 'gzip')
+    assert saved_files == [str(Path(tmp_path, 'stats.json.gz'))]
+    assert compress_format(saved_files[0]) == 'gzip'
+
+    # Same content as saved by Sastre without compression
+    export_json(tables, str(Path(tmp_path, 'sastre.json')))
+    with gzip.open(saved_files[0], 'rt') as json_file:
+        assert json_file.read() == Path(tmp_path, 'sastre.json').read_text()
+
+
+def test_export_compressed_csv(tmp_path):
+    tables = sample_tables()
+
+    # Show tasks save one file per table under the save_csv directory
+    task_args = SimpleNamespace(save_csv=str(Path(tmp_path, 'show')), save_json=None, subtask_info='statistics')
+    saved_files = export_compressed(tables, TaskShow, task_args, 'gzip')
+    assert [Path(filename).name for filename in saved_files] == ['statistics_interface_stats.csv.gz',
+                                                                 'statistics_tunnels.csv.gz']
+    with gzip.open(saved_files[0], 'rt', newline='') as csv_file:
+        assert list(csv.reader(csv_file)) == [['Device', 'Interface', 'Rx packets'],
+                                              ['cedge-1', 'ge0/0', '100'], ['cedge-1', 'ge0/1', '2.5']]
+
+    # List tasks save their table to the save_csv file
+    task_args = SimpleNamespace(save_csv=str(Path(tmp_path, 'list.csv')), save_json=None)
+    assert export_compressed(tables, TaskList, task_args, 'gzip') == [str(Path(tmp_path, 'list.csv.gz'))]
+
+    assert export_compressed([], TaskShow, task_args, 'gzip') == []
+
+
+def test_decompressed_file(tmp_path):
+    plain_file = Path(tmp_path, 'report.txt')
+    plain_file.write_text('### Section ###\n')
+    with decompressed_file(str(plain_file)) as filename:
+        assert filename == str(plain_file)
+
+    # Compressed files are detected by content, regardless of their suffix
+    compressed_file = Path(tmp_path, 'report.txt.gz')
+    with open_compressed(compressed_file, 'gzip') as report_file:
+        report_file.write('### Section ###\n')
+    with decompressed_file(str(compressed_file)) as filename:
+        assert Path(filename).name == 'report.txt'
+        assert Path(filename).read_text() == '### Section ###\n'
+    assert not Path(filename).exists()
+
+    assert compress_format(plain_file) is None
+
+
+def test_zstd_roundtrip(tmp_path):
+    pytest.importorskip('zstandard')
+    task_args = SimpleNamespace(save_csv=None, save_json=str(Path(tmp_path, 'stats.json')))
+
+    saved_files = export_compressed(sample_tables(), TaskShow, task_args, 'zstd')
+    assert saved_files == [str(Path(tmp_path, 'stats.json.zst'))]
+    assert compress_format(saved_files[0]) == 'zstd'
+    with decompressed_file(saved_files[0]) as filename:
+        assert [table['name'] for table in json.loads(Path(filename).read_text())] == ['Interface stats', 'Tunnels']
+
+
+def test_export_arrow(tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+
+    saved_files = export_arrow(sample_tables(), str(Path(tmp_path, 'parquet')), 'statistics')
+    suffix = 'parquet' if HAS_PARQUET else 'arrow'
+    assert [Path(filename).name for filename in saved_files] == [f'statistics_interface_stats.{suffix}',
+                                                                 f'statistics_tunnels.{suffix}']
+
+    if HAS_PARQUET:
+        import pyarrow.parquet
+        table = pyarrow.parquet.read_table(saved_files[0])
+    else:
+        import pyarrow.ipc
+        table = pyarrow.ipc.open_file(saved_files[0]).read_all()
+
+    # Columns with integer and float values are float64
+    assert table.schema.types == [pyarrow.string(), pyarrow.string(), pyarrow.float64()]
+    assert table.column('Rx packets').to_pylist() == [100.0, 2.5]
@@ -0,0 +1,93 @@
+from pathlib import Path
+import pytest
+import requests
+from ansible_collections.cisco.sastre.plugins.module_utils import common_session
+from ansible_collections.cisco.sastre.plugins.module_utils.common_cache import CACHE_DIR_ENV
+from ansible_collections.cisco.sastre.plugins.module_utils.common_session import (
+    SessionRest, cached_session, credential_digest
+)
+
+API_ARGS = {'base_url': 'https://198.18.1.10:443', 'username': 'admin', 'password': 'secret', 'timeout': 20}
+
+
+class FakeRest:
+    """
+    Stands in for a Rest API object performing a login, recording the passwords used to log in
+    """
+    logins = []
+
+    def __init__(self, base_url, username, password, timeout=20, **kwargs):
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.headers['VSessionId'] = f'session-{len(FakeRest.logins)}'
+        self.server_facts = {'platformVersion': '20.12'}
+        self.is_tenant_scope = False
+        FakeRest.logins.append(password)
+
+
+@pytest.fixture
+def session_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(Path(tmp_path, 'cache')))
+    monkeypatch.setattr(common_session, 'Rest', FakeRest)
+    monkeypatch.setattr(common_session, 'is_session_valid', lambda api: True)
+    monkeypatch.setattr(FakeRest, 'logins', [])
+    return Path(tmp_path, 'cache')
+
+
+def test_credential_digest(session_cache, monkeypatch):
+    digest = credential_digest('secret')
+    assert digest == credential_digest('secret')
+    assert digest != credential_digest('other')
+    assert 'secret' not in digest
+
+    # Salt is per cache directory
+    monkeypatch.setenv(CACHE_DIR_ENV, str(Path(session_cache, 'other')))
+    assert credential_digest('secret') != digest
+
+
+def test_cached_session_reused(session_cache):
+    with cached_session(API_ARGS) as api:
+        assert isinstance(api, FakeRest)
+
+    with cached_session(API_ARGS) as api:
+        assert isinstance(api, SessionRest)
+        assert api.session.headers['VSessionId'] == 'session-0'
+        assert api.server_facts == {'platformVersion': '20.12'}
+
+    assert FakeRest.logins == ['secret']
+    for cache_file in Path(session_cache, 'sessions').glob('*.json'):
+        assert 'secret' not in cache_file.read_text()
+
+
+def test_cached_session_password_mismatch(session_cache):
+    with cached_session(API_ARGS):
+        pass
+    with cached_session(dict(API_ARGS, password='other')) as api:
+        assert isinstance(api, FakeRest)
+
+    assert FakeRest.logins == ['secret', 'other']
+
+
+def test_cached_session_idle_expiry(session_cache, monkeypatch):
+    with cached_session(API_ARGS):
+        pass
+
+    # Cached session idle for longer than the timeout is discarded without being validated
+    validated = []
+    monkeypatch.setattr(common_session, 'is_session_valid', lambda api: validated.append(api) or True)
+    monkeypatch.setattr(common_session, 'SESSION_CACHE_IDLE_TIMEOUT', -1)
+    with cached_session(API_ARGS) as api:
+        assert isinstance(api, FakeRest)
+
+    assert validated == [] and FakeRest.logins == ['secret', 'secret']
+
+
+def test_cached_session_rejected(session_cache, monkeypatch):
+    with cached_session(API_ARGS):
+        pass
+
+    monkeypatch.setattr(common_session, 'is_session_valid', lambda api: False)
+    with cached_session(API_ARGS) as api:
+        assert api.session.headers['VSessionId'] == 'session-1'
+
+    assert FakeRest.logins == ['secret', 'secret']
@@ -0,0 +1,176 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from cisco_sdwan.base.models_vmanage import BulkAppRoute, BulkInterfaceStats
+from cisco_sdwan.tasks.implementation._show import DeviceInfo
+from ansible_collections.cisco.sastre.plugins.module_utils.common_show import (
+    ShowStatisticsArgs, TaskShow, decode_cursor, encode_cursor, high_water_mark, merge_op_items, parse_interval,
+    percentile_95, record_id, time_shards
+)
+
+T0 = 1718035200000  # 2024-06-10 16:00:00 UTC, in milliseconds
+
+
+def bulk_stats(op_cls, data, has_more=False):
+    fields = [{'property': field} for field in ('vdevice_name', 'entry_time', *op_cls.fields_std)]
+    return op_cls({
+        'header': {'generatedOn': T0, 'fields': fields, 'columns': []},
+        'data': data,
+        'pageInfo': {'hasMoreData': has_more, 'scrollId': None},
+    })
+
+
+def aggregate_args(aggregate, bucket=None):
+    return SimpleNamespace(detail=False, simple=False, aggregate=aggregate, bucket=bucket,
+                           bucket_interval=parse_interval(bucket) if bucket else None)
+
+
+DEVICES = [
+    DeviceInfo('edge_1', '10.0.0.1', '100', 'reachable', 'vedge', 'vedge-cloud'),
+    DeviceInfo('edge_2', '10.0.0.2', '200', 'reachable', 'vedge', 'vedge-cloud'),
+]
+
+
+@pytest.mark.parametrize('interval, expected', [
+    ('30m', timedelta(minutes=30)),
+    ('1h', timedelta(hours=1)),
+    (' 2 d ', timedelta(days=2)),
+])
+def test_parse_interval(interval, expected):
+    assert parse_interval(interval) == expected
+
+
+@pytest.mark.parametrize('interval', ['0m', '10', '1w', '-1h', 'h'])
+def test_parse_interval_invalid(interval):
+    with pytest.raises(ValueError):
+        parse_interval(interval)
+
+
+def test_time_shards():
+    start = datetime(2024, 6, 10, 14, tzinfo=timezone.utc)
+    end = start + timedelta(minutes=120)
+
+    assert time_shards(start, end) == [(start, end)]
+    assert time_shards(start, end, timedelta(minutes=50)) == [
+        (start, start + timedelta(minutes=50)),
+        (start + timedelta(minutes=50), start + timedelta(minutes=100)),
+        (start + timedelta(minutes=100), end),
+    ]
+    assert time_shards(start, end, timedelta(hours=3)) == [(start, end)]
+
+
+def test_statistics_shard_within_query_range():
+    assert ShowStatisticsArgs(cmd=['system'], shard='119m').shard_interval == timedelta(minutes=119)
+
+    for shard in ('2h', '1d'):
+        with pytest.raises(ValueError, match='shard'):
+            ShowStatisticsArgs(cmd=['system'], shard=shard)
+
+
+def test_cursor():
+    start = datetime(2024, 6, 10, 14, tzinfo=timezone.utc)
+    end = start + timedelta(hours=1)
+
+    assert decode_cursor(encode_cursor('scroll-1', start, end)) == ('scroll-1', start, end)
+
+
+@pytest.mark.parametrize('cursor', ['', 'not a cursor', 'e30=', 'bnVsbA=='])
+def test_cursor_invalid(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_high_water_mark():
+    records = [
+        {'uuid': 'a', 'entry_time': T0 + 100},
+        {'uuid': 'b', 'entry_time': T0 + 2500},
+        {'uuid': 'c', 'entry_time': T0 + 2000},
+    ]
+    # Records within the same second as the newest one are kept, as vManage queries have 1 second resolution
+    checkpoint = high_water_mark(records, {})
+    assert checkpoint['entry_time'] == T0 + 2500 and checkpoint['ids'] == ['b', 'c']
+
+    # Ids from the previous checkpoint are carried over when the high-water mark stays within the same second
+    checkpoint = high_water_mark([{'uuid': 'd', 'entry_time': T0 + 2900}], checkpoint)
+    assert checkpoint['entry_time'] == T0 + 2900 and checkpoint['ids'] == ['b', 'c', 'd']
+
+    checkpoint = high_water_mark([{'id': 'e', 'entry_time': T0 + 3000}], checkpoint)
+    assert checkpoint['entry_time'] == T0 + 3000 and checkpoint['ids'] == ['e']
+
+
+def test_record_id():
+    assert record_id({'uuid': 'a', 'id': 'b'}) == 'a'
+    assert record_id({'id': 'b'}) == 'b'
+    assert record_id({'entry_time': T0, 'message': 'x'}) == record_id({'message': 'x', 'entry_time': T0})
+    assert record_id({'entry_time': T0, 'message': 'x'}) != record_id({'entry_time': T0, 'message': 'y'})
+
+
+def test_merge_op_items():
+    boundary = {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 1000, 'interface': 'ge0/0'}
+    first = bulk_stats(BulkInterfaceStats, [
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0, 'interface': 'ge0/0'},
+        dict(boundary),
+    ])
+    second = bulk_stats(BulkInterfaceStats, [
+        dict(boundary),
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 1000, 'interface': 'ge0/1'},
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 2000, 'interface': 'ge0/0'},
+    ])
+
+    merged = merge_op_items([first, second])
+
+    assert merged is first
+    assert [(entry['entry_time'], entry['interface']) for entry in merged._data] == [
+        (T0, 'ge0/0'), (T0 + 1000, 'ge0/0'), (T0 + 1000, 'ge0/1'), (T0 + 2000, 'ge0/0')
+    ]
+
+
+def test_percentile_95():
+    assert percentile_95([5]) == 5
+    assert percentile_95(list(range(100, 0, -1))) == 95
+    assert percentile_95([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 100]) == 19
+
+
+def test_aggregate_table_sparse_samples():
+    op_obj = bulk_stats(BulkAppRoute, [
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0, 'name': 'tunnel_a', 'latency': 10, 'loss': 0, 'jitter': 2},
+        # Sample missing loss and jitter
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 60000, 'name': 'tunnel_a', 'latency': 30},
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 120000, 'name': 'tunnel_a', 'latency': 20, 'loss': 4,
+         'jitter': None},
+    ])
+
+    table = TaskShow().aggregate_table(aggregate_args(['min', 'max', 'p95']), DEVICES, 'App route', BulkAppRoute,
+                                       op_obj)
+    header = list(table.header)
+    row = dict(zip(header, next(row for row in table if row is not None)))
+
+    assert len(table) == 1
+    assert (row['Latency min'], row['Latency max'], row['Latency p95']) == (10, 30, 30)
+    assert (row['Loss min'], row['Loss max']) == (0, 4)
+    assert (row['Jitter min'], row['Jitter max']) == (2, 2)
+    assert row['Total min'] is None
+
+
+def test_aggregate_table_time_series():
+    op_obj = bulk_stats(BulkInterfaceStats, [
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0, 'vpn_id': 0, 'interface': 'ge0/0', 'tx_kbps': 100},
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0, 'vpn_id': 0, 'interface': 'ge0/1', 'tx_kbps': 5},
+        {'vdevice_name': '10.0.0.1', 'entry_time': T0 + 900000, 'vpn_id': 0, 'interface': 'ge0/0', 'tx_kbps': 300},
+        {'vdevice_name': '10.0.0.2', 'entry_time': T0, 'vpn_id': 0, 'interface': 'ge0/0', 'tx_kbps': 7},
+    ])
+
+    table = TaskShow().aggregate_table(aggregate_args(['max'], bucket='15m'), DEVICES, 'Interface info',
+                                       BulkInterfaceStats, op_obj)
+    rows = [
+        (device, interface, tx_kbps_max)
+        for device, _, interface, _, tx_kbps_max, *_ in (row for row in table if row is not None)
+    ]
+
+    # One row per device, interface and bucket, interfaces are not reduced together
+    assert rows == [
+        ('edge_1', 'ge0/0', 100),
+        ('edge_1', 'ge0/0', 300),
+        ('edge_1', 'ge0/1', 5),
+        ('edge_2', 'ge0/0', 7),
+    ]
@@ -0,0 +1,153 @@
+import threading
+import time
+from pathlib import Path
+import pytest
+import requests
+from ansible_collections.cisco.sastre.plugins.plugin_utils import session_broker
+from ansible_collections.cisco.sastre.plugins.module_utils.session_broker import (
+    BrokerException, BrokerUnavailableException, broker_invalidate, broker_release, broker_session_state
+)
+
+API_ARGS = {'base_url': 'https://198.18.1.10:443', 'username': 'admin', 'password': 'secret', 'timeout': 20}
+
+
+class FakeRest:
+    """
+    Stands in for an authenticated Rest API object, recording logins and logouts
+    """
+    logins = []
+    logouts = []
+
+    def __init__(self, base_url, username, password, timeout=20, **kwargs):
+        self.base_url = base_url
+        self.password = password
+        self.session = requests.Session()
+        self.session.headers['VSessionId'] = password
+        self.server_facts = {'platformVersion': '20.12'}
+        self.is_tenant_scope = False
+        FakeRest.logins.append(password)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        FakeRest.logouts.append(self.password)
+
+
+@pytest.fixture
+def start_broker(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_broker, 'Rest', FakeRest)
+    monkeypatch.setattr(session_broker, 'is_session_valid', lambda api: True)
+    monkeypatch.setattr(FakeRest, 'logins', [])
+    monkeypatch.setattr(FakeRest, 'logouts', [])
+    brokers = []
+
+    def start(**kwargs):
+        broker = session_broker.SessionBroker(str(Path(tmp_path, 'broker.sock')), **kwargs)
+        threading.Thread(target=broker.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+        brokers.append(broker)
+        return broker
+
+    yield start
+
+    for broker in brokers:
+        broker.shutdown()
+        broker.server_close()
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_session_lent_and_reused(start_broker):
+    broker = start_broker()
+    socket_path = broker.server_address
+
+    state, lease = broker_session_state(socket_path, API_ARGS)
+    assert state['headers'] == {'VSessionId': 'secret'}
+    broker_release(socket_path, lease)
+
+    _, other_lease = broker_session_state(socket_path, API_ARGS)
+    assert other_lease != lease
+    assert FakeRest.logins == ['secret']
+    broker_release(socket_path, other_lease)
+
+    # Releasing an unknown or already released lease is a no-op
+    broker_release(socket_path, lease)
+    assert FakeRest.logouts == []
+
+
+def test_session_replaced_while_lent(start_broker):
+    broker = start_broker(idle_timeout=0)
+    socket_path = broker.server_address
+
+    _, lease = broker_session_state(socket_path, API_ARGS)
+    broker.expire_idle()
+    assert FakeRest.logouts == []
+
+    # A different password replaces the session, the one lent is only logged out when released
+    _, new_lease = broker_session_state(socket_path, dict(API_ARGS, password='changed'))
+    assert FakeRest.logins == ['secret', 'changed']
+    assert FakeRest.logouts == []
+    broker_release(socket_path, lease)
+    assert FakeRest.logouts == ['secret']
+
+    broker_release(socket_path, new_lease)
+    broker.expire_idle()
+    assert FakeRest.logouts == ['secret', 'changed']
+    assert broker.sessions == {} and broker.leases == {}
+
+
+def test_session_invalidate(start_broker):
+    broker = start_broker()
+    socket_path = broker.server_address
+
+    _, lease = broker_session_state(socket_path, API_ARGS)
+    # Invalidation with a different password is ignored
+    broker_invalidate(socket_path, dict(API_ARGS, password='other'))
+    assert FakeRest.logouts == []
+
+    broker_invalidate(socket_path, API_ARGS)
+    assert FakeRest.logouts == ['secret'] and broker.sessions == {}
+    broker_release(socket_path, lease)
+
+    broker_session_state(socket_path, API_ARGS)
+    assert FakeRest.logins == ['secret', 'secret']
+
+
+def test_abandoned_lease(start_broker, monkeypatch):
+    broker = start_broker(idle_timeout=0)
+    socket_path = broker.server_address
+
+    broker_session_state(socket_path, API_ARGS)
+    broker.expire_idle()
+    assert FakeRest.logouts == []
+
+    monkeypatch.setattr(session_broker, 'BROKER_LEASE_TIMEOUT', 0)
+    time.sleep(0.01)
+    broker.expire_idle()
+    assert broker.leases == {} and FakeRest.logouts == ['secret']
+
+
+def test_reaper(start_broker):
+    broker = start_broker(idle_timeout=0.05)
+    socket_path = broker.server_address
+
+    _, lease = broker_session_state(socket_path, API_ARGS)
+    time.sleep(0.2)
+    assert FakeRest.logouts == []
+
+    broker_release(socket_path, lease)
+    assert wait_for(lambda: FakeRest.logouts == ['secret'])
+    assert broker.sessions == {}
+
+
+def test_broker_errors(start_broker, tmp_path):
+    with pytest.raises(BrokerUnavailableException):
+        broker_session_state(str(Path(tmp_path, 'missing.sock')), API_ARGS)
+
+    broker = start_broker()
+    with pytest.raises(BrokerException, match='Invalid broker request'):
+        broker_session_state(broker.server_address, {'base_url': 'https://198.18.1.10:443'})